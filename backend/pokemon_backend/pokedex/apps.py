@@ -1,6 +1,14 @@
 from django.apps import AppConfig
+from django.core import checks
 
 
 class PokedexConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'pokedex'
+
+    def ready(self):
+        from .async_ingestion import check_async_client
+        from .sprites import check_webp_support
+
+        checks.register(check_webp_support)
+        checks.register(check_async_client)
@@ -0,0 +1,252 @@
+"""
+Cliente async para la PokéAPI
+
+Misma interfaz y mismo comportamiento que PokeAPIClient (reintentos con
+backoff, deadline, caché HTTP en disco), pero las descargas son
+corrutinas en un solo event loop en lugar de un pool de hilos:
+- httpx.AsyncClient con pool de conexiones (max_workers conexiones)
+- Un semáforo limita las peticiones simultáneas
+- Sin httpx instalado (está en requirements.txt), cada petición usa la
+  sesión de requests en un pool propio de max_workers hilos: misma
+  interfaz, sin la ventaja de memoria; se avisa al crear el cliente y en
+  manage.py check (pokedex.W002)
+
+fetch_many() sigue siendo sync para que run_load() y los trabajos de carga
+lo usen sin cambios (POKEAPI['ASYNC_CLIENT'] = True); desde código async
+se usa afetch_many().
+"""
+
+import asyncio
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from django.core import checks
+
+from .ingestion import PokeAPIClient, IngestionResult, RETRY_STATUS_CODES, get_pokeapi_settings, parse_pokemon
+
+try:
+    import httpx
+except ImportError:  # Opcional: sin httpx se usa requests en hilos
+    httpx = None
+
+logger = logging.getLogger(__name__)
+
+HTTPX_MISSING = 'httpx no está instalado: el cliente async de la PokéAPI usa requests en hilos'
+
+
+def check_async_client(app_configs=None, **kwargs):
+    """
+    Aviso al arrancar (runserver, migrate, check): POKEAPI['ASYNC_CLIENT']
+    activado sin httpx. Se registra en PokedexConfig.ready()
+    """
+    if get_pokeapi_settings()['ASYNC_CLIENT'] and httpx is None:
+        return [checks.Warning(HTTPX_MISSING, hint='pip install -r requirements.txt', id='pokedex.W002')]
+    return []
+
+
+class AsyncPokeAPIClient(PokeAPIClient):
+    """
+    PokeAPIClient con descargas async
+
+    Acepta los mismos parámetros que PokeAPIClient. Las corrutinas
+    (aget, afetch_pokemon, afetch_many) deben usarse siempre desde el
+    mismo event loop; fetch_many() usa uno propio del cliente.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        if httpx is None:
+            logger.warning(HTTPX_MISSING)
+        self._async_session = None
+        self._loop = None
+        self._executor = None
+
+    @property
+    def uses_httpx(self):
+        return httpx is not None
+
+    def _session(self):
+        # Se crea dentro del event loop que la va a usar
+        if self._async_session is None and httpx is not None:
+            limits = httpx.Limits(
+                max_connections=self.max_workers,
+                max_keepalive_connections=self.max_workers
+            )
+            self._async_session = httpx.AsyncClient(limits=limits, timeout=self.timeout)
+        return self._async_session
+
+    async def aclose(self):
+        if self._async_session is not None:
+            await self._async_session.aclose()
+            self._async_session = None
+
+    def close(self):
+        if self._loop is not None:
+            self._loop.run_until_complete(self.aclose())
+            self._loop.close()
+            self._loop = None
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+        super().close()
+
+    def _run_in_thread(self, func, *args):
+        # Pool del tamaño de la concurrencia (el de asyncio puede ser menor)
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers)
+        return asyncio.get_running_loop().run_in_executor(self._executor, func, *args)
+
+
+    # PETICIONES INDIVIDUALES
+
+
+    async def aget(self, url, deadline_at=None):
+        """Igual que PokeAPIClient.get (caché en disco incluida), en async"""
+        if self.cache is None:
+            return await self._arequest(url, deadline_at)
+
+        # Lectura y escritura de archivos: fuera del event loop
+        entry = await asyncio.to_thread(self.cache.get, url)
+        if entry is not None and self.cache.is_fresh(entry):
+            self.cache.record_hit(entry)
+            return entry.to_response()
+
+        headers = entry.conditional_headers() if entry is not None else None
+        response = await self._arequest(url, deadline_at, headers)
+
+        if response.status_code == 304 and entry is not None:
+            await asyncio.to_thread(self.cache.revalidate, entry, response)
+            return entry.to_response()
+
+        self.cache.record_miss()
+        if response.status_code == 200:
+            await asyncio.to_thread(self.cache.store, url, response)
+
+        return response
+
+    async def _arequest(self, url, deadline_at=None, headers=None):
+        """
+        GET con reintentos para 429 / 5xx / errores de conexión
+
+        Mismas reglas que PokeAPIClient._request. Los errores de httpx se
+        convierten en requests.RequestException para que quien llama los
+        trate igual con cualquiera de los dos clientes.
+        """
+        if httpx is None:
+            return await self._run_in_thread(self._request, url, deadline_at, headers)
+
+        attempt = 0
+
+        while True:
+            timeout = self.timeout
+            if deadline_at is not None:
+                remaining = deadline_at - time.monotonic()
+                if remaining <= 0:
+                    raise requests.Timeout('Tiempo límite de la carga agotado')
+                timeout = min(timeout, remaining)
+
+            response = None
+            try:
+                response = await self._session().get(url, headers=headers, timeout=timeout)
+                if response.status_code not in RETRY_STATUS_CODES:
+                    return response
+                if attempt >= self.max_retries:
+                    return response
+            except httpx.TimeoutException as e:
+                if attempt >= self.max_retries:
+                    raise requests.Timeout(str(e)) from e
+            except httpx.HTTPError as e:
+                if attempt >= self.max_retries:
+                    raise requests.ConnectionError(str(e)) from e
+
+            delay = self._backoff_delay(attempt, response)
+            if deadline_at is not None and time.monotonic() + delay >= deadline_at:
+                if response is not None:
+                    return response
+                raise requests.Timeout('Tiempo límite de la carga agotado')
+
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    async def afetch_pokemon(self, pokemon_id, deadline_at=None):
+        """Descarga y parsea un Pokémon. Lanza excepción si falla."""
+        response = await self.aget(f'{self.base_url}/pokemon/{pokemon_id}', deadline_at)
+
+        if response.status_code != 200:
+            raise requests.HTTPError(
+                f'Error HTTP {response.status_code} para Pokémon #{pokemon_id}',
+                response=response
+            )
+
+        return parse_pokemon(response.json())
+
+
+    # CARGA CONCURRENTE
+
+
+    async def afetch_many(self, pokemon_ids, deadline_at=None):
+        """
+        Igual que PokeAPIClient.fetch_many: nunca lanza por un Pokémon
+        individual; los fallos quedan en result.errors
+        """
+        pokemon_ids = list(pokemon_ids)
+        result = IngestionResult()
+        started = time.monotonic()
+        if deadline_at is None:
+            deadline_at = started + self.deadline
+
+        semaphore = asyncio.Semaphore(self.max_workers)
+
+        async def fetch(pokemon_id):
+            async with semaphore:
+                return await self.afetch_pokemon(pokemon_id, deadline_at)
+
+        tasks = {asyncio.ensure_future(fetch(pokemon_id)): pokemon_id for pokemon_id in pokemon_ids}
+        pending = set(tasks)
+
+        try:
+            while pending:
+                remaining = deadline_at - time.monotonic()
+                if remaining <= 0:
+                    break
+
+                done, pending = await asyncio.wait(
+                    pending, timeout=remaining, return_when=asyncio.FIRST_COMPLETED
+                )
+
+                for task in done:
+                    pokemon_id = tasks[task]
+                    try:
+                        result.records.append(task.result())
+                    except requests.HTTPError as e:
+                        result.errors[pokemon_id] = str(e)
+                    except requests.RequestException as e:
+                        result.errors[pokemon_id] = f'Error de conexión para Pokémon #{pokemon_id}: {e}'
+                    except Exception as e:
+                        result.errors[pokemon_id] = f'Error inesperado para Pokémon #{pokemon_id}: {e}'
+        finally:
+            # Lo que siga pendiente al vencer el deadline se cancela
+            for task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+
+        if pending:
+            result.deadline_exceeded = True
+            for task in pending:
+                pokemon_id = tasks[task]
+                result.errors[pokemon_id] = f'Tiempo límite agotado para Pokémon #{pokemon_id}'
+            logger.warning(f"Deadline agotado: {len(pending)} Pokémon sin cargar")
+
+        result.records.sort(key=lambda record: record['pokemon_id'])
+        result.elapsed = time.monotonic() - started
+
+        return result
+
+    def fetch_many(self, pokemon_ids, deadline_at=None):
+        """Versión sync de afetch_many (para run_load y los trabajos de carga)"""
+        if self._loop is None:
+            self._loop = asyncio.new_event_loop()
+        return self._loop.run_until_complete(self.afetch_many(pokemon_ids, deadline_at))
@@ -0,0 +1,169 @@
+"""
+Versiones async de los endpoints de lectura (/api/async/...)
+
+Con un servidor ASGI (pokemon_backend/asgi.py) las vistas sync de DRF
+corren cada una en un hilo; estas son vistas async de Django que leen con
+el ORM async (aget, aaggregate, async for) y devuelven exactamente el
+mismo JSON que sus equivalentes en views.py:
+- Las páginas las calcula el mismo paginador por cursor
+  (apaginate_queryset: filtro keyset y async for sobre .values())
+- Con POKEDEX_MEMORY_INDEX activado las filas salen del índice en memoria
+  (la firma de la tabla se comprueba con el ORM async)
+- El JSON lo arman las mismas funciones que en views.py
+  (pokemon_page_data, favorite_page_data, favorite_status_data)
+
+- GET /api/async/pokemon/                 -> PokemonViewSet.list
+- GET /api/async/pokemon/weight-filter/   -> filtros predefinidos
+- GET /api/async/pokemon/grass-type/
+- GET /api/async/pokemon/flying-tall/
+- GET /api/async/pokemon/query/           -> consulta combinable
+- GET /api/async/pokemon/{id}/            -> detalle
+- GET /api/async/pokemon/stats/           -> estadísticas
+- GET /api/async/favorites/               -> favoritos por páginas
+- GET /api/async/favorites/status/?ids=   -> estado de muchos favoritos
+
+Los listados usan la caché de respuestas con acache_response (las mismas
+entradas y contadores que cache_response); los ETag / 304 los sigue
+resolviendo ConditionalGetMiddleware.
+"""
+
+from asgiref.sync import sync_to_async
+from django.db.models import Count
+from django.http import HttpResponse
+from django.utils.cache import patch_cache_control
+from django.views.decorators.http import require_GET
+from rest_framework.request import Request
+
+from .cache import acache_response, response_cache_stats
+from .http_cache import get_http_cache
+from .ingestion import get_pokeapi_settings
+from .models import Pokemon
+from .pagination import FavoriteCursorPagination, PokemonCursorPagination
+from .memory_index import aindexed_rows
+from .queries import build_pokemon_queryset, describe_query, values_for_fields
+from .renderers import FastJSONRenderer
+from .serializers import FavoriteStatusSerializer, PokemonBasicSerializer, PokemonQuerySerializer, PokemonSerializer
+from .views import (
+    PokemonViewSet,
+    favorite_page_data,
+    favorite_queryset,
+    favorite_status_data,
+    favorited_ids,
+    pokemon_page_data,
+)
+
+
+def _json_response(data, status=200, **cache_control):
+    """Renderiza como las vistas de DRF (mismos bytes) con Cache-Control"""
+    response = HttpResponse(
+        FastJSONRenderer().render(data),
+        status=status,
+        content_type='application/json'
+    )
+    if status == 200:
+        patch_cache_control(response, **(cache_control or {'no_cache': True}))
+    return response
+
+
+async def _page_response(request, params, message, **extra):
+    """Igual que PokemonViewSet._page_response"""
+    fields = params.get('fields') or PokemonBasicSerializer.Meta.fields
+    rows = await aindexed_rows(params, fields)
+    if rows is None:
+        rows = values_for_fields(build_pokemon_queryset(params), fields)
+
+    paginator = PokemonCursorPagination()
+    page = await paginator.apaginate_queryset(rows, Request(request))
+    return _json_response(pokemon_page_data(paginator, page, fields, message, **extra))
+
+
+# POKÉMON
+
+
+@require_GET
+@acache_response
+async def pokemon_list(request):
+    return await _page_response(request, {}, message='{count} Pokémon - Tabla Principal')
+
+
+def _preset_view(name):
+    params, filter_applied, message = PokemonViewSet.PRESET_RESPONSES[name]
+
+    @require_GET
+    @acache_response
+    async def view(request):
+        return await _page_response(request, params, message=message, filter_applied=filter_applied)
+
+    view.__name__ = f'pokemon_{name}'
+    return view
+
+
+pokemon_weight_filter = _preset_view('weight_filter')
+pokemon_grass_type = _preset_view('grass_type')
+pokemon_flying_tall = _preset_view('flying_tall')
+
+
+@require_GET
+@acache_response
+async def pokemon_query(request):
+    query_params = PokemonQuerySerializer(data=request.GET)
+    if not query_params.is_valid():
+        return _json_response(query_params.errors, status=400)
+    params = query_params.validated_data
+
+    return await _page_response(
+        request, params,
+        message='Encontrados {count} Pokémon',
+        filter_applied=describe_query(params)
+    )
+
+
+@require_GET
+async def pokemon_detail(request, pk):
+    try:
+        pokemon = await Pokemon.objects.aget(pk=pk)
+    except Pokemon.DoesNotExist:
+        return _json_response({'detail': 'No Pokemon matches the given query.'}, status=404)
+
+    return _json_response(PokemonSerializer(pokemon).data, **PokemonViewSet.cache_control['retrieve'])
+
+
+@require_GET
+async def pokemon_stats(request):
+    http_cache = get_http_cache(get_pokeapi_settings())
+
+    totals = await Pokemon.objects.aaggregate(
+        total_pokemon=Count('pk'),
+        total_favorites=Count('is_favorite')
+    )
+
+    return _json_response({
+        **totals,
+        # Recorre el directorio de la caché en disco: fuera del event loop
+        'http_cache': await sync_to_async(http_cache.stats)() if http_cache else {'enabled': False},
+        'response_cache': response_cache_stats.as_dict(),
+    }, **PokemonViewSet.cache_control['stats'])
+
+
+# FAVORITOS
+
+
+@require_GET
+@acache_response
+async def favorite_list(request):
+    paginator = FavoriteCursorPagination()
+    page = await paginator.apaginate_queryset(favorite_queryset(), Request(request))
+    return _json_response(favorite_page_data(paginator, page))
+
+
+@require_GET
+@acache_response
+async def favorite_status(request):
+    serializer = FavoriteStatusSerializer(data=request.GET)
+    if not serializer.is_valid():
+        return _json_response(serializer.errors, status=400)
+
+    ids = serializer.validated_data['ids']
+
+    favorited = {pokemon_id async for pokemon_id in favorited_ids(ids)}
+    return _json_response(favorite_status_data(ids, favorited))
@@ -0,0 +1,1362 @@
+"""
+Escenarios de benchmark de la Pokédex
+
+Se ejecutan con: python manage.py benchmark_pokedex <escenario>
+Cada escenario recibe las opciones del comando y devuelve líneas de texto
+con los resultados.
+"""
+
+import tempfile
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import timedelta
+
+from django.core.management.base import CommandError
+from django.db import DEFAULT_DB_ALIAS, connection, reset_queries
+from django.test import AsyncClient, Client, override_settings
+from django.test.utils import CaptureQueriesContext, setup_databases, teardown_databases
+
+from .cache import bump_data_version, response_cache_stats
+from .http_cache import HTTPResponseCache
+from .ingestion import PokeAPIClient, parse_pokemon
+from .models import Pokemon, PokemonFavorite
+from .persistence import bulk_upsert_pokemon
+from .queries import build_pokemon_queryset
+from .testing import (
+    NO_RESPONSE_CACHE,
+    SPRITE_VARIANTS,
+    StubPokeAPIServer,
+    fake_pokemon_payload,
+    seed_synthetic_pokemon,
+)
+
+
+# BASE DE DATOS TEMPORAL
+
+
+@contextmanager
+def scratch_database(on_disk=False):
+    """
+    Base de datos de pruebas (migrada y vacía) durante el bloque, creada y
+    destruida con las mismas funciones que manage.py test: los benchmarks
+    nunca tocan db.sqlite3
+
+    En SQLite usa memoria compartida; on_disk=True, un archivo temporal,
+    para que varios hilos escriban con los bloqueos reales
+    """
+    test_settings = connection.settings_dict['TEST']
+    old_test_name = test_settings.get('NAME')
+
+    with tempfile.TemporaryDirectory() as directory:
+        if connection.vendor == 'sqlite':
+            test_settings['NAME'] = f'{directory}/scratch.sqlite3' if on_disk else None
+        old_config = setup_databases(verbosity=0, interactive=False, aliases={DEFAULT_DB_ALIAS},
+                                     serialized_aliases=set())
+        try:
+            yield
+        finally:
+            teardown_databases(old_config, verbosity=0)
+            test_settings['NAME'] = old_test_name
+
+
+def timed(func, repeat=5):
+    """Ejecuta func varias veces y devuelve (mejor tiempo en ms, último resultado)"""
+    best = float('inf')
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - started)
+    return best * 1000, result
+
+
+def count_queries(func):
+    """Ejecuta func y devuelve (consultas SQL ejecutadas, resultado)"""
+    # El registro de consultas tiene un tamaño máximo: vaciarlo antes de medir
+    reset_queries()
+    with CaptureQueriesContext(connection) as queries:
+        result = func()
+    return len(queries), result
+
+
+# ESCENARIOS
+
+
+def bench_ingestion(options):
+    """
+    Tiempo de pared para descargar N Pokémon: secuencial vs concurrente
+    (hilos) vs async (corrutinas; httpx si está instalado)
+    """
+    from .async_ingestion import AsyncPokeAPIClient, httpx
+
+    lines = []
+    sizes = options['sizes'] or [50, 1000]
+    workers = options['workers']
+    async_label = f"async x{workers} ({'httpx' if httpx else 'hilos'})"
+    variants = [
+        ('secuencial', PokeAPIClient, 1),
+        (f'concurrente x{workers}', PokeAPIClient, workers),
+        (async_label, AsyncPokeAPIClient, workers),
+    ]
+
+    with StubPokeAPIServer(latency=options['latency'], fail_every=options['fail_every']) as stub:
+        lines.append(f"Stub PokéAPI en {stub.base_url} (latencia {options['latency'] * 1000:.0f} ms)")
+
+        for size in sizes:
+            for label, client_class, max_workers in variants:
+                with client_class(base_url=stub.base_url, max_workers=max_workers,
+                                  backoff_factor=0.01, deadline=3600, cache=False) as client:
+                    result = client.fetch_many(range(1, size + 1))
+
+                rate = len(result.records) / result.elapsed if result.elapsed else 0
+                lines.append(
+                    f'{size:>6} Pokémon | {label:<22} | {result.elapsed:8.2f} s | '
+                    f'{rate:8.1f} Pokémon/s | errores: {len(result.errors)}'
+                )
+
+    return lines
+
+
+def bench_http_cache(options):
+    """Recarga de datos sin cambios: sin caché vs caché vigente vs revalidación 304"""
+    lines = []
+    size = (options['sizes'] or [200])[0]
+    ids = range(1, size + 1)
+
+    with StubPokeAPIServer(latency=options['latency']) as stub, \
+            tempfile.TemporaryDirectory() as cache_dir:
+        cache = HTTPResponseCache(cache_dir, ttl=3600, max_bytes=50 * 1024 * 1024)
+
+        runs = [
+            ('sin caché', False, None),
+            ('caché fría', cache, None),
+            ('caché vigente', cache, None),
+            ('revalidación 304', cache, 0),  # TTL 0: todo se revalida
+        ]
+        for label, run_cache, ttl in runs:
+            if ttl is not None:
+                cache.ttl = ttl
+
+            requests_before, bytes_before = stub.requests_served, stub.bytes_sent
+            with PokeAPIClient(base_url=stub.base_url, max_workers=options['workers'],
+                               deadline=3600, cache=run_cache) as client:
+                result = client.fetch_many(ids)
+
+            lines.append(
+                f'{label:<17} | {result.elapsed:6.2f} s | '
+                f'peticiones: {stub.requests_served - requests_before:>5} | '
+                f'bytes descargados: {stub.bytes_sent - bytes_before:>9}'
+            )
+
+        lines.append(f'Métricas de la caché: {cache.stats()}')
+
+    return lines
+
+
+def bench_filters(options):
+    """
+    Filtros grass / flying-tall: comprensión de listas en Python vs SQL sobre
+    las columnas de tipo vs SQL sobre la marca precalculada
+    """
+    lines = []
+
+    def sql_ids(params):
+        return lambda: list(build_pokemon_queryset(params).values_list('pk', flat=True))
+
+    presets = {
+        'grass': (
+            lambda: [p.pk for p in Pokemon.objects.all() if p.is_grass_type()],
+            sql_ids({'types': ['grass']}),
+            sql_ids({'matches': ['grass_type']}),
+        ),
+        'flying-tall': (
+            lambda: [p.pk for p in Pokemon.objects.all() if p.is_flying_and_tall()],
+            sql_ids({'types': ['flying'], 'height_gt': 10}),
+            sql_ids({'matches': ['flying_tall']}),
+        ),
+    }
+
+    for size in options['sizes'] or [1000, 10000, 100000]:
+        with scratch_database():
+            seed_synthetic_pokemon(size)
+
+            for name, (python_filter, types_filter, match_filter) in presets.items():
+                python_ms, python_ids = timed(python_filter)
+                types_ms, types_ids = timed(types_filter)
+                match_ms, match_ids = timed(match_filter)
+
+                expected = sorted(python_ids)
+                agree = 'OK' if expected == sorted(types_ids) == sorted(match_ids) else 'DIFERENTES'
+                lines.append(
+                    f'{size:>7} filas | {name:<11} | Python {python_ms:9.2f} ms | '
+                    f'SQL tipos {types_ms:8.2f} ms | SQL marca {match_ms:8.2f} ms | '
+                    f'{len(match_ids):>6} resultados | {agree}'
+                )
+
+    return lines
+
+
+def _walk_pages(client, url):
+    """Sigue los enlaces 'next' y devuelve (pokemon_id de todas las páginas, enlaces previous)"""
+    seen = []
+    previous_links = []
+    while url:
+        data = client.get(url).json()
+        seen.extend(row['pokemon_id'] for row in data['results'])
+        previous_links.append(data['previous'])
+        url = data['next']
+    return seen, previous_links
+
+
+def bench_memory_index(options):
+    """
+    Índice columnar en memoria vs ORM: construcción, conteo y primera
+    página de varias combinaciones de filtros; paginación por HTTP
+
+    Falla si el índice y el ORM no devuelven las mismas filas en el mismo
+    orden, o si los cursores next / previous no recorren lo mismo.
+    """
+    from .memory_index import PokedexIndex, indexed_rows
+    from .queries import values_for_fields
+
+    lines = []
+    failures = []
+    page_size = 51  # Una página por defecto (50) más la que usa el cursor para saber si hay otra
+    fields = ['pokemon_id', 'name', 'types', 'height', 'weight']
+    combinations = {
+        'grass_type': {'matches': ['grass_type']},
+        'flying_tall': {'matches': ['flying_tall']},
+        'flying+height>10': {'types': ['flying'], 'height_gt': 10},
+        'grass&poison, weight<80': {'types': ['grass', 'poison'], 'types_match': 'all', 'weight_lt': 80},
+        'fire|water 30-80, -height': {'types': ['fire', 'water'], 'weight_gte': 30, 'weight_lte': 80,
+                                      'ordering': ['-height']},
+        'name^pokemon-12, name': {'name_prefix': 'pokemon-12', 'ordering': ['name']},
+        'height 5-9, -weight,-id': {'height_gte': 5, 'height_lte': 9, 'ordering': ['-weight', '-pokemon_id']},
+    }
+    enabled = {'POKEDEX_MEMORY_INDEX': {'ENABLED': True}}
+
+    for size in options['sizes'] or [1000, 100000]:
+        with scratch_database():
+            seed_synthetic_pokemon(size)
+            build_ms, index = timed(PokedexIndex.from_database, repeat=1)
+            memory_mb, _ = _peak_memory(PokedexIndex.from_database)
+            lines.append(f'{size:>7} filas | índice: lectura + construcción {build_ms:8.1f} ms '
+                         f'(construcción {index.build_seconds * 1000:.1f} ms) | {memory_mb:6.1f} MB reservados')
+
+            with override_settings(**enabled):
+                for label, params in combinations.items():
+                    queryset = build_pokemon_queryset(params)
+                    rows = indexed_rows(params, fields)
+
+                    orm_count_ms, orm_count = timed(queryset.count)
+                    index_count_ms, index_count = timed(lambda: index.count(index.filter_bits(params)))
+                    orm_page_ms, orm_page = timed(lambda: list(values_for_fields(queryset, fields)[:page_size]))
+                    index_page_ms, index_page = timed(lambda: indexed_rows(params, fields)[:page_size])
+
+                    orm_ids = list(queryset.values_list('pokemon_id', flat=True))
+                    index_ids = [row['pokemon_id'] for row in rows[:]]
+                    agree = orm_ids == index_ids and orm_count == index_count and [
+                        {field: row[field] for field in fields} for row in orm_page
+                    ] == [{field: row[field] for field in fields} for row in index_page]
+                    if not agree:
+                        failures.append(f'{size} filas, {label}: el índice no coincide con el ORM')
+                    lines.append(
+                        f'{size:>7} filas | {label:<26} | conteo ORM {orm_count_ms:8.2f} ms vs índice '
+                        f'{index_count_ms:6.3f} ms | página ORM {orm_page_ms:8.2f} ms vs índice '
+                        f"{index_page_ms:6.3f} ms | {index_count:>6} resultados | {'OK' if agree else 'DIFERENTES'}"
+                    )
+
+            if size > 5000:
+                continue
+
+            # Mismos cursores: recorrer todas las páginas (next y previous) con y sin índice
+            client = Client()
+            for label, query in [('grass_type', 'matches=grass_type'),
+                                 ('-weight', 'ordering=-weight&types=water,fire'),
+                                 ('name^pokemon-1', 'name_prefix=pokemon-1&ordering=-name')]:
+                url = f'/api/pokemon/query/?{query}&page_size=37'
+                walks = {}
+                for mode, index_settings in [('orm', {'ENABLED': False}), ('index', {'ENABLED': True})]:
+                    with override_settings(ALLOWED_HOSTS=['*'], POKEDEX_MEMORY_INDEX=index_settings,
+                                           **NO_RESPONSE_CACHE):
+                        seen, previous_links = _walk_pages(client, url)
+                        backwards = [_walk_pages(client, link)[0][:37] for link in previous_links if link]
+                    walks[mode] = (seen, previous_links, backwards)
+                walk_ok = walks['orm'] == walks['index']
+                if not walk_ok:
+                    failures.append(f'{size} filas, paginación {label}: distinta con el índice')
+                lines.append(f"{size:>7} filas | páginas {label:<18} | {len(walks['index'][0]):>6} filas en "
+                             f"{len(walks['index'][1])} páginas, ida y vuelta | {'OK' if walk_ok else 'DIFERENTES'}")
+
+    if failures:
+        raise CommandError(f"Índice en memoria: {', '.join(failures)}")
+
+    return lines
+
+
+# Sílabas para nombres sintéticos variados (pokemon-N comparten todos el mismo prefijo)
+NAME_SYLLABLES = [
+    'bul', 'ba', 'saur', 'char', 'man', 'der', 'squir', 'tle', 'pi', 'ka', 'chu', 'rai', 'jig', 'gly',
+    'puff', 'zu', 'bat', 'odd', 'ish', 'gloom', 'vile', 'mew', 'two', 'ee', 'vee', 'lap', 'ras',
+    'snor', 'lax', 'dra', 'gon', 'ite', 'gar', 'dos', 'geo', 'dude', 'on', 'ix', 'ma', 'chop',
+]
+
+
+def synthetic_names(total):
+    """Nombres únicos formados por sílabas (el ID en base len(NAME_SYLLABLES))"""
+    names = []
+    seen = set()
+    base = len(NAME_SYLLABLES)
+    for pokemon_id in range(1, total + 1):
+        digits, value = [], pokemon_id
+        while value or len(digits) < 2:
+            value, digit = divmod(value, base)
+            digits.append(NAME_SYLLABLES[digit])
+        name = ''.join(digits)
+        if name in seen:
+            name = f'{name}-{pokemon_id}'  # Dos combinaciones que se escriben igual
+        seen.add(name)
+        names.append(name)
+    return names
+
+
+def _typo(name, rng):
+    """El nombre con un error: sustitución, transposición, letra de menos o de más"""
+    i = rng.randrange(1, len(name) - 1)
+    kind = rng.choice(['substitute', 'transpose', 'delete', 'insert'])
+    if kind == 'substitute':
+        return name[:i] + rng.choice([c for c in 'aeiouxyz' if c != name[i]]) + name[i + 1:]
+    if kind == 'transpose':
+        return name[:i - 1] + name[i] + name[i - 1] + name[i + 1:]
+    if kind == 'delete':
+        return name[:i] + name[i + 1:]
+    return name[:i] + rng.choice('aeiouxyz') + name[i:]
+
+
+def bench_search(options):
+    """
+    Búsqueda por nombre: índice de search.py vs icontains sobre la tabla
+
+    Con nombres sintéticos variados mide la construcción del índice y la
+    latencia (p50 / p95) por tipo de consulta, directa y por HTTP. Falla si
+    sin errores (fuzzy=false) no encuentra exactamente lo mismo que
+    icontains en name o reversed_name, si un nombre exacto no sale primero,
+    si menos del 95% de los nombres con un error encuentran el original
+    entre los 10 primeros, o si con el tamaño de la Pokédex nacional el p95
+    por HTTP llega a 10 ms.
+    """
+    import random
+
+    from django.db.models import Q
+
+    from .search import SearchIndex
+
+    lines = []
+    failures = []
+    national_dex = 1350
+    samples = 200
+    rng = random.Random(25)
+
+    for size in options['sizes'] or [national_dex, 20000]:
+        with scratch_database(), override_settings(ALLOWED_HOSTS=['*'], **NO_RESPONSE_CACHE):
+            names = synthetic_names(size)
+            records = [parse_pokemon(fake_pokemon_payload(pokemon_id)) for pokemon_id in range(1, size + 1)]
+            for record, name in zip(records, names):
+                record['name'] = name
+            bulk_upsert_pokemon(records)
+
+            build_ms, index = timed(SearchIndex.from_database, repeat=1)
+            memory_mb, _ = _peak_memory(SearchIndex.from_database)
+            lines.append(f'{size:>6} filas | índice: lectura + construcción {build_ms:7.1f} ms '
+                         f'(construcción {index.build_seconds * 1000:.1f} ms) | {memory_mb:5.1f} MB reservados')
+
+            picked = rng.sample(names, min(samples, size))
+            typo_pairs = [(_typo(name, rng), name) for name in picked if len(name) >= 5]
+            queries = {
+                'exacto': picked,
+                'prefijo': [name[:rng.randint(1, 4)] for name in picked],
+                'subcadena': [name[rng.randint(1, 2):][:rng.randint(2, 4)] for name in picked],
+                'con un error': [typo for typo, _ in typo_pairs],
+            }
+
+            # Mismo conjunto que icontains (sin errores y sin límite)
+            mismatches = 0
+            for query in queries['prefijo'] + queries['subcadena']:
+                expected = set(
+                    Pokemon.objects.filter(Q(name__icontains=query) | Q(reversed_name__icontains=query))
+                    .values_list('pokemon_id', flat=True)
+                )
+                found = {hit.pokemon_id for hit in index.search(query, limit=size, fuzzy=False)}
+                mismatches += found != expected
+            if mismatches:
+                failures.append(f'{size} filas: {mismatches} consultas distintas de icontains')
+
+            exact_first = 0
+            for name in picked:
+                hits = index.search(name, limit=1)
+                exact_first += bool(hits) and hits[0].match == 'exact' and names[hits[0].pokemon_id - 1] == name
+            if exact_first != len(picked):
+                failures.append(f'{size} filas: {len(picked) - exact_first} nombres exactos no salen primero')
+
+            recalled = sum(
+                name in {names[hit.pokemon_id - 1] for hit in index.search(typo, limit=10)}
+                for typo, name in typo_pairs
+            )
+            recall = recalled / len(typo_pairs)
+            if recall < 0.95:
+                failures.append(f'{size} filas: solo {recall:.0%} de los nombres con un error encontrados')
+            lines.append(f'{size:>6} filas | exactos primero {exact_first}/{len(picked)} | con un error '
+                         f'encontrados en el top 10 {recalled}/{len(typo_pairs)} | icontains: '
+                         f'{mismatches} diferencias')
+
+            # Construcción del índice y primera petición fuera de la medida
+            client = Client()
+            client.get('/api/pokemon/search/', {'q': picked[0]})
+            for label, terms in queries.items():
+                index_ms = [timed(lambda: index.search(term), repeat=1)[0] for term in terms]
+                http_ms = [timed(lambda: client.get('/api/pokemon/search/', {'q': term}), repeat=1)[0]
+                           for term in terms]
+                orm_ms = [
+                    timed(lambda: list(Pokemon.objects.filter(
+                        Q(name__icontains=term) | Q(reversed_name__icontains=term)
+                    ).values_list('pokemon_id', 'name')[:20]), repeat=1)[0]
+                    for term in terms[:50]
+                ]
+                http_p95 = _percentile(http_ms, 0.95)
+                fast = http_p95 < 10
+                if size <= national_dex and not fast:
+                    failures.append(f'{size} filas, {label}: p95 por HTTP {http_p95:.1f} ms')
+                lines.append(
+                    f'{size:>6} filas | {label:<12} | índice p50 {_percentile(index_ms, 0.5):6.3f} ms '
+                    f'p95 {_percentile(index_ms, 0.95):6.3f} ms | HTTP p50 {_percentile(http_ms, 0.5):5.2f} ms '
+                    f"p95 {http_p95:5.2f} ms | icontains p50 {_percentile(orm_ms, 0.5):6.2f} ms | "
+                    f"{'OK' if fast else 'LENTO'}"
+                )
+
+    if failures:
+        raise CommandError(f"Búsqueda: {', '.join(failures)}")
+
+    return lines
+
+
+def bench_explain(options):
+    """
+    Plan de ejecución (EXPLAIN) de cada filtro predefinido
+
+    Falla si alguno recorre la tabla completa: sirve como verificación de
+    regresión de los índices.
+    """
+    from .views import PokemonViewSet
+
+    lines = []
+    presets = {
+        'weight-filter': PokemonViewSet.WEIGHT_FILTER_PRESET,
+        'grass-type': PokemonViewSet.GRASS_TYPE_PRESET,
+        'flying-tall': PokemonViewSet.FLYING_TALL_PRESET,
+    }
+    # SQLite: "SEARCH ... USING INDEX" / PostgreSQL: "Index Scan", "Bitmap Index Scan"
+    index_markers = ('SEARCH', 'Index Scan', 'Index Only Scan')
+    full_scan_markers = ('SCAN pokedex_pokemon', 'Seq Scan')
+    # Recorrer un índice parcial solo lee las filas que cumplen su condición
+    partial_indexes = [index.name for index in Pokemon._meta.indexes if index.condition is not None]
+    index_markers += tuple(f'SCAN pokedex_pokemon USING INDEX {name}' for name in partial_indexes)
+
+    with scratch_database():
+        seed_synthetic_pokemon((options['sizes'] or [5000])[0])
+
+        failures = []
+        for name, params in presets.items():
+            plan = build_pokemon_queryset(params).explain()
+            uses_index = all(
+                any(marker in line for marker in index_markers)
+                or not any(marker in line for marker in full_scan_markers)
+                for line in plan.splitlines()
+            ) and any(marker in plan for marker in index_markers)
+            if not uses_index:
+                failures.append(name)
+
+            lines.append(f"{name:<14} | {'usa índice' if uses_index else 'RECORRE LA TABLA'}")
+            lines.extend(f'    {line}' for line in plan.splitlines())
+
+    if failures:
+        raise CommandError(f"Filtros sin índice: {', '.join(failures)}")
+
+    return lines
+
+
+# Los escenarios que miden la base de datos desactivan la caché de respuestas
+def bench_favorites(options):
+    """
+    Listado de favoritos a medida que crecen: consultas y latencia por página
+
+    Compara el acceso perezoso (una consulta más por favorito para traer
+    su Pokémon) con GET /api/favorites/ (un solo JOIN por página), y los
+    cambios / consultas de estado de a uno con /batch/ y /status/.
+    """
+    from .serializers import PokemonFavoriteSerializer
+
+    lines = []
+    page_size = 50
+
+    for size in options['sizes'] or [10, 100, 1000, 5000]:
+        with scratch_database(), override_settings(ALLOWED_HOSTS=['*'], **NO_RESPONSE_CACHE):
+            seed_synthetic_pokemon(size)
+            PokemonFavorite.objects.bulk_create(PokemonFavorite(pokemon=p) for p in Pokemon.objects.all())
+
+            def lazy_page():
+                page = PokemonFavorite.objects.order_by('-created_at')[:page_size]
+                return PokemonFavoriteSerializer(page, many=True).data
+
+            client = Client()
+            runs = [
+                ('perezoso (N+1)', lazy_page),
+                ('GET /api/favorites/', lambda: client.get(f'/api/favorites/?page_size={page_size}')),
+            ]
+            for label, run in runs:
+                query_count, _ = count_queries(run)
+                elapsed_ms, _ = timed(run)
+                lines.append(
+                    f'{size:>6} favoritos | {label:<20} | {query_count:>4} consultas | {elapsed_ms:8.2f} ms/página'
+                )
+
+            # Una tarjeta por Pokémon de la página: de a uno vs en lote
+            ids = list(Pokemon.objects.order_by('pokemon_id').values_list('pokemon_id', flat=True)[:page_size])
+
+            def one_by_one():
+                for action in ('quitar', 'agregar'):
+                    for pokemon_id in ids:
+                        client.post('/api/favorites/toggle/', {'pokemon_id': pokemon_id},
+                                    content_type='application/json')
+
+            def batched():
+                for key in ('remove', 'add'):
+                    client.post('/api/favorites/batch/', {key: ids}, content_type='application/json')
+
+            def check_one_by_one():
+                for pokemon_id in ids:
+                    client.get(f'/api/favorites/check/{pokemon_id}/')
+
+            batch_runs = [
+                (f'{len(ids)} x toggle x2', one_by_one, 2 * len(ids)),
+                ('batch remove+add', batched, 2),
+                (f'{len(ids)} x check', check_one_by_one, len(ids)),
+                ('status ?ids=', lambda: client.get(f"/api/favorites/status/?ids={','.join(map(str, ids))}"), 1),
+            ]
+            for label, run, requests in batch_runs:
+                query_count, _ = count_queries(run)
+                elapsed_ms, _ = timed(run, repeat=3)
+                lines.append(
+                    f'{size:>6} favoritos | {label:<20} | {query_count:>4} consultas | '
+                    f'{elapsed_ms:8.2f} ms ({requests} peticiones)'
+                )
+
+    return lines
+
+
+def _legacy_toggle(pokemon):
+    """Toggle anterior: leer y después borrar o crear (sin atomicidad)"""
+    try:
+        PokemonFavorite.objects.get(pokemon=pokemon).delete()
+    except PokemonFavorite.DoesNotExist:
+        PokemonFavorite.objects.create(pokemon=pokemon)
+
+
+def bench_favorite_races(options):
+    """
+    Prueba de estrés: N hilos alternan favoritos sobre pocos Pokémon a la vez
+
+    Cada toggle completado debe cambiar el estado exactamente una vez: al
+    final un Pokémon es favorito si y solo si recibió un número impar de
+    toggles. Falla si la versión atómica (directa o por HTTP) da errores o
+    termina en un estado distinto; la versión anterior solo se informa.
+    """
+    import random
+
+    from django.db import connections
+
+    from .favorites import flip_favorite
+
+    lines = []
+    workers = options['workers']
+    toggles_per_worker = (options['sizes'] or [200])[0]
+    hot_pokemon = 5  # Pocos Pokémon: máxima contención
+
+    def http_toggle(client):
+        def toggle(pokemon):
+            response = client.post('/api/favorites/toggle/', {'pokemon_id': pokemon.pokemon_id},
+                                   content_type='application/json')
+            if response.status_code != 200:
+                raise RuntimeError(f'HTTP {response.status_code}')
+        return toggle
+
+    variants = [
+        ('leer y escribir', lambda: _legacy_toggle, False),
+        ('atómico', lambda: flip_favorite, True),
+        ('atómico por HTTP', lambda: http_toggle(Client()), True),
+    ]
+
+    failures = []
+    with scratch_database(on_disk=True), override_settings(ALLOWED_HOSTS=['*']):
+        seed_synthetic_pokemon(hot_pokemon)
+        pokemon_list = list(Pokemon.objects.all())
+
+        for label, make_toggle, must_pass in variants:
+            PokemonFavorite.objects.all().delete()
+            completed = {pokemon.pk: 0 for pokemon in pokemon_list}
+            errors = []
+            lock = threading.Lock()
+            barrier = threading.Barrier(workers)
+
+            def worker(seed):
+                toggle = make_toggle()
+                rng = random.Random(seed)
+                barrier.wait()
+                try:
+                    for _ in range(toggles_per_worker):
+                        pokemon = rng.choice(pokemon_list)
+                        try:
+                            toggle(pokemon)
+                        except Exception as exc:
+                            with lock:
+                                errors.append(type(exc).__name__)
+                        else:
+                            with lock:
+                                completed[pokemon.pk] += 1
+                finally:
+                    connections.close_all()
+
+            threads = [threading.Thread(target=worker, args=(seed,)) for seed in range(workers)]
+            started = time.perf_counter()
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            elapsed = time.perf_counter() - started
+
+            favorites = set(PokemonFavorite.objects.values_list('pokemon_id', flat=True))
+            wrong = [pk for pk, count in completed.items() if (pk in favorites) != (count % 2 == 1)]
+            total = sum(completed.values())
+            error_summary = ', '.join(f'{name} x{errors.count(name)}' for name in sorted(set(errors)))
+
+            ok = not errors and not wrong
+            if must_pass and not ok:
+                failures.append(label)
+            lines.append(
+                f'{label:<17} | {workers} hilos | {total:>5} toggles | {total / elapsed:8,.0f} toggles/s | '
+                f'{len(errors):>4} errores | {len(wrong)}/{hot_pokemon} estados finales incorrectos'
+                + (f' ({error_summary})' if error_summary else '')
+            )
+
+    if failures:
+        raise CommandError(f"Toggles no atómicos: {', '.join(failures)}")
+
+    return lines
+
+
+def bench_response_cache(options):
+    """
+    Caché de respuestas: primera petición (fallo) vs siguientes (acierto),
+    invalidación al cambiar los datos y peticiones simultáneas sin caché
+    """
+    lines = []
+    size = (options['sizes'] or [5000])[0]
+    urls = [
+        '/api/pokemon/?page_size=200',
+        '/api/pokemon/grass-type/?page_size=200',
+        '/api/pokemon/query/?types=flying&height_gt=10&ordering=-weight&page_size=200',
+        '/api/favorites/?page_size=200',
+    ]
+
+    with scratch_database(), override_settings(ALLOWED_HOSTS=['*']):
+        seed_synthetic_pokemon(size)
+        PokemonFavorite.objects.bulk_create(PokemonFavorite(pokemon=p) for p in Pokemon.objects.all()[:500])
+        bump_data_version()
+        client = Client()
+
+        for url in urls:
+            miss_ms, _ = timed(lambda: client.get(url), repeat=1)
+            hit_queries, _ = count_queries(lambda: client.get(url))
+            hit_ms, _ = timed(lambda: client.get(url))
+            lines.append(
+                f'{url:<78} | fallo {miss_ms:7.2f} ms | acierto {hit_ms:6.2f} ms '
+                f'({hit_queries} consultas)'
+            )
+
+        # Una escritura invalida todo: la siguiente petición vuelve a calcular
+        client.post('/api/favorites/toggle/', {'pokemon_id': size}, content_type='application/json')
+        response = client.get(urls[0])
+        lines.append(f"Tras marcar un favorito: X-Cache={response['X-Cache']}")
+
+        # Estampida: N peticiones simultáneas a una URL sin caché
+        bump_data_version()
+        response_cache_stats.reset()
+        threads = [
+            threading.Thread(target=lambda: Client().get(urls[2]))
+            for _ in range(options['workers'])
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        lines.append(
+            f'{len(threads)} peticiones simultáneas: {response_cache_stats.misses} cálculo(s), '
+            f'{response_cache_stats.hits} servidas desde la caché '
+            f'({response_cache_stats.waits} esperaron)'
+        )
+        lines.append(f'Métricas: {response_cache_stats.as_dict()}')
+
+    return lines
+
+
+class RevalidatingClient:
+    """
+    Cliente de prueba que se comporta como la caché del navegador: guarda el
+    ETag de cada URL y lo envía en If-None-Match la siguiente vez
+    """
+
+    def __init__(self, conditional=True):
+        self.client = Client()
+        self.conditional = conditional
+        self.etags = {}
+        self.bytes_received = 0
+        self.not_modified = 0
+
+    def get(self, url):
+        headers = {}
+        if self.conditional and url in self.etags:
+            headers['HTTP_IF_NONE_MATCH'] = self.etags[url]
+
+        response = self.client.get(url, **headers)
+        self.bytes_received += len(response.content)
+        if response.status_code == 304:
+            self.not_modified += 1
+        elif response.has_header('ETag'):
+            self.etags[url] = response['ETag']
+        return response
+
+    def post(self, url, data):
+        return self.client.post(url, data, content_type='application/json')
+
+
+def bench_conditional_get(options):
+    """
+    Bytes transferidos en una sesión típica del frontend: siempre 200
+    (antes) vs revalidación con ETag / 304 (después)
+    """
+    lines = []
+    size = (options['sizes'] or [1025])[0]
+
+    # Clics del usuario: filtros, favoritos y vuelta a la tabla principal
+    session = [
+        ('get', '/api/pokemon/'), ('get', '/api/favorites/'),
+        ('get', '/api/pokemon/weight-filter/'), ('get', '/api/pokemon/grass-type/'),
+        ('get', '/api/pokemon/flying-tall/'), ('get', '/api/pokemon/'),
+        ('post', '/api/favorites/toggle/'), ('get', '/api/favorites/'),
+        ('get', '/api/pokemon/grass-type/'), ('get', '/api/pokemon/'),
+        ('get', '/api/pokemon/weight-filter/'), ('get', '/api/favorites/'),
+        ('get', '/api/pokemon/'), ('get', '/api/pokemon/flying-tall/'),
+    ]
+
+    with scratch_database(), override_settings(ALLOWED_HOSTS=['*']):
+        seed_synthetic_pokemon(size)
+
+        for label, conditional in (('siempre 200', False), ('ETag / 304', True)):
+            client = RevalidatingClient(conditional=conditional)
+            for method, url in session:
+                if method == 'post':
+                    client.post(url, {'pokemon_id': 25})
+                else:
+                    client.get(url)
+
+            requests_count = sum(1 for method, _ in session if method == 'get')
+            lines.append(
+                f'{label:<12} | {requests_count} GET | {client.not_modified:>2} respuestas 304 | '
+                f'{client.bytes_received:>8} bytes recibidos'
+            )
+
+    return lines
+
+
+def bench_serialization(options):
+    """
+    Microbenchmark de serialización de listados (filas/s)
+
+    DRF: PokemonBasicSerializer sobre modelos + JSONRenderer
+    Rápido: pokemon_basic_rows sobre .values() + FastJSONRenderer (orjson y,
+    sin orjson, json estándar). Falla si los bytes no son idénticos.
+    """
+    from rest_framework.renderers import JSONRenderer
+
+    from . import renderers
+    from .queries import columns_for_fields
+    from .serializers import (
+        PokemonBasicSerializer, PokemonFavoriteSerializer, favorite_rows, pokemon_basic_rows,
+    )
+
+    lines = []
+    failures = []
+    basic_fields = PokemonBasicSerializer.Meta.fields
+    columns = sorted(columns_for_fields(basic_fields))
+    favorite_columns = ['id', 'created_at'] + [f'pokemon__{column}' for column in columns]
+
+    def envelope(results):
+        return {'count': len(results), 'next': None, 'previous': None, 'results': results,
+                'message': 'Encontrados Pokémon – “prueba”'}
+
+    for size in options['sizes'] or [50, 1000, 10000]:
+        with scratch_database():
+            seed_synthetic_pokemon(size)
+            # Nombres con caracteres que el JSON escapa distinto según el codificador
+            Pokemon.objects.filter(pokemon_id=1).update(name='nidoran♀ "x"\\ \u2028\u2029 é😀')
+            Pokemon.objects.filter(pokemon_id=2).update(name='mr-mime\x00\x1f\t', types=[])
+            PokemonFavorite.objects.bulk_create(PokemonFavorite(pokemon=p) for p in Pokemon.objects.all())
+
+            objects = list(Pokemon.objects.order_by('pokemon_id'))
+            rows = list(Pokemon.objects.order_by('pokemon_id').values(*columns))
+            favorites = list(PokemonFavorite.objects.select_related('pokemon').order_by('-created_at'))
+            favorite_values = list(PokemonFavorite.objects.order_by('-created_at').values(*favorite_columns))
+
+            cases = [
+                ('pokemon', lambda: JSONRenderer().render(envelope(
+                    PokemonBasicSerializer(objects, many=True).data)),
+                 lambda: renderers.FastJSONRenderer().render(envelope(pokemon_basic_rows(rows)))),
+                ('pokemon fields', lambda: JSONRenderer().render(envelope(
+                    PokemonBasicSerializer(objects, many=True, fields=['name', 'types_display']).data)),
+                 lambda: renderers.FastJSONRenderer().render(envelope(
+                     pokemon_basic_rows(rows, ['name', 'types_display'])))),
+                ('favoritos', lambda: JSONRenderer().render(envelope(
+                    PokemonFavoriteSerializer(favorites, many=True).data)),
+                 lambda: renderers.FastJSONRenderer().render(envelope(favorite_rows(favorite_values)))),
+            ]
+
+            for name, drf_render, fast_render in cases:
+                drf_ms, expected = timed(drf_render, repeat=3)
+                results = [('DRF', drf_ms, expected)]
+
+                orjson_module = renderers.orjson
+                for label, module in (('orjson', orjson_module), ('json', None)):
+                    if label == 'orjson' and module is None:
+                        continue
+                    renderers.orjson = module
+                    try:
+                        fast_ms, body = timed(fast_render, repeat=3)
+                    finally:
+                        renderers.orjson = orjson_module
+                    results.append((f'rápido/{label}', fast_ms, body))
+
+                for label, elapsed_ms, body in results:
+                    identical = body == expected
+                    if not identical:
+                        failures.append(f'{name} {label} ({size} filas)')
+                    lines.append(
+                        f'{size:>6} filas | {name:<14} | {label:<13} | {elapsed_ms:9.2f} ms | '
+                        f"{size / (elapsed_ms / 1000):>11,.0f} filas/s | "
+                        f"{'bytes idénticos' if identical else 'BYTES DIFERENTES'}"
+                    )
+
+    if failures:
+        raise CommandError(f"Salida distinta de la de DRF: {', '.join(failures)}")
+
+    return lines
+
+
+def _consume_stream(response):
+    """Lee una StreamingHttpResponse trozo a trozo sin guardarla: (bytes, saltos de línea)"""
+    total_bytes = 0
+    newlines = 0
+    for chunk in response.streaming_content:
+        total_bytes += len(chunk)
+        newlines += chunk.count(b'\n')
+    return total_bytes, newlines
+
+
+def _peak_memory(func):
+    """Ejecuta func y devuelve (pico de memoria reservada en MB, resultado)"""
+    tracemalloc.start()
+    try:
+        result = func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak / (1024 * 1024), result
+
+
+def bench_export(options):
+    """
+    Exportación en streaming: tiempo, bytes y pico de memoria por tamaño de tabla
+
+    El pico de memoria de /export/ debe mantenerse plano al crecer la tabla;
+    como referencia se mide el mismo contenido armado en un único JSON.
+    Falla si no salen todas las filas.
+    """
+    from .renderers import FastJSONRenderer
+    from .queries import values_for_fields
+    from .serializers import PokemonBasicSerializer, pokemon_basic_rows
+
+    lines = []
+    failures = []
+    cases = [
+        ('ndjson', '/api/pokemon/export/', {}),
+        ('ndjson gzip', '/api/pokemon/export/', {'HTTP_ACCEPT_ENCODING': 'gzip'}),
+        ('csv', '/api/pokemon/export/?output=csv', {}),
+        ('favoritos ndjson', '/api/favorites/export/', {}),
+    ]
+
+    def full_json():
+        rows = values_for_fields(Pokemon.objects.order_by('pokemon_id'), PokemonBasicSerializer.Meta.fields)
+        return len(FastJSONRenderer().render({'results': pokemon_basic_rows(rows)}))
+
+    for size in options['sizes'] or [1000, 10000, 50000]:
+        with scratch_database(), override_settings(ALLOWED_HOSTS=['*']):
+            seed_synthetic_pokemon(size)
+            PokemonFavorite.objects.bulk_create(PokemonFavorite(pokemon=p) for p in Pokemon.objects.all())
+            client = Client()
+
+            for name, url, headers in cases:
+                started = time.perf_counter()
+                peak_mb, (total_bytes, newlines) = _peak_memory(
+                    lambda: _consume_stream(client.get(url, **headers))
+                )
+                elapsed_ms = (time.perf_counter() - started) * 1000
+
+                # El gzip no deja ver las líneas; el CSV lleva una de cabecera
+                expected = None if 'gzip' in name else size + (name == 'csv')
+                complete = expected is None or newlines == expected
+                if not complete:
+                    failures.append(f'{name} ({size} filas)')
+                lines.append(
+                    f'{size:>6} filas | {name:<16} | {elapsed_ms:9.2f} ms | {total_bytes:>11,} bytes | '
+                    f"pico {peak_mb:6.2f} MB | {'OK' if complete else 'FILAS INCOMPLETAS'}"
+                )
+
+            started = time.perf_counter()
+            peak_mb, total_bytes = _peak_memory(full_json)
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            lines.append(
+                f"{size:>6} filas | {'JSON completo':<16} | {elapsed_ms:9.2f} ms | {total_bytes:>11,} bytes | "
+                f'pico {peak_mb:6.2f} MB | referencia'
+            )
+
+    if failures:
+        raise CommandError(f"Exportación incompleta: {', '.join(failures)}")
+
+    return lines
+
+
+def _percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[int(fraction * (len(ordered) - 1))]
+
+
+def _wsgi_load(path, total, workers):
+    """total peticiones GET con N hilos (un Client WSGI por hilo): (segundos, latencias, estados)"""
+    latencies, statuses = [], []
+    lock = threading.Lock()
+
+    def worker(count):
+        client = Client()
+        for _ in range(count):
+            started = time.perf_counter()
+            response = client.get(path)
+            with lock:
+                latencies.append(time.perf_counter() - started)
+                statuses.append(response.status_code)
+
+    threads = [threading.Thread(target=worker, args=(total // workers,)) for _ in range(workers)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return time.perf_counter() - started, latencies, statuses
+
+
+def _asgi_load(path, total, workers):
+    """total peticiones GET con N en vuelo a la vez por el handler ASGI: (segundos, latencias, estados)"""
+    import asyncio
+
+    latencies, statuses = [], []
+
+    async def worker(count):
+        client = AsyncClient()
+        for _ in range(count):
+            started = time.perf_counter()
+            response = await client.get(path)
+            latencies.append(time.perf_counter() - started)
+            statuses.append(response.status_code)
+
+    async def run():
+        started = time.perf_counter()
+        await asyncio.gather(*(worker(total // workers) for _ in range(workers)))
+        return time.perf_counter() - started
+
+    return asyncio.run(run()), latencies, statuses
+
+
+def bench_asgi(options):
+    """
+    Prueba de carga WSGI vs ASGI (en proceso, sin servidor HTTP)
+
+    - WSGI: vistas sync de DRF, N hilos con el Client de Django
+    - ASGI vista sync: las mismas vistas por el handler ASGI (cada una en un hilo)
+    - ASGI vista async: /api/async/... (async_views.py, ORM async)
+
+    Sin caché de respuestas: se mide el camino completo hasta la base de datos.
+    """
+    from django.db import connections
+
+    lines = []
+    size = (options['sizes'] or [2000])[0]
+    workers = options['workers']
+    total = workers * 50
+    paths = [
+        '/pokemon/?page_size=50',
+        '/pokemon/grass-type/',
+        '/pokemon/query/?types=flying&height_gt=10&ordering=-weight',
+        '/pokemon/1/',
+        f"/favorites/status/?ids={','.join(str(pokemon_id) for pokemon_id in range(1, 51))}",
+    ]
+
+    failures = []
+    with scratch_database(on_disk=True), override_settings(ALLOWED_HOSTS=['*'], **NO_RESPONSE_CACHE):
+        seed_synthetic_pokemon(size)
+        PokemonFavorite.objects.bulk_create(PokemonFavorite(pokemon=p) for p in Pokemon.objects.all()[:500])
+        lines.append(f'{size} Pokémon | {total} peticiones por caso | {workers} en vuelo')
+
+        for path in paths:
+            cases = [
+                ('WSGI vista sync', _wsgi_load, f'/api{path}'),
+                ('ASGI vista sync', _asgi_load, f'/api{path}'),
+                ('ASGI vista async', _asgi_load, f'/api/async{path}'),
+            ]
+            lines.append(path)
+            for label, load, url in cases:
+                load(url, workers, workers)  # Calentamiento (conexiones, cachés de Python)
+                elapsed, latencies, statuses = load(url, total, workers)
+                if set(statuses) != {200}:
+                    failures.append(f'{label} {url}')
+                lines.append(
+                    f'    {label:<17} | {len(latencies) / elapsed:8.1f} req/s | '
+                    f'p50 {_percentile(latencies, 0.5) * 1000:7.2f} ms | '
+                    f'p99 {_percentile(latencies, 0.99) * 1000:7.2f} ms'
+                )
+        connections.close_all()
+
+    if failures:
+        raise CommandError(f"Respuestas distintas de 200: {', '.join(failures)}")
+
+    return lines
+
+
+def bench_incremental(options):
+    """
+    Sincronización incremental: recarga completa vs incremental y feed de cambios
+
+    Falla si la carga incremental pide Pokémon al día, si escribe filas sin
+    cambios o si el feed ?since= no devuelve exactamente lo que cambió.
+    """
+    import random
+
+    from django.db.models.functions import Now
+
+    from .loader import LoadSpec, run_load
+    from .models import current_change_version
+
+    lines = []
+    failures = []
+    size = (options['sizes'] or [500])[0]
+    spec = LoadSpec(start=1, end=size)
+    rng = random.Random(size)
+
+    def load(label, max_age=None):
+        requests_before = stub.requests_served
+        with PokeAPIClient(base_url=stub.base_url, max_workers=options['workers'],
+                           backoff_factor=0.01, deadline=3600, cache=False) as client:
+            summary = run_load(LoadSpec(start=1, end=size, max_age=max_age), resume=False, client=client)
+        requested = stub.requests_served - requests_before
+        lines.append(
+            f'{label:<35} | {summary.elapsed:6.2f} s | {requested:>5} peticiones | '
+            f'{summary.fresh:>5} al día | {summary.inserted:>4} nuevos | {summary.updated:>4} actualizados | '
+            f'{summary.unchanged:>5} sin cambios'
+        )
+        return summary, requested
+
+    with StubPokeAPIServer(latency=options['latency']) as stub, scratch_database(), \
+            override_settings(ALLOWED_HOSTS=['*'], POKEDEX_SPRITES={'ENABLED': False}, **NO_RESPONSE_CACHE):
+        lines.append(f"Stub en {stub.base_url} (latencia {options['latency'] * 1000:.0f} ms) | {spec.describe()}")
+
+        load('carga inicial')
+        load('recarga completa')
+
+        summary, requested = load('incremental (todo al día)', max_age=3600)
+        if requested:
+            failures.append(f'la incremental pidió {requested} Pokémon al día')
+
+        # Algunos quedan viejos y otros desaparecen: solo esos se piden
+        ids = list(range(1, size + 1))
+        stale = rng.sample(ids, size // 10)
+        missing = rng.sample(sorted(set(ids) - set(stale)), size // 20)
+        Pokemon.objects.filter(pokemon_id__in=stale).update(last_synced_at=Now() - timedelta(days=30))
+        Pokemon.objects.filter(pokemon_id__in=missing).delete()
+        summary, requested = load('incremental (10% viejos, 5% faltan)', max_age=3600)
+        if requested != len(stale) + len(missing):
+            failures.append(f'{requested} peticiones para {len(stale) + len(missing)} desactualizados')
+        if summary.updated:
+            failures.append(f'{summary.updated} filas reescritas sin cambios')
+
+        # La PokéAPI cambia algunos Pokémon: el feed devuelve solo esos
+        version_before = current_change_version()
+        changed = set(rng.sample(ids, size // 25))
+        stub.revisions.update({pokemon_id: 2 for pokemon_id in changed})
+        summary, _ = load('incremental (max_age=0)', max_age=0)
+        if summary.updated != len(changed):
+            failures.append(f'{summary.updated} filas actualizadas de {len(changed)} cambiadas')
+
+        client = Client()
+        seen = []
+        pages = 0
+        url = f'/api/pokemon/changes/?since={version_before}&page_size=7'
+        while url:
+            data = client.get(url).json()
+            seen.extend(row['pokemon_id'] for row in data['results'])
+            url = data['next']
+            pages += 1
+        version_after = data['version']
+        empty = client.get(f'/api/pokemon/changes/?since={version_after}').json()
+
+        feed_ok = sorted(seen) == sorted(changed) and not empty['results']
+        if not feed_ok:
+            failures.append(f'el feed devolvió {len(seen)} Pokémon de {len(changed)} cambiados')
+        lines.append(
+            f'feed ?since={version_before}: {len(seen)} Pokémon en {pages} páginas (cambiaron {len(changed)}) | '
+            f"?since={version_after}: {len(empty['results'])} | {'OK' if feed_ok else 'DIFERENTES'}"
+        )
+
+    if failures:
+        raise CommandError(f"Sincronización incremental: {', '.join(failures)}")
+
+    return lines
+
+
+def bench_snapshot(options):
+    """
+    Snapshots: carga desde la PokéAPI (stub) vs importar un snapshot, y
+    el snapshot como fuente del loader
+
+    Falla si la importación no reproduce los mismos datos y favoritos, si
+    alguna carga desde el snapshot hace peticiones de red o si un snapshot
+    modificado o truncado no se rechaza.
+    """
+    import gzip
+    import os
+
+    from .loader import LoadSpec, run_load
+    from .snapshots import SnapshotClient, SnapshotError, export_snapshot, import_snapshot, read_snapshot
+
+    lines = []
+    failures = []
+    size = (options['sizes'] or [2000])[0]
+
+    def fingerprint():
+        return (
+            dict(Pokemon.objects.values_list('pokemon_id', 'payload_hash')),
+            dict(PokemonFavorite.objects.values_list('pokemon__pokemon_id', 'created_at')),
+        )
+
+    def reset():
+        PokemonFavorite.objects.all().delete()
+        Pokemon.objects.all().delete()
+
+    with StubPokeAPIServer(latency=options['latency']) as stub, scratch_database(), \
+            tempfile.TemporaryDirectory() as directory, \
+            override_settings(POKEDEX_SPRITES={'ENABLED': False}, **NO_RESPONSE_CACHE):
+        path = os.path.join(directory, 'pokedex.ndjson.gz')
+        lines.append(f"Stub en {stub.base_url} (latencia {options['latency'] * 1000:.0f} ms) | {size} Pokémon")
+
+        with PokeAPIClient(base_url=stub.base_url, max_workers=options['workers'],
+                           backoff_factor=0.01, deadline=3600, cache=False) as client:
+            summary = run_load(LoadSpec(start=1, end=size), resume=False, client=client)
+        lines.append(f'{"carga desde la PokéAPI (stub)":<30} | {summary.elapsed:7.2f} s | '
+                     f'{stub.requests_served:>6} peticiones')
+
+        for pokemon in Pokemon.objects.order_by('pokemon_id')[:size:max(size // 20, 1)]:
+            PokemonFavorite.objects.create(pokemon=pokemon)
+        expected = fingerprint()
+
+        started = time.perf_counter()
+        info = export_snapshot(path)
+        export_elapsed = time.perf_counter() - started
+        with gzip.open(path, 'rb') as f:
+            raw_size = len(f.read())
+        lines.append(
+            f'{"export_snapshot":<30} | {export_elapsed:7.2f} s | {info.size_bytes / 1024:8.0f} KB '
+            f'({raw_size / 1024:.0f} KB sin comprimir, {info.size_bytes / size:.0f} B/Pokémon) | '
+            f"{info.counts['favorite']} favoritos"
+        )
+
+        requests_before = stub.requests_served
+        reset()
+        result = import_snapshot(path)
+        lines.append(f'{"import_snapshot (vacía)":<30} | {result.elapsed:7.2f} s | '
+                     f'{result.inserted:>6} nuevos | {result.favorites_added} favoritos')
+        if fingerprint() != expected:
+            failures.append('la importación no reproduce los datos exportados')
+
+        result = import_snapshot(path)
+        lines.append(f'{"import_snapshot (repetido)":<30} | {result.elapsed:7.2f} s | '
+                     f'{result.unchanged:>6} sin cambios | {result.favorites_added} favoritos')
+        if result.inserted or result.updated or result.favorites_added:
+            failures.append('reimportar el mismo snapshot escribió filas')
+
+        reset()
+        with SnapshotClient(path) as client:
+            summary = run_load(LoadSpec(all=True), resume=False, client=client)
+        lines.append(f'{"run_load --all --snapshot":<30} | {summary.elapsed:7.2f} s | '
+                     f'{summary.inserted:>6} nuevos | {len(summary.errors)} errores')
+        if summary.inserted != size:
+            failures.append(f'el loader cargó {summary.inserted} de {size} desde el snapshot')
+
+        network = stub.requests_served - requests_before
+        if network:
+            failures.append(f'{network} peticiones de red cargando desde el snapshot')
+
+        # Un byte cambiado o un archivo cortado: se rechaza sin escribir nada
+        with gzip.open(path, 'rb') as f:
+            content = f.read()
+        tampered = os.path.join(directory, 'tampered.ndjson.gz')
+        truncated = os.path.join(directory, 'truncated.ndjson.gz')
+        with gzip.open(tampered, 'wb') as f:
+            f.write(content.replace(b'"weight":', b'"weight":1', 1))
+        with open(path, 'rb') as source, open(truncated, 'wb') as f:
+            f.write(source.read()[:info.size_bytes // 2])
+
+        reset()
+        for label, candidate in [('modificado', tampered), ('truncado', truncated)]:
+            try:
+                import_snapshot(candidate)
+            except SnapshotError as e:
+                lines.append(f'snapshot {label:<21} | rechazado: {e}'.replace(directory + '/', ''))
+            else:
+                failures.append(f'se importó un snapshot {label}')
+        if Pokemon.objects.exists():
+            failures.append('un snapshot rechazado dejó filas en la base de datos')
+
+        read_snapshot(path)
+        lines.append(f"{network} peticiones de red en las cargas desde el snapshot | sha256 {info.sha256[:12]}")
+
+    if failures:
+        raise CommandError(f"Snapshots: {', '.join(failures)}")
+
+    return lines
+
+
+def bench_sprites(options):
+    """
+    Copia local de sprites: secuencial vs concurrente, recarga sin cambios,
+    sprites cambiados y cabeceras de /sprites/
+
+    Falla si la recarga descarga algo, si no se vuelven a descargar
+    exactamente los sprites cambiados o si la vista no responde immutable / 304.
+    """
+    from .sprites import Image, SpriteStore, mirror_sprites
+
+    lines = []
+    failures = []
+    size = (options['sizes'] or [200])[0]
+    workers = options['workers']
+
+    with StubPokeAPIServer(latency=options['latency'], fail_every=options['fail_every']) as stub, \
+            scratch_database(), override_settings(ALLOWED_HOSTS=['*'], **NO_RESPONSE_CACHE):
+        lines.append(f"Stub en {stub.base_url} (latencia {options['latency'] * 1000:.0f} ms) | "
+                     f"Pillow {'sí (WebP)' if Image else 'no (originales PNG)'}")
+        seed_synthetic_pokemon(size)
+        for pokemon in Pokemon.objects.only('pk', 'pokemon_id'):
+            Pokemon.objects.filter(pk=pokemon.pk).update(
+                sprite_url=f'{stub.base_url}/sprites/{pokemon.pokemon_id}.png'
+            )
+
+        for label, max_workers in [('secuencial', 1), (f'concurrente x{workers}', workers)]:
+            Pokemon.objects.update(sprite_source=None, sprite_local_url=None)
+            with tempfile.TemporaryDirectory() as directory, \
+                    PokeAPIClient(base_url=stub.base_url, max_workers=max_workers,
+                                  backoff_factor=0.01, deadline=3600, cache=False) as client:
+                store = SpriteStore(directory)
+                result = mirror_sprites(client=client, store=store)
+                disk = store.stats()
+            lines.append(
+                f'{label:<15} | {result.elapsed:6.2f} s | {result.mirrored:>5} Pokémon | '
+                f'{result.downloads:>5} descargas | {disk["files"]:>3} archivos en disco '
+                f'({disk["size_bytes"] / 1024:.0f} KB) | errores: {len(result.errors)}'
+            )
+
+        with tempfile.TemporaryDirectory() as directory, \
+                PokeAPIClient(base_url=stub.base_url, max_workers=workers,
+                              backoff_factor=0.01, deadline=3600, cache=False) as client:
+            store = SpriteStore(directory)
+            sprites_settings = {'DIR': directory, 'URL': store.url_prefix}
+            Pokemon.objects.update(sprite_source=None, sprite_local_url=None)
+            mirror_sprites(client=client, store=store)
+
+            # Recarga sin cambios: nada que descargar
+            requests_before = stub.requests_served
+            again = mirror_sprites(client=client, store=store)
+            downloaded = stub.requests_served - requests_before
+            if downloaded:
+                failures.append(f'la recarga descargó {downloaded} sprites')
+            lines.append(f'recarga sin cambios | {again.elapsed * 1000:6.1f} ms | '
+                         f'{again.up_to_date} al día | {downloaded} descargas')
+
+            # La PokéAPI cambia algunos sprites: solo esos se descargan
+            changed = list(Pokemon.objects.order_by('pokemon_id').values_list('pokemon_id', flat=True)[:10])
+            for pokemon_id in changed:
+                Pokemon.objects.filter(pokemon_id=pokemon_id).update(
+                    sprite_url=f'{stub.base_url}/sprites/{pokemon_id + SPRITE_VARIANTS // 2}.png'
+                )
+            updated = mirror_sprites(client=client, store=store)
+            if updated.mirrored != len(changed):
+                failures.append(f'{updated.mirrored} sprites actualizados de {len(changed)} cambiados')
+            lines.append(f'sprites cambiados   | {updated.mirrored} actualizados de {len(changed)} | '
+                         f'{updated.up_to_date} sin tocar')
+
+            # La API devuelve la URL local y la vista la sirve como immutable
+            with override_settings(POKEDEX_SPRITES=sprites_settings):
+                client_http = Client()
+                row = client_http.get('/api/pokemon/?page_size=1').json()['results'][0]
+                response = client_http.get(row['sprite_local_url'])
+                body = b''.join(response.streaming_content) if response.status_code == 200 else b''
+                cache_control = response.get('Cache-Control', '')
+                not_modified = client_http.get(row['sprite_local_url'], HTTP_IF_NONE_MATCH=response.get('ETag', ''))
+                if response.status_code != 200 or 'immutable' not in cache_control or not body:
+                    failures.append(f'GET {row["sprite_local_url"]} -> {response.status_code}')
+                if not_modified.status_code != 304:
+                    failures.append(f'If-None-Match -> {not_modified.status_code}')
+                lines.append(f"API: sprite_local_url={row['sprite_local_url']}")
+                lines.append(f"     {response.status_code} {response.get('Content-Type')} | {len(body)} bytes | "
+                             f"Cache-Control: {cache_control} | If-None-Match -> {not_modified.status_code}")
+
+    if failures:
+        raise CommandError(f"Sprites: {', '.join(failures)}")
+
+    return lines
+
+
+SCENARIOS = {
+    'ingestion': bench_ingestion,
+    'http-cache': bench_http_cache,
+    'filters': bench_filters,
+    'memory-index': bench_memory_index,
+    'search': bench_search,
+    'explain': bench_explain,
+    'favorites': bench_favorites,
+    'favorite-races': bench_favorite_races,
+    'response-cache': bench_response_cache,
+    'conditional-get': bench_conditional_get,
+    'serialization': bench_serialization,
+    'export': bench_export,
+    'asgi': bench_asgi,
+    'sprites': bench_sprites,
+    'incremental': bench_incremental,
+    'snapshot': bench_snapshot,
+}
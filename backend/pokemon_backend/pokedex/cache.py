@@ -0,0 +1,296 @@
+"""
+Caché de respuestas de la API con invalidación por versión de datos
+
+Los listados y filtros solo cambian cuando hay una carga desde la PokéAPI
+o cuando se marca/desmarca un favorito, así que se guardan ya renderizados
+en la caché de Django (locmem o archivos, sin servicios externos):
+- La clave incluye la versión global de los datos + la URL completa
+- La versión vive en la base de datos (filas de ChangeCounter), no en la
+  caché del proceso: una escritura desde otro proceso (un comando, otro
+  worker, el shell) también invalida. Leerla es una consulta por petición
+- Cada escritura sube la versión: las respuestas anteriores quedan
+  huérfanas y expiran solas (no hay que borrarlas una por una)
+- Si varias peticiones fallan a la vez, solo una calcula la respuesta;
+  las demás esperan a que aparezca en la caché (protección anti-estampida)
+- Contadores de aciertos, fallos y bytes para ver el efecto
+
+Además, CacheControlMixin pone Cache-Control por endpoint; el ETag y los
+304 los resuelve ConditionalGetMiddleware (las respuestas guardadas ya
+llevan su ETag, así que no se vuelve a calcular el hash).
+"""
+
+import hashlib
+import threading
+import time
+from functools import wraps
+from urllib.parse import urlencode
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.db.models import F, Sum
+from django.http import HttpResponse
+from django.utils.cache import patch_cache_control, set_response_etag
+
+
+# CONFIGURACIÓN POR DEFECTO (se puede sobrescribir con settings.POKEDEX_RESPONSE_CACHE)
+
+DEFAULT_RESPONSE_CACHE_SETTINGS = {
+    'ENABLED': True,
+    'CACHE_ALIAS': 'default',  # Entrada de settings.CACHES
+    'TIMEOUT': 3600,           # Segundos que se guarda cada respuesta
+    'LOCK_TIMEOUT': 10,        # Máximo que se espera a otra petición que ya calcula
+    'LOCK_POLL_INTERVAL': 0.02,
+}
+
+def get_response_cache_settings():
+    """Combina los valores por defecto con settings.POKEDEX_RESPONSE_CACHE"""
+    config = dict(DEFAULT_RESPONSE_CACHE_SETTINGS)
+    config.update(getattr(settings, 'POKEDEX_RESPONSE_CACHE', {}))
+    return config
+
+
+def _cache():
+    return caches[get_response_cache_settings()['CACHE_ALIAS']]
+
+
+# VERSIÓN DE LOS DATOS
+
+
+def get_data_version():
+    """
+    Versión actual de los datos (cambia con cada carga o favorito)
+
+    Suma de los contadores de cambios de los Pokémon y del resto de datos:
+    los dos solo crecen, así que la suma nunca repite una versión anterior.
+    """
+    from .models import DATA_CHANGES, POKEMON_CHANGES, ChangeCounter
+
+    counters = ChangeCounter.objects.filter(name__in=[POKEMON_CHANGES, DATA_CHANGES])
+    return counters.aggregate(version=Sum('value'))['version'] or 0
+
+
+def bump_data_version():
+    """Invalida todas las respuestas guardadas (en todos los procesos)"""
+    from .models import DATA_CHANGES, ChangeCounter
+
+    counter = ChangeCounter.objects.filter(name=DATA_CHANGES)
+    if not counter.update(value=F('value') + 1):
+        # Sin la fila (base de datos nueva o vaciada) se parte de la hora
+        # actual en ms: nunca coincide con una versión anterior
+        ChangeCounter.objects.get_or_create(name=DATA_CHANGES, defaults={'value': int(time.time() * 1000)})
+        counter.update(value=F('value') + 1)
+
+
+def invalidate_on_commit():
+    """
+    Sube la versión cuando la transacción actual confirme los cambios
+    (de inmediato si no hay transacción abierta)
+    """
+    transaction.on_commit(bump_data_version)
+
+
+# MÉTRICAS
+
+
+class ResponseCacheStats:
+    """Contadores del proceso actual"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        self.hits = 0
+        self.misses = 0
+        self.waits = 0           # Peticiones que esperaron a otra (estampida evitada)
+        self.bytes_stored = 0    # Bytes guardados en la caché
+        self.bytes_served = 0    # Bytes servidos desde la caché
+
+    def record(self, **counters):
+        with self._lock:
+            for name, value in counters.items():
+                setattr(self, name, getattr(self, name) + value)
+
+    def as_dict(self):
+        config = get_response_cache_settings()
+        total = self.hits + self.misses
+        return {
+            'enabled': config['ENABLED'],
+            'data_version': get_data_version(),
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_ratio': round(self.hits / total, 3) if total else 0.0,
+            'stampede_waits': self.waits,
+            'bytes_stored': self.bytes_stored,
+            'bytes_served': self.bytes_served,
+            'timeout_seconds': config['TIMEOUT'],
+        }
+
+
+response_cache_stats = ResponseCacheStats()
+
+
+# CACHÉ DE RESPUESTAS
+
+
+def response_cache_key(request):
+    """Versión de los datos + URL absoluta con los parámetros ordenados"""
+    query = urlencode(sorted(request.GET.lists()), doseq=True)
+    url = f'{request.build_absolute_uri(request.path)}?{query}'
+    digest = hashlib.sha1(url.encode()).hexdigest()
+    return f'pokedex:response:{get_data_version()}:{digest}'
+
+
+def _to_http_response(entry):
+    response = HttpResponse(entry['content'], status=entry['status'], content_type=entry['content_type'])
+    response['ETag'] = entry['etag']
+    response['X-Cache'] = 'HIT'
+    return response
+
+
+def _wait_for_entry(cache, key, config):
+    """Espera a que otra petición guarde la respuesta (o a que suelte el lock)"""
+    deadline = time.monotonic() + config['LOCK_TIMEOUT']
+    while time.monotonic() < deadline:
+        entry = cache.get(key)
+        if entry is not None:
+            return entry
+        if cache.get(f'{key}:lock') is None:
+            return None
+        time.sleep(config['LOCK_POLL_INTERVAL'])
+    return None
+
+
+def _lookup(request, config):
+    """
+    (clave, entrada guardada o None, si esta petición tiene el lock)
+
+    Si la respuesta no está y otra petición ya la calcula, espera a que la
+    guarde (protección anti-estampida).
+    """
+    cache = _cache()
+    key = response_cache_key(request)
+
+    entry = cache.get(key)
+    owns_lock = False
+    if entry is None:
+        owns_lock = cache.add(f'{key}:lock', 1, timeout=config['LOCK_TIMEOUT'])
+        if not owns_lock:
+            # Otra petición ya está calculando esta misma respuesta
+            response_cache_stats.record(waits=1)
+            entry = _wait_for_entry(cache, key, config)
+
+    if entry is not None:
+        response_cache_stats.record(hits=1, bytes_served=len(entry['content']))
+    return key, entry, owns_lock
+
+
+def _store(key, response, owns_lock, config):
+    """
+    Guarda la respuesta ya renderizada (solo las 200) y suelta el lock
+
+    response es None si la vista lanzó una excepción: solo se suelta el lock.
+    """
+    cache = _cache()
+    try:
+        if response is not None and response.status_code == 200:
+            set_response_etag(response)
+            cache.set(key, {
+                'content': response.content,
+                'status': response.status_code,
+                'content_type': response['Content-Type'],
+                'etag': response['ETag'],
+            }, timeout=config['TIMEOUT'])
+            response_cache_stats.record(bytes_stored=len(response.content))
+            response['X-Cache'] = 'MISS'
+    finally:
+        if owns_lock:
+            cache.delete(f'{key}:lock')
+
+    if response is not None:
+        response_cache_stats.record(misses=1)
+
+
+def cache_response(view_method):
+    """
+    Decorador para acciones GET de un ViewSet: guarda la respuesta
+    renderizada (solo las 200) y la sirve con una sola consulta (la
+    versión de los datos)
+    """
+
+    @wraps(view_method)
+    def wrapper(viewset, request, *args, **kwargs):
+        config = get_response_cache_settings()
+        if not config['ENABLED']:
+            return view_method(viewset, request, *args, **kwargs)
+
+        key, entry, owns_lock = _lookup(request, config)
+        if entry is not None:
+            return _to_http_response(entry)
+
+        response = None
+        try:
+            rendered = view_method(viewset, request, *args, **kwargs)
+            if rendered.status_code == 200:
+                rendered = viewset.finalize_response(request, rendered, *args, **kwargs)
+                rendered.render()
+            response = rendered
+        finally:
+            _store(key, response, owns_lock, config)
+        return response
+
+    return wrapper
+
+
+def acache_response(view):
+    """
+    Lo mismo que cache_response para vistas async (async_views.py), con las
+    mismas entradas y contadores. La caché y la versión de los datos se
+    leen en un hilo (sync_to_async); la vista debe devolver un
+    HttpResponse ya renderizado.
+    """
+
+    @wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        config = get_response_cache_settings()
+        if not config['ENABLED']:
+            return await view(request, *args, **kwargs)
+
+        key, entry, owns_lock = await sync_to_async(_lookup)(request, config)
+        if entry is not None:
+            response = _to_http_response(entry)
+            # Las vistas de DRF lo ponen en finalize_response (CacheControlMixin)
+            patch_cache_control(response, **CacheControlMixin.default_cache_control)
+            return response
+
+        response = None
+        try:
+            response = await view(request, *args, **kwargs)
+        finally:
+            await sync_to_async(_store)(key, response, owns_lock, config)
+        return response
+
+    return wrapper
+
+
+# CABECERAS HTTP DE CACHÉ
+
+
+class CacheControlMixin:
+    """
+    Cache-Control por acción de un ViewSet (solo en respuestas GET 200)
+
+    cache_control = {'list': {'no_cache': True}, 'stats': {'no_store': True}}
+    Las acciones sin entrada usan default_cache_control.
+    """
+
+    default_cache_control = {'no_cache': True}
+    cache_control = {}
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        if request.method == 'GET' and response.status_code == 200:
+            patch_cache_control(response, **self.cache_control.get(self.action, self.default_cache_control))
+        return response
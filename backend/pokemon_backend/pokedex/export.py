@@ -0,0 +1,124 @@
+"""
+Exportación completa en streaming (NDJSON / CSV)
+
+Para análisis conviene bajar toda la tabla de una vez en lugar de seguir
+los enlaces 'next' de la API paginada. Aquí las filas salen de la base de
+datos por bloques (.iterator(chunk_size=...)) y se escriben a medida que
+llegan, así que la memoria del servidor no crece con el número de filas:
+- NDJSON: un objeto JSON por línea (mismos campos que los listados)
+- CSV: una fila por registro; las listas (types) van unidas con '|'
+- gzip al vuelo si el cliente envía Accept-Encoding: gzip
+
+Ni la caché de respuestas ni los ETag se aplican a estas respuestas.
+"""
+
+import csv
+import json
+import re
+
+from django.http import StreamingHttpResponse
+from django.utils.cache import patch_vary_headers
+from django.utils.text import compress_sequence
+
+try:
+    import orjson
+except ImportError:  # Opcional: sin orjson se usa el json de la biblioteca estándar
+    orjson = None
+
+
+EXPORT_FORMATS = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv',
+}
+
+# Filas que se leen de la base de datos por cada viaje
+EXPORT_CHUNK_SIZE = 2000
+
+# Bytes que se juntan antes de enviar un trozo de la respuesta
+EXPORT_BUFFER_SIZE = 64 * 1024
+
+ACCEPTS_GZIP = re.compile(r'\bgzip\b')
+
+
+def _ndjson_line(record):
+    if orjson is not None:
+        try:
+            return orjson.dumps(record) + b'\n'
+        except orjson.JSONEncodeError:
+            pass  # Por ejemplo, enteros de más de 64 bits
+    return json.dumps(record, ensure_ascii=False, separators=(',', ':')).encode() + b'\n'
+
+
+def ndjson_lines(records):
+    """Un objeto JSON por línea"""
+    for record in records:
+        yield _ndjson_line(record)
+
+
+def _flatten(record, prefix=''):
+    """{'pokemon': {'name': ...}} -> {'pokemon.name': ...}; listas unidas con '|'"""
+    flat = {}
+    for key, value in record.items():
+        if isinstance(value, dict):
+            flat.update(_flatten(value, prefix=f'{prefix}{key}.'))
+        elif isinstance(value, list):
+            flat[f'{prefix}{key}'] = '|'.join(str(item) for item in value)
+        else:
+            flat[f'{prefix}{key}'] = value
+    return flat
+
+
+class _LineBuffer:
+    """Destino de csv.writer que devuelve la línea en vez de guardarla"""
+
+    def write(self, value):
+        return value
+
+
+def csv_lines(records):
+    """Cabecera (de la primera fila) y una línea CSV por registro"""
+    writer = csv.writer(_LineBuffer())
+    header = None
+    for record in records:
+        flat = _flatten(record)
+        if header is None:
+            header = list(flat)
+            yield writer.writerow(header).encode()
+        yield writer.writerow([flat.get(column) for column in header]).encode()
+
+
+def buffered(chunks, size=EXPORT_BUFFER_SIZE):
+    """Junta líneas pequeñas en trozos de ~size bytes (menos escrituras al socket)"""
+    pending = []
+    pending_size = 0
+    for chunk in chunks:
+        pending.append(chunk)
+        pending_size += len(chunk)
+        if pending_size >= size:
+            yield b''.join(pending)
+            pending = []
+            pending_size = 0
+    if pending:
+        yield b''.join(pending)
+
+
+def streaming_export(request, records, output, filename):
+    """
+    StreamingHttpResponse con los registros en el formato pedido
+
+    records: iterable de diccionarios (se consume a medida que se envía)
+    output: 'ndjson' o 'csv'
+    """
+    lines = ndjson_lines(records) if output == 'ndjson' else csv_lines(records)
+    content = buffered(lines)
+
+    gzipped = bool(ACCEPTS_GZIP.search(request.META.get('HTTP_ACCEPT_ENCODING', '')))
+    if gzipped:
+        content = compress_sequence(content)
+
+    response = StreamingHttpResponse(content, content_type=f'{EXPORT_FORMATS[output]}; charset=utf-8')
+    response['Content-Disposition'] = f'attachment; filename="{filename}.{output}"'
+    if gzipped:
+        response['Content-Encoding'] = 'gzip'
+    patch_vary_headers(response, ('Accept-Encoding',))
+    return response
@@ -0,0 +1,60 @@
+"""
+Escrituras atómicas de favoritos
+
+Cada cambio es una sola sentencia que decide por sí misma, sin leer antes
+para preguntar si el favorito existe (eso abre una ventana entre la lectura
+y la escritura en la que otra petición puede cambiar el estado):
+- Agregar: INSERT; si la restricción única salta, ya era favorito
+- Quitar: DELETE condicional; las filas borradas dicen si lo era
+- Alternar: DELETE condicional y, si no borró nada, INSERT. Si otra
+  petición insertó entre medio, se vuelve a intentar: cada toggle cambia
+  el estado exactamente una vez, por muchas peticiones simultáneas que haya
+
+Todas invalidan la caché de respuestas al confirmar si cambiaron algo
+(agregar, con PokemonFavorite.save(); quitar es un DELETE sobre el QuerySet,
+que no pasa por el modelo).
+"""
+
+from django.db import IntegrityError, transaction
+
+from .cache import invalidate_on_commit
+from .models import PokemonFavorite
+
+
+# Reintentos de un toggle que choca una y otra vez con otras peticiones
+MAX_TOGGLE_ATTEMPTS = 10
+
+
+def add_favorite(pokemon):
+    """Agrega el favorito y lo devuelve; None si ya lo era"""
+    try:
+        with transaction.atomic():
+            favorite = PokemonFavorite.objects.create(pokemon=pokemon)
+    except IntegrityError:
+        return None
+
+    return favorite  # PokemonFavorite.save() ya invalidó la caché
+
+
+def remove_favorite(**lookup):
+    """Quita el favorito que cumpla lookup (una sola sentencia); True si existía"""
+    deleted, _ = PokemonFavorite.objects.filter(**lookup).delete()
+    if deleted:
+        invalidate_on_commit()
+    return bool(deleted)
+
+
+def flip_favorite(pokemon):
+    """
+    Toggle atómico: devuelve ('removed', None) o ('added', favorito)
+    """
+    for _ in range(MAX_TOGGLE_ATTEMPTS):
+        if remove_favorite(pokemon=pokemon):
+            return 'removed', None
+
+        favorite = add_favorite(pokemon)
+        if favorite is not None:
+            return 'added', favorite
+        # Otra petición lo agregó entre el DELETE y el INSERT: ahora toca quitarlo
+
+    raise RuntimeError(f'No se pudo alternar el favorito de {pokemon.name}: demasiada contención')
@@ -0,0 +1,277 @@
+"""
+Caché HTTP en disco para las respuestas de la PokéAPI
+
+Los datos de la PokéAPI casi nunca cambian, así que cada recarga no
+debería volver a descargar todo el JSON:
+- Las respuestas se guardan comprimidas (gzip), una por URL
+- Dentro del TTL se sirven sin tocar la red
+- Pasado el TTL se revalidan con If-None-Match / If-Modified-Since;
+  un 304 renueva la entrada sin descargar el cuerpo
+- Si el tamaño total supera el máximo, se eliminan las entradas usadas
+  hace más tiempo (LRU)
+- Contadores de aciertos, fallos y bytes ahorrados para ver el efecto
+"""
+
+import gzip
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+
+import requests
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class CacheEntry:
+    """Respuesta guardada en disco"""
+
+    url: str
+    path: Path
+    body: bytes
+    etag: str = ''
+    last_modified: str = ''
+    stored_at: float = 0.0
+
+    def age(self):
+        return time.time() - self.stored_at
+
+    def conditional_headers(self):
+        """Cabeceras para revalidar la entrada con el servidor"""
+        headers = {}
+        if self.etag:
+            headers['If-None-Match'] = self.etag
+        if self.last_modified:
+            headers['If-Modified-Since'] = self.last_modified
+        return headers
+
+    def to_response(self):
+        """Reconstruye un requests.Response para que el cliente no note la diferencia"""
+        response = requests.Response()
+        response.status_code = 200
+        response.url = self.url
+        response._content = self.body
+        response.headers['Content-Type'] = 'application/json'
+        if self.etag:
+            response.headers['ETag'] = self.etag
+        if self.last_modified:
+            response.headers['Last-Modified'] = self.last_modified
+        return response
+
+
+class HTTPResponseCache:
+    """
+    Caché de respuestas por URL guardada en un directorio
+
+    Cada entrada es un archivo .gz con una primera línea JSON de metadatos
+    (url, etag, last_modified, stored_at) seguida del cuerpo. La fecha de
+    modificación del archivo marca el último uso (para el LRU).
+    """
+
+    def __init__(self, directory, ttl, max_bytes):
+        self.directory = Path(directory)
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._size = None  # Se calcula al primer uso
+
+        self.hits = 0            # Servidas desde disco sin red
+        self.revalidated = 0     # 304: la copia en disco seguía vigente
+        self.misses = 0          # Descargadas completas
+        self.bytes_saved = 0     # Bytes de cuerpo que no se descargaron
+        self.evictions = 0
+
+    def _path(self, url):
+        key = hashlib.sha256(url.encode()).hexdigest()
+        return self.directory / key[:2] / f'{key}.json.gz'
+
+
+    # LECTURA
+
+
+    def get(self, url):
+        """Devuelve la entrada guardada para la URL, o None"""
+        path = self._path(url)
+        try:
+            with gzip.open(path, 'rb') as f:
+                meta = json.loads(f.readline())
+                body = f.read()
+        except (OSError, ValueError, EOFError):
+            return None
+
+        return CacheEntry(
+            url=url,
+            path=path,
+            body=body,
+            etag=meta.get('etag', ''),
+            last_modified=meta.get('last_modified', ''),
+            stored_at=meta.get('stored_at', 0.0),
+        )
+
+    def is_fresh(self, entry):
+        return entry.age() < self.ttl
+
+    def _touch(self, entry):
+        """Marca la entrada como usada recientemente (LRU)"""
+        try:
+            os.utime(entry.path)
+        except OSError:
+            pass
+
+    def record_hit(self, entry):
+        self._touch(entry)
+        with self._lock:
+            self.hits += 1
+            self.bytes_saved += len(entry.body)
+
+    def record_miss(self):
+        with self._lock:
+            self.misses += 1
+
+
+    # ESCRITURA
+
+
+    def store(self, url, response):
+        """Guarda una respuesta 200 (y su ETag / Last-Modified)"""
+        return self._write(
+            url,
+            response.content,
+            etag=response.headers.get('ETag', ''),
+            last_modified=response.headers.get('Last-Modified', ''),
+        )
+
+    def revalidate(self, entry, response):
+        """El servidor respondió 304: renovar la entrada sin descargar el cuerpo"""
+        self._write(
+            entry.url,
+            entry.body,
+            etag=response.headers.get('ETag', entry.etag),
+            last_modified=response.headers.get('Last-Modified', entry.last_modified),
+        )
+        with self._lock:
+            self.revalidated += 1
+            self.bytes_saved += len(entry.body)
+
+    def _write(self, url, body, etag='', last_modified=''):
+        path = self._path(url)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        meta = {'url': url, 'etag': etag, 'last_modified': last_modified, 'stored_at': time.time()}
+
+        previous_size = path.stat().st_size if path.exists() else 0
+
+        # Escribir en un temporal y renombrar: nunca queda un archivo a medias
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as raw, gzip.GzipFile(fileobj=raw, mode='wb') as f:
+                f.write(json.dumps(meta).encode() + b'\n')
+                f.write(body)
+            os.replace(tmp_path, path)
+        except OSError:
+            logger.warning(f"No se pudo guardar en caché: {url}")
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            return None
+
+        with self._lock:
+            if self._size is not None:
+                self._size += path.stat().st_size - previous_size
+
+        self._evict_if_needed()
+        return path
+
+
+    # EVICCIÓN LRU
+
+
+    def _entries(self):
+        return [path for path in self.directory.glob('*/*.json.gz') if path.is_file()]
+
+    def size(self):
+        """Tamaño total en disco (bytes comprimidos)"""
+        with self._lock:
+            if self._size is None:
+                self._size = sum(path.stat().st_size for path in self._entries())
+            return self._size
+
+    def _evict_if_needed(self):
+        if self.size() <= self.max_bytes:
+            return
+
+        with self._lock:
+            entries = sorted(
+                ((path.stat().st_mtime, path.stat().st_size, path) for path in self._entries()),
+                key=lambda item: item[0],
+            )
+            total = sum(size for _, size, _ in entries)
+
+            for _, size, path in entries:
+                if total <= self.max_bytes:
+                    break
+                try:
+                    path.unlink()
+                except OSError:
+                    continue
+                total -= size
+                self.evictions += 1
+
+            self._size = total
+
+    def clear(self):
+        for path in self._entries():
+            path.unlink(missing_ok=True)
+        with self._lock:
+            self._size = 0
+
+
+    # MÉTRICAS
+
+
+    def stats(self):
+        requests_total = self.hits + self.revalidated + self.misses
+        return {
+            'enabled': True,
+            'hits': self.hits,
+            'revalidated': self.revalidated,
+            'misses': self.misses,
+            'hit_ratio': round((self.hits + self.revalidated) / requests_total, 3) if requests_total else 0.0,
+            'bytes_saved': self.bytes_saved,
+            'evictions': self.evictions,
+            'size_bytes': self.size(),
+            'max_bytes': self.max_bytes,
+            'ttl_seconds': self.ttl,
+        }
+
+
+# Una caché compartida por directorio (los contadores son por proceso)
+_caches = {}
+_caches_lock = threading.Lock()
+
+
+def get_http_cache(config):
+    """
+    Devuelve la caché configurada en settings.POKEAPI, o None si está desactivada
+
+    Si CACHE_TTL o CACHE_MAX_BYTES cambiaron desde la última llamada (por
+    ejemplo con override_settings), la caché del directorio los adopta; el
+    nuevo máximo se aplica en la siguiente escritura.
+    """
+    directory = config.get('CACHE_DIR')
+    if not directory:
+        return None
+
+    with _caches_lock:
+        cache = _caches.get(str(directory))
+        if cache is None:
+            cache = HTTPResponseCache(directory, config['CACHE_TTL'], config['CACHE_MAX_BYTES'])
+            _caches[str(directory)] = cache
+        else:
+            cache.ttl = config['CACHE_TTL']
+            cache.max_bytes = config['CACHE_MAX_BYTES']
+        return cache
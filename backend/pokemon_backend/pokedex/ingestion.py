@@ -0,0 +1,327 @@
+"""
+Motor de ingesta concurrente para la PokéAPI
+
+Reemplaza las llamadas secuenciales a requests.get por:
+- Una sesión HTTP reutilizable con pool de conexiones
+- Un pool acotado de hilos (concurrencia configurable)
+- Reintentos con backoff exponencial para 429 y errores 5xx
+- Un tiempo límite (deadline) por ejecución completa
+- Una caché HTTP en disco con revalidación ETag/Last-Modified (http_cache.py)
+"""
+
+import logging
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from dataclasses import dataclass, field
+
+import requests
+from requests.adapters import HTTPAdapter
+from django.conf import settings
+
+from .http_cache import get_http_cache
+
+logger = logging.getLogger(__name__)
+
+
+# CONFIGURACIÓN POR DEFECTO (se puede sobrescribir con settings.POKEAPI)
+
+DEFAULT_POKEAPI_SETTINGS = {
+    'BASE_URL': 'https://pokeapi.co/api/v2',
+    'MAX_WORKERS': 8,          # Peticiones simultáneas como máximo
+    'TIMEOUT': 10,             # Timeout por petición (segundos)
+    'MAX_RETRIES': 3,          # Reintentos para 429 / 5xx / errores de red
+    'BACKOFF_FACTOR': 0.5,     # Espera base: 0.5s, 1s, 2s, ...
+    'MAX_BACKOFF': 8,          # Espera máxima entre reintentos (segundos)
+    'DEADLINE': 120,           # Tiempo máximo de una carga completa (segundos)
+    'CACHE_DIR': None,         # Directorio de la caché HTTP (None = desactivada)
+    'CACHE_TTL': 24 * 3600,    # Segundos que una respuesta se usa sin revalidar
+    'CACHE_MAX_BYTES': 50 * 1024 * 1024,  # Tamaño máximo en disco (LRU)
+    'ASYNC_CLIENT': False,     # True: AsyncPokeAPIClient (async_ingestion.py)
+    'SYNC_MAX_AGE': 7 * 24 * 3600,  # Carga incremental: antigüedad máxima sin volver a pedir
+    'SNAPSHOT': None,          # Ruta de un snapshot (snapshots.py): cargar desde él, sin red
+}
+
+# Códigos HTTP que vale la pena reintentar
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+def get_pokeapi_settings():
+    """Combina los valores por defecto con settings.POKEAPI"""
+    config = dict(DEFAULT_POKEAPI_SETTINGS)
+    config.update(getattr(settings, 'POKEAPI', {}))
+    return config
+
+
+def parse_pokemon(data):
+    """
+    Extrae de la respuesta de la PokéAPI solo los campos que guardamos
+    """
+    return {
+        'pokemon_id': data['id'],
+        'name': data['name'],
+        'types': [type_info['type']['name'] for type_info in data['types']],
+        'height': data['height'],
+        'weight': data['weight'],
+        'sprite_url': data['sprites']['front_default'],
+    }
+
+
+def create_pokeapi_client(**kwargs):
+    """
+    Fuente de datos del loader según settings.POKEAPI: SnapshotClient si hay
+    SNAPSHOT, AsyncPokeAPIClient con ASYNC_CLIENT o PokeAPIClient
+    """
+    config = get_pokeapi_settings()
+    if config['SNAPSHOT']:
+        from .snapshots import SnapshotClient
+        return SnapshotClient(config['SNAPSHOT'], deadline=kwargs.get('deadline'))
+    if config['ASYNC_CLIENT']:
+        from .async_ingestion import AsyncPokeAPIClient
+        return AsyncPokeAPIClient(**kwargs)
+    return PokeAPIClient(**kwargs)
+
+
+@dataclass
+class IngestionResult:
+    """Resultado de una ejecución del motor de ingesta"""
+
+    records: list = field(default_factory=list)   # Pokémon parseados, ordenados por ID
+    errors: dict = field(default_factory=dict)    # {pokemon_id: mensaje de error}
+    elapsed: float = 0.0                          # Tiempo total (segundos)
+    deadline_exceeded: bool = False
+
+
+class PokeAPIClient:
+    """
+    Cliente HTTP para la PokéAPI con pool de conexiones y reintentos
+
+    Todos los parámetros son opcionales; si no se indican se usan los de
+    settings.POKEAPI. Cambiando base_url se puede apuntar a un servidor
+    local de pruebas (stub).
+    """
+
+    offline = False  # Los datos vienen de la red (ver SnapshotClient)
+
+    def __init__(self, base_url=None, max_workers=None, timeout=None,
+                 max_retries=None, backoff_factor=None, deadline=None, cache=None):
+        config = get_pokeapi_settings()
+
+        self.base_url = (base_url or config['BASE_URL']).rstrip('/')
+        self.max_workers = max_workers or config['MAX_WORKERS']
+        self.timeout = timeout or config['TIMEOUT']
+        self.max_retries = config['MAX_RETRIES'] if max_retries is None else max_retries
+        self.backoff_factor = config['BACKOFF_FACTOR'] if backoff_factor is None else backoff_factor
+        self.max_backoff = config['MAX_BACKOFF']
+        self.deadline = deadline or config['DEADLINE']
+        # cache=False desactiva la caché aunque esté configurada
+        self.cache = get_http_cache(config) if cache is None else (cache or None)
+
+        # Sesión compartida: reutiliza conexiones TCP/TLS entre peticiones
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.max_workers)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+    def close(self):
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+    # PETICIONES INDIVIDUALES
+
+
+    def _backoff_delay(self, attempt, response=None):
+        """Calcula la espera antes del siguiente intento (respeta Retry-After)"""
+        if response is not None and response.status_code == 429:
+            retry_after = response.headers.get('Retry-After', '')
+            if retry_after.isdigit():
+                return min(float(retry_after), self.max_backoff)
+
+        delay = self.backoff_factor * (2 ** attempt)
+        # Jitter para que los hilos no reintenten todos a la vez
+        return min(delay, self.max_backoff) * random.uniform(0.5, 1.0)
+
+    def get(self, url, deadline_at=None):
+        """
+        GET pasando por la caché en disco (si está activada)
+
+        - Entrada vigente (dentro del TTL): se responde sin usar la red
+        - Entrada vencida: petición condicional; un 304 reutiliza la copia
+        - Sin entrada o con cambios: descarga completa y se guarda
+        """
+        if self.cache is None:
+            return self._request(url, deadline_at)
+
+        entry = self.cache.get(url)
+        if entry is not None and self.cache.is_fresh(entry):
+            self.cache.record_hit(entry)
+            return entry.to_response()
+
+        headers = entry.conditional_headers() if entry is not None else None
+        response = self._request(url, deadline_at, headers)
+
+        if response.status_code == 304 and entry is not None:
+            self.cache.revalidate(entry, response)
+            return entry.to_response()
+
+        self.cache.record_miss()
+        if response.status_code == 200:
+            self.cache.store(url, response)
+
+        return response
+
+    def _request(self, url, deadline_at=None, headers=None):
+        """
+        GET con reintentos para 429 / 5xx / errores de conexión
+
+        Devuelve la última respuesta obtenida (puede ser un error HTTP
+        no reintentable como 404). Lanza requests.RequestException si
+        todos los intentos fallan por conexión o si se agota el deadline.
+        """
+        attempt = 0
+
+        while True:
+            timeout = self.timeout
+            if deadline_at is not None:
+                remaining = deadline_at - time.monotonic()
+                if remaining <= 0:
+                    raise requests.Timeout('Tiempo límite de la carga agotado')
+                timeout = min(timeout, remaining)
+
+            response = None
+            try:
+                response = self.session.get(url, headers=headers, timeout=timeout)
+                if response.status_code not in RETRY_STATUS_CODES:
+                    return response
+                if attempt >= self.max_retries:
+                    return response
+            except requests.RequestException:
+                if attempt >= self.max_retries:
+                    raise
+
+            delay = self._backoff_delay(attempt, response)
+            if deadline_at is not None and time.monotonic() + delay >= deadline_at:
+                if response is not None:
+                    return response
+                raise requests.Timeout('Tiempo límite de la carga agotado')
+
+            time.sleep(delay)
+            attempt += 1
+
+    def fetch_bytes(self, url, deadline_at=None):
+        """
+        Descarga un archivo binario (sprites) con los mismos reintentos,
+        sin pasar por la caché de respuestas JSON
+        """
+        response = self._request(url, deadline_at)
+
+        if response.status_code != 200:
+            raise requests.HTTPError(f'Error HTTP {response.status_code} para {url}', response=response)
+
+        return response.content
+
+    def list_pokemon_ids(self, page_size=500):
+        """
+        Descubre todos los IDs disponibles paginando /pokemon/?limit=&offset=
+
+        El total sale del campo 'count' de la primera página y se siguen
+        los enlaces 'next'. Los IDs se extraen de la URL de cada resultado
+        (.../pokemon/25/) porque las formas alternativas no son contiguas.
+        """
+        pokemon_ids = []
+        total = None
+        url = f'{self.base_url}/pokemon/?limit={page_size}&offset=0'
+
+        while url:
+            response = self.get(url)
+            response.raise_for_status()
+            data = response.json()
+
+            if total is None:
+                total = data['count']
+                logger.info(f"PokéAPI reporta {total} Pokémon disponibles")
+
+            for entry in data['results']:
+                pokemon_ids.append(int(entry['url'].rstrip('/').rsplit('/', 1)[-1]))
+
+            url = data.get('next')
+
+        return sorted(pokemon_ids)
+
+    def fetch_pokemon(self, pokemon_id, deadline_at=None):
+        """Descarga y parsea un Pokémon. Lanza excepción si falla."""
+        response = self.get(f'{self.base_url}/pokemon/{pokemon_id}', deadline_at)
+
+        if response.status_code != 200:
+            raise requests.HTTPError(
+                f'Error HTTP {response.status_code} para Pokémon #{pokemon_id}',
+                response=response
+            )
+
+        return parse_pokemon(response.json())
+
+
+    # CARGA CONCURRENTE
+
+
+    def fetch_many(self, pokemon_ids, deadline_at=None):
+        """
+        Descarga varios Pokémon en paralelo con concurrencia acotada
+
+        Nunca lanza excepciones por un Pokémon individual: los fallos se
+        acumulan en result.errors para que la carga continúe con el resto.
+        deadline_at (time.monotonic) permite compartir un mismo deadline
+        entre varias llamadas de una misma ejecución.
+        """
+        pokemon_ids = list(pokemon_ids)
+        result = IngestionResult()
+        started = time.monotonic()
+        if deadline_at is None:
+            deadline_at = started + self.deadline
+
+        executor = ThreadPoolExecutor(max_workers=self.max_workers)
+        futures = {
+            executor.submit(self.fetch_pokemon, pokemon_id, deadline_at): pokemon_id
+            for pokemon_id in pokemon_ids
+        }
+        pending = set(futures)
+
+        try:
+            while pending:
+                remaining = deadline_at - time.monotonic()
+                if remaining <= 0:
+                    break
+
+                done, pending = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+
+                for future in done:
+                    pokemon_id = futures[future]
+                    try:
+                        result.records.append(future.result())
+                    except requests.HTTPError as e:
+                        result.errors[pokemon_id] = str(e)
+                    except requests.RequestException as e:
+                        result.errors[pokemon_id] = f'Error de conexión para Pokémon #{pokemon_id}: {e}'
+                    except Exception as e:
+                        result.errors[pokemon_id] = f'Error inesperado para Pokémon #{pokemon_id}: {e}'
+        finally:
+            # Lo que siga pendiente al vencer el deadline se cancela
+            executor.shutdown(wait=False, cancel_futures=True)
+
+        if pending:
+            result.deadline_exceeded = True
+            for future in pending:
+                pokemon_id = futures[future]
+                result.errors[pokemon_id] = f'Tiempo límite agotado para Pokémon #{pokemon_id}'
+            logger.warning(f"Deadline agotado: {len(pending)} Pokémon sin cargar")
+
+        result.records.sort(key=lambda record: record['pokemon_id'])
+        result.elapsed = time.monotonic() - started
+
+        return result
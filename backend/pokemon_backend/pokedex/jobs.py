@@ -0,0 +1,116 @@
+"""
+Cola de trabajos de carga en segundo plano
+
+Las cargas desde la PokéAPI ya no se ejecutan dentro de la petición HTTP:
+- enqueue_load() crea un LoadJob y lanza un hilo en este mismo proceso
+  (no hace falta Redis/Celery ni ningún broker externo)
+- Si ya hay un trabajo activo para la misma carga, se devuelve ese mismo
+  trabajo en vez de crear otro (dos POST simultáneos = una sola carga)
+- El avance se guarda en la base de datos para poder consultarlo por ID
+"""
+
+import logging
+import threading
+from datetime import timedelta
+
+from django.db import IntegrityError, connections, transaction
+from django.utils import timezone
+
+from .loader import LoadSpec, run_load
+from .models import LoadJob
+
+logger = logging.getLogger(__name__)
+
+
+# Un trabajo activo sin avances durante este tiempo se considera huérfano
+# (por ejemplo, el proceso que lo ejecutaba se reinició)
+STALE_JOB_TIMEOUT = timedelta(minutes=10)
+
+
+def _expire_stale_jobs(spec_key):
+    """Marca como fallidos los trabajos activos que dejaron de avanzar"""
+    LoadJob.objects.filter(
+        spec_key=spec_key,
+        status__in=LoadJob.ACTIVE_STATUSES,
+        updated_at__lt=timezone.now() - STALE_JOB_TIMEOUT,
+    ).update(
+        status=LoadJob.Status.FAILED,
+        message='Trabajo interrumpido (sin avances)',
+        finished_at=timezone.now(),
+    )
+
+
+def enqueue_load(spec, resume=True):
+    """
+    Encola una carga y devuelve (job, created)
+
+    created=False significa que ya había un trabajo activo para la misma
+    carga y la petición se unió a él.
+    """
+    _expire_stale_jobs(spec.key)
+
+    try:
+        with transaction.atomic():
+            job = LoadJob.objects.create(spec=spec.as_dict(), spec_key=spec.key, resume=resume)
+    except IntegrityError:
+        # La restricción única de trabajos activos: ya hay uno en marcha
+        job = LoadJob.objects.filter(
+            spec_key=spec.key, status__in=LoadJob.ACTIVE_STATUSES
+        ).first()
+        if job is not None:
+            return job, False
+        raise
+
+    transaction.on_commit(lambda: _start_worker(job.pk))
+    return job, True
+
+
+def _start_worker(job_id):
+    worker = threading.Thread(target=run_job, args=(job_id,), name=f'load-job-{job_id}', daemon=True)
+    worker.start()
+
+
+def _report_progress(job, summary):
+    """Copia el avance del loader al trabajo (una escritura por lote)"""
+    job.total = summary.requested
+    job.processed = summary.processed
+    job.resumed = summary.resumed
+    job.inserted = summary.inserted
+    job.updated = summary.updated
+    job.unchanged = summary.unchanged
+    job.errors = summary.errors
+    job.save(update_fields=[
+        'total', 'processed', 'resumed', 'inserted', 'updated', 'unchanged',
+        'errors', 'updated_at',
+    ])
+
+
+def run_job(job_id):
+    """Ejecuta un LoadJob (se llama desde el hilo de trabajo)"""
+    job = LoadJob.objects.get(pk=job_id)
+    job.status = LoadJob.Status.RUNNING
+    job.started_at = timezone.now()
+    job.save(update_fields=['status', 'started_at', 'updated_at'])
+
+    try:
+        summary = run_load(
+            LoadSpec(**job.spec),
+            resume=job.resume,
+            on_progress=lambda summary: _report_progress(job, summary),
+        )
+        _report_progress(job, summary)
+
+        job.status = LoadJob.Status.COMPLETED
+        job.message = (
+            f'Carga completada: {summary.loaded + summary.resumed}/{summary.requested} '
+            f'Pokémon cargados, {summary.sprites_mirrored} sprites copiados'
+        )
+    except Exception as e:
+        logger.exception(f"Error crítico en el trabajo de carga #{job_id}")
+        job.status = LoadJob.Status.FAILED
+        job.message = f'Error crítico: {e}'[:255]
+    finally:
+        job.finished_at = timezone.now()
+        job.save(update_fields=['status', 'message', 'finished_at', 'updated_at'])
+        # Cada hilo abre su propia conexión: cerrarla al terminar
+        connections.close_all()
@@ -0,0 +1,261 @@
+"""
+Orquestador de cargas desde la PokéAPI
+
+Une el motor de ingesta (ingestion.py) con la persistencia por lotes
+(persistence.py) y guarda un punto de control (LoadCheckpoint) después de
+cada lote, para que una carga interrumpida se pueda reanudar. Al final
+copia a disco los sprites de los Pokémon cargados (sprites.py).
+
+Modos de selección de IDs:
+- Rango:  LoadSpec(start=1, end=151)
+- Lista:  LoadSpec(ids=[1, 4, 7])
+- Todos:  LoadSpec(all=True) -> descubre el total en /pokemon/ de la PokéAPI
+
+La fuente es la PokéAPI o, sin red, un snapshot (snapshots.SnapshotClient,
+POKEAPI['SNAPSHOT'] o load_pokemon --snapshot).
+
+Con max_age (segundos) la carga es incremental: de esos IDs solo se piden
+los que faltan en la base de datos o llevan más de max_age sin comprobarse
+(last_synced_at). POKEAPI['SYNC_MAX_AGE'] es la política por defecto.
+
+Si la carga escribió algo, reconstruye los índices en memoria del proceso
+(búsqueda y, si está activado, el columnar) para que la próxima petición
+no pague la reconstrucción.
+"""
+
+import hashlib
+import logging
+import time
+from dataclasses import dataclass, field
+from datetime import timedelta
+
+from django.utils import timezone
+
+from .ingestion import create_pokeapi_client
+from .memory_index import refresh_memory_index
+from .models import LoadCheckpoint, Pokemon
+from .persistence import bulk_upsert_pokemon
+from .search import refresh_search_index
+from .sprites import get_sprite_settings, mirror_sprites
+
+logger = logging.getLogger(__name__)
+
+
+# Rango por defecto: los primeros 50 Pokémon (tabla principal del profesor Oak)
+DEFAULT_START = 1
+DEFAULT_END = 50
+
+# Cada cuántos IDs se guarda el punto de control (y se reporta el avance)
+CHECKPOINT_CHUNK_SIZE = 50
+
+
+@dataclass
+class LoadSpec:
+    """Qué Pokémon cargar: un rango, una lista explícita o todos"""
+
+    ids: list = None
+    start: int = None
+    end: int = None
+    all: bool = False
+    max_age: int = None  # Segundos; None = volver a pedir todos
+
+    def __post_init__(self):
+        if not self.all and not self.ids and self.start is None:
+            self.start, self.end = DEFAULT_START, DEFAULT_END
+        if self.ids:
+            self.ids = sorted(set(self.ids))
+
+    def as_dict(self):
+        return {'ids': self.ids, 'start': self.start, 'end': self.end, 'all': self.all,
+                'max_age': self.max_age}
+
+    @property
+    def key(self):
+        """Clave estable para el punto de control de esta carga"""
+        if self.all:
+            key = 'all'
+        elif self.ids:
+            digest = hashlib.sha1(','.join(map(str, self.ids)).encode()).hexdigest()[:16]
+            key = f'ids:{digest}'
+        else:
+            key = f'range:{self.start}-{self.end}'
+        return key if self.max_age is None else f'{key}:stale>{self.max_age}'
+
+    def describe(self):
+        if self.all:
+            description = 'todos los Pokémon'
+        elif self.ids:
+            description = f'{len(self.ids)} Pokémon seleccionados'
+        else:
+            description = f'Pokémon #{self.start} a #{self.end}'
+        if self.max_age is not None:
+            description += ' (solo faltantes o desactualizados)'
+        return description
+
+
+@dataclass
+class LoadSummary:
+    """Resumen de una carga completa"""
+
+    requested: int = 0        # IDs que abarca la carga
+    resumed: int = 0          # Ya cargados en una ejecución anterior (checkpoint)
+    fresh: int = 0            # Omitidos por incremental: comprobados hace menos de max_age
+    inserted: int = 0
+    updated: int = 0
+    unchanged: int = 0
+    not_attempted: int = 0    # Pendientes al agotarse el deadline
+    cut_by_deadline: bool = False  # Algún lote se cortó por el deadline (sus IDs quedan en errors)
+    errors: dict = field(default_factory=dict)
+    sprites_mirrored: int = 0  # Sprites copiados a disco en esta carga
+    sprite_errors: dict = field(default_factory=dict)  # No impiden cerrar la carga
+    sprites_webp: bool = False  # Con variante WebP (Pillow instalado)
+    elapsed: float = 0.0
+
+    @property
+    def loaded(self):
+        return self.inserted + self.updated + self.unchanged
+
+    @property
+    def processed(self):
+        """IDs ya resueltos (cargados o con error), incluidos los reanudados"""
+        return self.resumed + self.loaded + len(self.errors)
+
+    @property
+    def deadline_exceeded(self):
+        return self.not_attempted > 0 or self.cut_by_deadline
+
+    def as_dict(self):
+        return {
+            'requested': self.requested,
+            'resumed': self.resumed,
+            'fresh': self.fresh,
+            'inserted': self.inserted,
+            'updated': self.updated,
+            'unchanged': self.unchanged,
+            'not_attempted': self.not_attempted,
+            'sprites_mirrored': self.sprites_mirrored,
+            'sprites_webp': self.sprites_webp,
+            'elapsed': round(self.elapsed, 2),
+        }
+
+
+def resolve_pokemon_ids(spec, client):
+    """Convierte un LoadSpec en la lista ordenada de IDs a cargar"""
+    if spec.all:
+        return client.list_pokemon_ids()
+    if spec.ids:
+        return list(spec.ids)
+    return list(range(spec.start, spec.end + 1))
+
+
+def select_stale_ids(pokemon_ids, max_age):
+    """IDs que faltan en la base de datos o no se comprueban desde hace más de max_age segundos"""
+    cutoff = timezone.now() - timedelta(seconds=max_age)
+    fresh = set(
+        Pokemon.objects
+        .filter(pokemon_id__in=pokemon_ids, last_synced_at__gte=cutoff)
+        .values_list('pokemon_id', flat=True)
+    )
+    return [pokemon_id for pokemon_id in pokemon_ids if pokemon_id not in fresh]
+
+
+def run_load(spec=None, resume=True, client=None, on_progress=None):
+    """
+    Ejecuta una carga completa: descarga concurrente + upsert por lotes
+
+    Con resume=True, si existe un punto de control de la misma carga solo
+    se descargan los IDs pendientes. El punto de control se borra cuando la
+    carga llega al final de su lista de IDs, aunque algunos fallen (por
+    ejemplo, 404 más allá del último Pokémon): esos fallos quedan en
+    summary.errors y en el log, y la próxima carga vuelve a pedir todo. Solo
+    se conserva si la carga se interrumpe (deadline o excepción).
+    on_progress(summary) se llama al conocer el total y después de cada lote.
+    """
+    spec = spec or LoadSpec()
+    summary = LoadSummary()
+    started = time.monotonic()
+
+    own_client = client is None
+    client = client or create_pokeapi_client()
+
+    try:
+        checkpoint = LoadCheckpoint.objects.filter(key=spec.key).first()
+
+        if checkpoint and resume:
+            pending_ids = checkpoint.pending_ids
+            summary.resumed = len(checkpoint.completed_ids)
+            logger.info(
+                f"Reanudando carga '{spec.key}': {summary.resumed} ya cargados, "
+                f"{len(pending_ids)} pendientes"
+            )
+        else:
+            requested_ids = resolve_pokemon_ids(spec, client)
+            if spec.max_age is not None:
+                stale_ids = select_stale_ids(requested_ids, spec.max_age)
+                summary.fresh = len(requested_ids) - len(stale_ids)
+                requested_ids = stale_ids
+            checkpoint, _ = LoadCheckpoint.objects.update_or_create(
+                key=spec.key,
+                defaults={'requested_ids': requested_ids, 'completed_ids': []},
+            )
+            pending_ids = requested_ids
+
+        summary.requested = len(checkpoint.requested_ids)
+        deadline_at = started + client.deadline
+
+        if on_progress:
+            on_progress(summary)
+
+        for start in range(0, len(pending_ids), CHECKPOINT_CHUNK_SIZE):
+            chunk = pending_ids[start:start + CHECKPOINT_CHUNK_SIZE]
+
+            if time.monotonic() >= deadline_at:
+                summary.not_attempted += len(pending_ids) - start
+                break
+
+            result = client.fetch_many(chunk, deadline_at=deadline_at)
+            upsert = bulk_upsert_pokemon(result.records)
+
+            summary.inserted += upsert.inserted
+            summary.updated += upsert.updated
+            summary.unchanged += upsert.unchanged
+            summary.errors.update(result.errors)
+            summary.cut_by_deadline |= result.deadline_exceeded
+
+            # Guardar el avance: estos IDs ya no se vuelven a pedir al reanudar
+            checkpoint.completed_ids += [record['pokemon_id'] for record in result.records]
+            checkpoint.save(update_fields=['completed_ids', 'updated_at'])
+
+            if on_progress:
+                on_progress(summary)
+
+        if not summary.deadline_exceeded:
+            checkpoint.delete()
+            if summary.errors:
+                logger.warning(
+                    f"Carga '{spec.key}': {len(summary.errors)} IDs fallaron y no se reintentarán al reanudar: "
+                    f"{sorted(summary.errors)}"
+                )
+
+        # Sprites de lo cargado (los que ya tenían copia de la misma URL no se
+        # descargan); una fuente sin red, como un snapshot, no los copia
+        if get_sprite_settings()['ENABLED'] and not client.offline and time.monotonic() < deadline_at:
+            sprites = mirror_sprites(checkpoint.completed_ids, client=client, deadline_at=deadline_at)
+            summary.sprites_mirrored = sprites.mirrored
+            summary.sprite_errors = sprites.errors
+            summary.sprites_webp = sprites.webp
+
+        if summary.inserted or summary.updated or summary.sprites_mirrored:
+            refresh_search_index()
+            refresh_memory_index()
+    finally:
+        if own_client:
+            client.close()
+
+    summary.elapsed = time.monotonic() - started
+    logger.info(
+        f"Carga '{spec.key}' finalizada en {summary.elapsed:.2f}s: "
+        f"{summary.loaded} cargados, {len(summary.errors)} errores"
+    )
+
+    return summary
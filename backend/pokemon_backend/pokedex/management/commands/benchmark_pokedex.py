@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand
+
+from pokedex.benchmarks import SCENARIOS
+
+
+class Command(BaseCommand):
+    """
+    Ejecuta los benchmarks de rendimiento de la Pokédex
+
+    Ejemplo:
+        python manage.py benchmark_pokedex ingestion --sizes 50 1000
+    """
+
+    help = 'Ejecuta un escenario de benchmark de la Pokédex'
+
+    def add_arguments(self, parser):
+        parser.add_argument('scenario', choices=sorted(SCENARIOS), help='Escenario a medir')
+        parser.add_argument('--sizes', type=int, nargs='+', help='Tamaños de datos a probar')
+        parser.add_argument('--workers', type=int, default=8, help='Concurrencia del cliente HTTP')
+        parser.add_argument('--latency', type=float, default=0.05,
+                            help='Latencia simulada del stub de la PokéAPI (segundos)')
+        parser.add_argument('--fail-every', type=int, default=0,
+                            help='El stub responde 503 una de cada N peticiones')
+
+    def handle(self, *args, **options):
+        scenario = SCENARIOS[options['scenario']]
+
+        self.stdout.write(self.style.MIGRATE_HEADING(f"Benchmark: {options['scenario']}"))
+        for line in scenario(options):
+            self.stdout.write(line)
@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+
+from pokedex.snapshots import export_snapshot
+
+
+class Command(BaseCommand):
+    """
+    Guarda todos los Pokémon y favoritos en un snapshot (NDJSON + gzip)
+
+    El archivo sirve para sembrar otra base de datos sin red, con
+    import_snapshot o como fuente de load_pokemon --snapshot.
+
+    Ejemplos:
+        python manage.py export_snapshot pokedex.ndjson.gz
+    """
+
+    help = 'Exporta los Pokémon y favoritos a un snapshot comprimido con checksum'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Archivo de salida (se sobrescribe)')
+
+    def handle(self, *args, **options):
+        info = export_snapshot(options['path'])
+
+        self.stdout.write(self.style.SUCCESS(
+            f"{info.counts['pokemon']} Pokémon y {info.counts['favorite']} favoritos en {info.path} "
+            f'({info.size_bytes / 1024:.0f} KB, sha256 {info.sha256[:12]})'
+        ))
@@ -0,0 +1,43 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from pokedex.snapshots import SnapshotError, import_snapshot, read_snapshot
+
+
+class Command(BaseCommand):
+    """
+    Importa un snapshot creado con export_snapshot
+
+    Antes de escribir se comprueban la versión, los conteos y el SHA-256;
+    todo se importa en una sola transacción. Los Pokémon existentes se
+    actualizan y los favoritos se suman a los que ya haya.
+
+    Ejemplos:
+        python manage.py import_snapshot pokedex.ndjson.gz
+        python manage.py import_snapshot pokedex.ndjson.gz --verify   # Solo comprobar
+    """
+
+    help = 'Importa Pokémon y favoritos desde un snapshot (sin red)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Snapshot creado con export_snapshot')
+        parser.add_argument('--verify', action='store_true',
+                            help='Solo comprobar el archivo, sin importar nada')
+
+    def handle(self, *args, **options):
+        try:
+            if options['verify']:
+                info = read_snapshot(options['path'])
+                self.stdout.write(self.style.SUCCESS(
+                    f"Snapshot válido del {info.header['created_at']}: {info.counts['pokemon']} Pokémon, "
+                    f"{info.counts['favorite']} favoritos (sha256 {info.sha256[:12]})"
+                ))
+                return
+            result = import_snapshot(options['path'])
+        except SnapshotError as e:
+            raise CommandError(str(e))
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Snapshot importado en {result.elapsed:.2f}s: {result.inserted} nuevos, '
+            f'{result.updated} actualizados, {result.unchanged} sin cambios; '
+            f'{result.favorites_added} favoritos añadidos'
+        ))
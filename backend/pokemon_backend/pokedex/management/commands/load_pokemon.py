@@ -0,0 +1,112 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from pokedex.ingestion import get_pokeapi_settings
+from pokedex.loader import LoadSpec, run_load
+from pokedex.snapshots import SnapshotClient, SnapshotError
+
+
+def parse_range(value):
+    """Convierte '1-151' en (1, 151)"""
+    try:
+        start, end = (int(part) for part in value.split('-', 1))
+    except ValueError:
+        raise CommandError(f"Rango inválido '{value}': usa el formato INICIO-FIN (ej: 1-151)")
+    if start < 1 or start > end:
+        raise CommandError(f"Rango inválido '{value}': INICIO debe ser >= 1 y <= FIN")
+    return start, end
+
+
+class Command(BaseCommand):
+    """
+    Carga Pokémon desde la PokéAPI sin pasar por la API HTTP
+
+    Ejemplos:
+        python manage.py load_pokemon                  # Primeros 50
+        python manage.py load_pokemon --range 1-151    # Primera generación
+        python manage.py load_pokemon --ids 1 4 7 25
+        python manage.py load_pokemon --all            # Toda la National Dex
+        python manage.py load_pokemon --all --restart  # Ignorar el checkpoint
+        python manage.py load_pokemon --all --incremental       # Solo faltantes o desactualizados
+        python manage.py load_pokemon --all --max-age 3600      # Idem, con otra antigüedad máxima
+        python manage.py load_pokemon --all --snapshot pokedex.ndjson.gz  # Sin red
+    """
+
+    help = 'Carga Pokémon desde la PokéAPI (rango, lista de IDs o todos)'
+
+    def add_arguments(self, parser):
+        mode = parser.add_mutually_exclusive_group()
+        mode.add_argument('--range', dest='id_range', help='Rango de IDs, ej: 1-151')
+        mode.add_argument('--ids', type=int, nargs='+', help='Lista explícita de IDs')
+        mode.add_argument('--all', action='store_true', help='Todos los Pokémon de la PokéAPI')
+        parser.add_argument('--restart', action='store_true',
+                            help='No reanudar desde el punto de control anterior')
+        parser.add_argument('--incremental', action='store_true',
+                            help="Pedir solo los Pokémon que faltan o llevan más de POKEAPI['SYNC_MAX_AGE'] sin comprobarse")
+        parser.add_argument('--max-age', type=int,
+                            help='Como --incremental, con esta antigüedad máxima (segundos)')
+        parser.add_argument('--snapshot',
+                            help='Leer los Pokémon de este snapshot (export_snapshot) en lugar de la PokéAPI')
+
+    def handle(self, *args, **options):
+        if options['id_range']:
+            start, end = parse_range(options['id_range'])
+            spec = LoadSpec(start=start, end=end)
+        elif options['ids']:
+            spec = LoadSpec(ids=options['ids'])
+        else:
+            spec = LoadSpec(all=options['all'])
+
+        if options['max_age'] is not None:
+            if options['max_age'] < 0:
+                raise CommandError('--max-age debe ser >= 0')
+            spec.max_age = options['max_age']
+        elif options['incremental']:
+            spec.max_age = get_pokeapi_settings()['SYNC_MAX_AGE']
+
+        client = None
+        if options['snapshot']:
+            try:
+                client = SnapshotClient(options['snapshot'])
+            except SnapshotError as e:
+                raise CommandError(str(e))
+
+        self.stdout.write(f'Cargando {spec.describe()}...')
+        summary = run_load(spec, resume=not options['restart'], client=client)
+
+        if summary.resumed:
+            self.stdout.write(f'Reanudada: {summary.resumed} Pokémon ya estaban cargados')
+
+        if summary.fresh:
+            self.stdout.write(f'Incremental: {summary.fresh} Pokémon al día, no se pidieron')
+
+        for pokemon_id in sorted(summary.errors):
+            self.stderr.write(summary.errors[pokemon_id])
+
+        self.stdout.write(self.style.SUCCESS(
+            f'{summary.loaded + summary.resumed}/{summary.requested} Pokémon cargados en {summary.elapsed:.2f}s '
+            f'({summary.inserted} nuevos, {summary.updated} actualizados, '
+            f'{summary.unchanged} sin cambios)'
+        ))
+
+        if summary.sprites_mirrored or summary.sprite_errors:
+            self.stdout.write(
+                f'Sprites: {summary.sprites_mirrored} copiados a disco, {len(summary.sprite_errors)} errores '
+                f'(python manage.py mirror_sprites los reintenta)'
+            )
+            if summary.sprites_mirrored and not summary.sprites_webp:
+                self.stdout.write(self.style.WARNING(
+                    'Sprites sin variante WebP: Pillow no está instalado (pip install -r requirements.txt)'
+                ))
+
+        if summary.deadline_exceeded:
+            # El punto de control se conservó: la siguiente ejecución sigue donde quedó
+            self.stdout.write(self.style.WARNING(
+                'Carga incompleta: vuelve a ejecutar el comando para reanudarla'
+            ))
+        elif summary.errors:
+            # Errores permanentes (404, reintentos agotados): reanudar no los vuelve a pedir
+            failed_ids = ' '.join(str(pokemon_id) for pokemon_id in sorted(summary.errors))
+            self.stdout.write(self.style.WARNING(
+                f'{len(summary.errors)} Pokémon no se pudieron cargar: {failed_ids} '
+                f'(python manage.py load_pokemon --ids {failed_ids} los reintenta)'
+            ))
@@ -0,0 +1,47 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from pokedex.sprites import Image, get_sprite_store, mirror_sprites
+
+
+class Command(BaseCommand):
+    """
+    Copia a disco los sprites de los Pokémon ya cargados
+
+    load_pokemon lo hace al terminar cada carga; esto sirve para los datos
+    cargados antes, para reintentar los que fallaron o para regenerar las
+    variantes tras instalar Pillow (--force).
+
+    Ejemplos:
+        python manage.py mirror_sprites               # Solo los que faltan
+        python manage.py mirror_sprites --ids 1 4 7
+        python manage.py mirror_sprites --force       # Descargar todo de nuevo
+    """
+
+    help = 'Descarga los sprites de la PokéAPI al directorio local (/sprites/)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--ids', type=int, nargs='+', help='Solo estos Pokémon')
+        parser.add_argument('--force', action='store_true',
+                            help='Descargar aunque ya exista una copia local')
+
+    def handle(self, *args, **options):
+        store = get_sprite_store()
+        if store is None:
+            raise CommandError("Copia de sprites desactivada: define POKEDEX_SPRITES['DIR']")
+
+        if Image is None:
+            self.stdout.write(self.style.WARNING(
+                'Pillow no está instalado: se guardan los originales sin WebP (pip install -r requirements.txt)'
+            ))
+
+        result = mirror_sprites(options['ids'], force=options['force'], store=store)
+
+        for pokemon_id in sorted(result.errors):
+            self.stderr.write(result.errors[pokemon_id])
+
+        disk = store.stats()
+        self.stdout.write(self.style.SUCCESS(
+            f'{result.mirrored} sprites copiados ({result.downloads} descargas) y '
+            f'{result.up_to_date} ya al día en {result.elapsed:.2f}s; '
+            f"en disco: {disk['files']} archivos, {disk['size_bytes'] / 1024:.0f} KB"
+        ))
@@ -0,0 +1,65 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from pokedex.cache import invalidate_on_commit
+from pokedex.models import Pokemon, DENORMALIZED_FIELDS, compute_derived_fields, next_change_version
+
+
+SOURCE_FIELDS = ['name', 'types', 'height', 'weight']
+BATCH_SIZE = 500
+
+
+class Command(BaseCommand):
+    """
+    Recalcula las columnas precalculadas de los Pokémon (nombre invertido,
+    tipos legibles, marcas de los filtros, tipo primario/secundario)
+
+    El loader y Pokemon.save() ya las mantienen; esto sirve para datos
+    modificados por otras vías (update(), SQL a mano, cambios de reglas).
+
+    Ejemplos:
+        python manage.py sync_derived_fields          # Corrige las filas desactualizadas
+        python manage.py sync_derived_fields --check  # Solo verifica (falla si hay diferencias)
+    """
+
+    help = 'Recalcula y verifica las columnas precalculadas de los Pokémon'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--check', action='store_true',
+                            help='Solo verificar: no guarda nada y falla si hay filas desactualizadas')
+
+    def handle(self, *args, **options):
+        queryset = Pokemon.objects.only('pk', 'pokemon_id', *SOURCE_FIELDS, *DENORMALIZED_FIELDS)
+
+        stale = []
+        total = 0
+        for pokemon in queryset.iterator(chunk_size=2000):
+            total += 1
+            expected = compute_derived_fields({field: getattr(pokemon, field) for field in SOURCE_FIELDS})
+            differences = [field for field, value in expected.items() if getattr(pokemon, field) != value]
+            if differences:
+                if len(stale) < 10:
+                    self.stdout.write(f"#{pokemon.pokemon_id}: {', '.join(differences)}")
+                for field, value in expected.items():
+                    setattr(pokemon, field, value)
+                stale.append(pokemon)
+
+        if options['check']:
+            if stale:
+                raise CommandError(f'{len(stale)} de {total} Pokémon con columnas desactualizadas')
+            self.stdout.write(self.style.SUCCESS(f'{total} Pokémon verificados: todo al día'))
+            return
+
+        with transaction.atomic():
+            if stale:
+                # Las columnas corregidas salen en la API: cambio nuevo del feed
+                change_version = next_change_version()
+                for pokemon in stale:
+                    pokemon.change_version = change_version
+            Pokemon.objects.bulk_update(stale, [*DENORMALIZED_FIELDS, 'change_version'], batch_size=BATCH_SIZE)
+            if stale:
+                invalidate_on_commit()
+
+        self.stdout.write(self.style.SUCCESS(
+            f'{total} Pokémon revisados, {len(stale)} actualizados'
+        ))
@@ -0,0 +1,468 @@
+"""
+Índice columnar en memoria de la Pokédex (opcional, uno por proceso)
+
+Los datos son pocos y casi siempre se leen. Con POKEDEX_MEMORY_INDEX
+activado, /pokemon/, /pokemon/query/ y los filtros predefinidos se
+resuelven en memoria, sin consultar la tabla:
+- Una fila = una posición (orden por pokemon_id); columnas en arrays
+  (height, weight, pokemon_id) o listas (el resto)
+- Un bitset (int de Python, bit i = fila i) por tipo y por filtro
+  predefinido: cualquier combinación es una intersección (&)
+- height, weight y name tienen un orden precalculado; los rangos y el
+  prefijo de nombre salen de bitsets acumulados por tramos más unas pocas
+  filas sueltas (bisect sobre los valores ordenados)
+- Se reconstruye de forma perezosa: cada uso compara la firma de la tabla
+  (último change_version y número de filas, una consulta por índices) con
+  la del índice, así que también ve las escrituras de otros procesos;
+  marcar favoritos no obliga a reconstruir
+
+La paginación por cursor de DRF funciona igual sobre IndexedRows (mismos
+cursores que con el ORM). Lo que el índice no cubre (orden por varios
+campos) sigue por el ORM.
+"""
+
+import threading
+import time
+from array import array
+from bisect import bisect_left, bisect_right
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db.models import Func, IntegerField, Subquery
+
+from .models import Pokemon
+from .queries import MATCH_COLUMNS, RANGE_FIELDS, columns_for_fields
+
+
+# CONFIGURACIÓN POR DEFECTO (se puede sobrescribir con settings.POKEDEX_MEMORY_INDEX)
+
+DEFAULT_MEMORY_INDEX_SETTINGS = {
+    'ENABLED': False,
+}
+
+# Columnas que se guardan (todas las que pueden salir en un listado)
+INDEX_COLUMNS = [
+    'pokemon_id', 'name', 'types', 'reversed_name', 'types_display',
+    'height', 'weight', 'sprite_url', 'sprite_local_url',
+]
+INTEGER_COLUMNS = ['pokemon_id', 'height', 'weight']
+
+# Columnas con orden precalculado (rangos, prefijo, ordering)
+SORTED_COLUMNS = ['name', *RANGE_FIELDS]
+
+# Tramos de bitsets acumulados por columna ordenada: más tramos, menos
+# filas sueltas por consulta y más memoria (tramos x filas / 8 bytes)
+RANGE_BINS = 256
+
+# Bits por trozo al recorrer un bitset en orden
+BIT_CHUNK = 4096
+
+
+def get_memory_index_settings():
+    """Combina los valores por defecto con settings.POKEDEX_MEMORY_INDEX"""
+    config = dict(DEFAULT_MEMORY_INDEX_SETTINGS)
+    config.update(getattr(settings, 'POKEDEX_MEMORY_INDEX', {}))
+    return config
+
+
+def _bits_from_positions(positions, size):
+    """Bitset con estas posiciones (un bytearray evita operar con ints grandes)"""
+    mask = bytearray((size + 7) // 8)
+    for position in positions:
+        mask[position >> 3] |= 1 << (position & 7)
+    return int.from_bytes(mask, 'little')
+
+
+class SortedColumn:
+    """
+    Orden precalculado de una columna
+
+    order: posiciones por (valor, posición); order_mixed: por (valor,
+    -posición), para los órdenes con el desempate en sentido contrario.
+    prefixes[j] es el bitset de order[:j * step].
+    """
+
+    def __init__(self, values, size):
+        self.size = size
+        # sorted es estable: los empates quedan en el orden de entrada
+        self.order = array('l', sorted(range(size), key=values.__getitem__))
+        self.order_mixed = array('l', sorted(range(size - 1, -1, -1), key=values.__getitem__))
+        self.values = [values[position] for position in self.order]
+
+        self.step = max(1, -(-size // RANGE_BINS))
+        self.prefixes = []
+        mask = bytearray((size + 7) // 8)
+        for k, position in enumerate(self.order):
+            if k % self.step == 0:
+                self.prefixes.append(int.from_bytes(mask, 'little'))
+            mask[position >> 3] |= 1 << (position & 7)
+        if size % self.step == 0:
+            self.prefixes.append(int.from_bytes(mask, 'little'))
+
+    def below(self, index):
+        """Bitset de las primeras index filas en orden de valor"""
+        bin_index = index // self.step
+        bits = self.prefixes[bin_index]
+        start = bin_index * self.step
+        if index > start:
+            bits |= _bits_from_positions(self.order[start:index], self.size)
+        return bits
+
+    def between(self, lo, hi):
+        """Bitset de order[lo:hi]"""
+        if lo >= hi:
+            return 0
+        return self.below(hi) & ~self.below(lo)
+
+    def bounds(self, operator, value):
+        """Rango [lo, hi) de order que cumple valor <operador> value"""
+        if operator == 'gt':
+            return bisect_right(self.values, value), self.size
+        if operator == 'gte':
+            return bisect_left(self.values, value), self.size
+        if operator == 'lt':
+            return 0, bisect_left(self.values, value)
+        return 0, bisect_right(self.values, value)  # lte
+
+    def compare_bits(self, operator, value):
+        return self.between(*self.bounds(operator, value))
+
+    def prefix_bits(self, prefix):
+        """Bitset de los valores que empiezan por prefix (columna de texto)"""
+        after = prefix[:-1] + chr(ord(prefix[-1]) + 1)
+        return self.between(bisect_left(self.values, prefix), bisect_left(self.values, after))
+
+
+class PokedexIndex:
+    """Foto en memoria de la tabla Pokemon (no se modifica una vez construida)"""
+
+    def __init__(self, rows, signature=None):
+        started = time.monotonic()
+        self.signature = signature
+        self.size = len(rows)
+        self.all_bits = (1 << self.size) - 1
+
+        self.columns = {}
+        for column_index, column in enumerate(INDEX_COLUMNS):
+            values = [row[column_index] for row in rows]
+            self.columns[column] = array('q', values) if column in INTEGER_COLUMNS else values
+
+        positions_by_type = {}
+        for position, types in enumerate(self.columns['types']):
+            # Como primary_type / secondary_type: como máximo dos tipos
+            for type_name in (types or [])[:2]:
+                positions_by_type.setdefault(type_name, []).append(position)
+        self.type_bits = {
+            type_name: _bits_from_positions(positions, self.size)
+            for type_name, positions in positions_by_type.items()
+        }
+
+        self.match_bits = {}
+        for match_index, match in enumerate(MATCH_COLUMNS, start=len(INDEX_COLUMNS)):
+            positions = [position for position, row in enumerate(rows) if row[match_index]]
+            self.match_bits[match] = _bits_from_positions(positions, self.size)
+
+        self.sorted = {column: SortedColumn(self.columns[column], self.size) for column in SORTED_COLUMNS}
+        self.build_seconds = time.monotonic() - started
+
+    @classmethod
+    def from_database(cls):
+        signature = table_signature()
+        rows = list(
+            Pokemon.objects.order_by('pokemon_id')
+            .values_list(*INDEX_COLUMNS, *MATCH_COLUMNS.values())
+        )
+        return cls(rows, signature=signature)
+
+
+    # FILTROS
+
+
+    def filter_bits(self, params):
+        """Bitset de las filas que cumplen los filtros de params (ver build_pokemon_queryset)"""
+        bits = self.all_bits
+
+        for match in params.get('matches') or []:
+            bits &= self.match_bits[match]
+
+        types = params.get('types')
+        if types:
+            type_bits = [self.type_bits.get(type_name, 0) for type_name in types]
+            if params.get('types_match', 'any') == 'all':
+                for each in type_bits:
+                    bits &= each
+            else:
+                any_bits = 0
+                for each in type_bits:
+                    any_bits |= each
+                bits &= any_bits
+
+        for field in RANGE_FIELDS:
+            for operator in ('gt', 'gte', 'lt', 'lte'):
+                value = params.get(f'{field}_{operator}')
+                if value is not None:
+                    bits &= self.sorted[field].compare_bits(operator, value)
+
+        if params.get('name_prefix'):
+            bits &= self.sorted['name'].prefix_bits(params['name_prefix'].lower())
+
+        return bits
+
+    def count(self, bits):
+        return bits.bit_count()
+
+
+    # RECORRIDO ORDENADO
+
+
+    def positions(self, bits, ordering, bound=None):
+        """
+        Posiciones de bits en el orden indicado (ver supports_ordering)
+
+        bound: (columna, 'gt' | 'lt', valor) del cursor de paginación
+        """
+        primary = ordering[0]
+        descending = primary.startswith('-')
+        field = primary.lstrip('-')
+
+        if field == 'pokemon_id':
+            lo, hi = 0, self.size
+            if bound is not None:
+                ids = self.columns['pokemon_id']
+                if bound[1] == 'gt':
+                    lo = bisect_right(ids, bound[2])
+                else:
+                    hi = bisect_left(ids, bound[2])
+            return self._bit_positions(bits, lo, hi, descending)
+
+        column = self.sorted[field]
+        lo, hi = (0, self.size) if bound is None else column.bounds(bound[1], bound[2])
+        tie_descending = len(ordering) > 1 and ordering[1].startswith('-')
+        order = column.order if descending == tie_descending else column.order_mixed
+        candidates = order[lo:hi]
+        if descending:
+            candidates = reversed(candidates)
+        if bits == self.all_bits:
+            return iter(candidates)
+        mask = bits.to_bytes((self.size + 7) // 8, 'little')
+        return (position for position in candidates if mask[position >> 3] >> (position & 7) & 1)
+
+    def _bit_positions(self, bits, lo, hi, descending):
+        """
+        Bits encendidos en [lo, hi), de menor a mayor o al revés
+
+        Se recorre por trozos de BIT_CHUNK bits: cada operación sobre un
+        trozo es barata, sobre el bitset entero costaría O(filas).
+        """
+        window = bits & ((1 << hi) - 1) & ~((1 << lo) - 1)
+        chunk_mask = (1 << BIT_CHUNK) - 1
+        bases = range(lo - lo % BIT_CHUNK, hi, BIT_CHUNK)
+        for base in (reversed(bases) if descending else bases):
+            chunk = (window >> base) & chunk_mask
+            if descending:
+                while chunk:
+                    offset = chunk.bit_length() - 1
+                    yield base + offset
+                    chunk ^= 1 << offset
+            else:
+                while chunk:
+                    lowest = chunk & -chunk
+                    yield base + lowest.bit_length() - 1
+                    chunk ^= lowest
+
+    def row(self, position, columns):
+        return {column: self.columns[column][position] for column in columns}
+
+
+def supports_ordering(ordering):
+    """El índice sabe recorrer este orden: un campo y, como mucho, el desempate por pokemon_id"""
+    fields = [field.lstrip('-') for field in ordering]
+    if fields == ['pokemon_id']:
+        return True
+    return len(fields) == 2 and fields[1] == 'pokemon_id' and fields[0] in SORTED_COLUMNS
+
+
+class IndexedRows:
+    """
+    Resultado de una consulta al índice, con la parte de la interfaz de
+    QuerySet que usa CursorPagination (order_by, filter por posición y
+    slicing); las filas son diccionarios como los de .values()
+    """
+
+    def __init__(self, index, bits, ordering, columns, bound=None):
+        self.index = index
+        self.bits = bits
+        self.ordering = tuple(ordering)
+        self.columns = columns
+        self.bound = bound
+
+    def _clone(self, **changes):
+        attrs = {'ordering': self.ordering, 'bound': self.bound, **changes}
+        return IndexedRows(self.index, self.bits, columns=self.columns, **attrs)
+
+    def order_by(self, *ordering):
+        return self._clone(ordering=ordering)
+
+    def filter(self, **kwargs):
+        # Solo lo que pide CursorPagination: {'<campo>__gt' | '<campo>__lt': posición del cursor}
+        (lookup, value), = kwargs.items()
+        field, operator = lookup.rsplit('__', 1)
+        if field in INTEGER_COLUMNS:
+            value = int(value)
+        return self._clone(bound=(field, operator, value))
+
+    def count(self):
+        return self.index.count(self.bits)
+
+    def __iter__(self):
+        return iter(self[:])
+
+    def __getitem__(self, key):
+        positions = self.index.positions(self.bits, self.ordering, self.bound)
+        start = key.start or 0
+        rows = []
+        for seen, position in enumerate(positions):
+            if key.stop is not None and seen >= key.stop:
+                break
+            if seen >= start:
+                rows.append(self.index.row(position, self.columns))
+        return rows
+
+
+# ÍNDICE DEL PROCESO
+
+
+def _signature_query():
+    rows = Pokemon.objects.order_by().values(total=Func(template='COUNT(*)', output_field=IntegerField()))
+    return (
+        Pokemon.objects.order_by('-change_version')
+        .annotate(rows=Subquery(rows))
+        .values_list('change_version', 'rows')
+    )
+
+
+def table_signature():
+    """
+    Cambia cuando cambian los datos de la tabla (escrituras y borrados)
+
+    (mayor change_version, número de filas) en una sola consulta: la fila
+    más reciente sale de pkmn_change_idx y el total, de un COUNT(*) como
+    subconsulta. Lo escriba quien lo escriba, cada cambio sube el mayor
+    change_version y cada borrado baja el número de filas.
+
+    Por eso solo ve las escrituras que asignan un change_version nuevo:
+    save(), el loader y Pokemon.objects...update() (PokemonQuerySet) lo
+    hacen; un UPDATE en SQL crudo que no lo toque no cambia la firma y los
+    índices siguen sirviendo los datos anteriores hasta la próxima escritura.
+    """
+    return _signature_query().first() or (0, 0)
+
+
+async def atable_signature():
+    """table_signature() con el ORM async"""
+    return await _signature_query().afirst() or (0, 0)
+
+
+class LazyTableIndex:
+    """
+    Índice de un proceso construido a partir de la tabla Pokemon
+
+    build() devuelve el índice, con el atributo signature
+    (table_signature() al leer la tabla). get() compara esa firma con la
+    de la tabla en cada llamada (una consulta pequeña) y, si cambió, lo
+    reconstruye (una sola vez aunque lleguen varias peticiones a la vez).
+    No depende de nada propio del proceso: una escritura desde otro
+    proceso o conexión también se ve en la siguiente llamada.
+    """
+
+    def __init__(self, build):
+        self.build = build
+        self._index = None
+        self._lock = threading.Lock()
+
+    def get(self):
+        signature = table_signature()
+        index = self._index
+        if index is not None and index.signature == signature:
+            return index
+
+        with self._lock:
+            index = self._index
+            if index is not None and index.signature == signature:
+                return index
+            self._index = self.build()
+            return self._index
+
+    async def aget(self):
+        """
+        get() para las vistas async: la firma se lee con el ORM async; solo
+        una reconstrucción (poco frecuente, lee toda la tabla) va a un hilo
+        """
+        signature = await atable_signature()
+        index = self._index
+        if index is not None and index.signature == signature:
+            return index
+        return await sync_to_async(self.get)()
+
+    def refresh(self):
+        """Reconstruye ya si este proceso lo tiene cargado (después de una carga)"""
+        if self._index is None:
+            return
+        with self._lock:
+            self._index = self.build()
+
+
+_memory_index = LazyTableIndex(PokedexIndex.from_database)
+
+
+def get_memory_index():
+    """Índice al día del proceso, o None si está desactivado"""
+    if not get_memory_index_settings()['ENABLED']:
+        return None
+    return _memory_index.get()
+
+
+async def aget_memory_index():
+    """get_memory_index() para las vistas async"""
+    if not get_memory_index_settings()['ENABLED']:
+        return None
+    return await _memory_index.aget()
+
+
+def refresh_memory_index():
+    if get_memory_index_settings()['ENABLED']:
+        _memory_index.refresh()
+
+
+def _index_ordering(params):
+    """Orden de la consulta con su desempate, o None si el índice no lo cubre"""
+    ordering = list(params.get('ordering') or [])
+    if 'pokemon_id' not in ordering and '-pokemon_id' not in ordering:
+        ordering.append('pokemon_id')  # Mismo desempate que build_pokemon_queryset
+    return ordering if supports_ordering(ordering) else None
+
+
+def _rows_from(index, params, fields, ordering):
+    if index is None:
+        return None
+    columns = columns_for_fields(fields) | {field.lstrip('-') for field in ordering}
+    return IndexedRows(index, index.filter_bits(params), ordering, columns)
+
+
+def indexed_rows(params, fields):
+    """
+    IndexedRows para estos parámetros (los de build_pokemon_queryset) o
+    None si el índice está desactivado o no cubre el orden pedido
+    """
+    ordering = _index_ordering(params)
+    if ordering is None:
+        return None
+    return _rows_from(get_memory_index(), params, fields, ordering)
+
+
+async def aindexed_rows(params, fields):
+    """indexed_rows() para las vistas async"""
+    ordering = _index_ordering(params)
+    if ordering is None:
+        return None
+    return _rows_from(await aget_memory_index(), params, fields, ordering)
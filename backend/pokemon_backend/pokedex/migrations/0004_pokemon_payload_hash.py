@@ -0,0 +1,39 @@
+# Generated by Django 5.1.1 on 2026-10-18 12:02
+
+import hashlib
+import json
+
+from django.db import migrations, models
+
+# Campos de la PokéAPI que entraban en el hash cuando se creó esta migración
+PAYLOAD_FIELDS = ['pokemon_id', 'name', 'types', 'height', 'weight', 'sprite_url']
+
+
+def backfill_payload_hash(apps, schema_editor):
+    # Calcular el hash de las filas existentes para que la próxima carga
+    # las reconozca como "sin cambios" en vez de reescribirlas todas.
+    # Mismo hash que models.compute_payload_hash en esta versión, copiado:
+    # la migración no debe depender del código actual del modelo
+    Pokemon = apps.get_model('pokedex', 'Pokemon')
+    pokemon_list = list(Pokemon.objects.all())
+    for pokemon in pokemon_list:
+        payload = {field: getattr(pokemon, field) for field in PAYLOAD_FIELDS}
+        encoded = json.dumps(payload, sort_keys=True, separators=(',', ':'))
+        pokemon.payload_hash = hashlib.sha256(encoded.encode()).hexdigest()
+    Pokemon.objects.bulk_update(pokemon_list, ['payload_hash'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pokedex', '0003_pokemonfavorite_delete_userfavorite'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='pokemon',
+            name='payload_hash',
+            field=models.CharField(blank=True, default='', editable=False, help_text='SHA-256 de los datos recibidos de la PokéAPI', max_length=64),
+        ),
+        migrations.RunPython(backfill_payload_hash, migrations.RunPython.noop),
+    ]
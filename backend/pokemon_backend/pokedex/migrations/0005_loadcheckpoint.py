@@ -0,0 +1,28 @@
+# Generated by Django 5.1.1 on 2026-10-18 12:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pokedex', '0004_pokemon_payload_hash'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LoadCheckpoint',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(max_length=100, unique=True)),
+                ('requested_ids', models.JSONField(default=list)),
+                ('completed_ids', models.JSONField(default=list)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Punto de control de carga',
+                'verbose_name_plural': 'Puntos de control de carga',
+            },
+        ),
+    ]
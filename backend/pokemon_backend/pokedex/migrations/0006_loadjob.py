@@ -0,0 +1,41 @@
+# Generated by Django 5.1.1 on 2026-10-18 12:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pokedex', '0005_loadcheckpoint'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LoadJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('spec', models.JSONField(default=dict)),
+                ('spec_key', models.CharField(max_length=100)),
+                ('resume', models.BooleanField(default=True)),
+                ('status', models.CharField(choices=[('queued', 'En cola'), ('running', 'En ejecución'), ('completed', 'Completado'), ('failed', 'Fallido')], default='queued', max_length=10)),
+                ('total', models.IntegerField(default=0)),
+                ('processed', models.IntegerField(default=0)),
+                ('resumed', models.IntegerField(default=0)),
+                ('inserted', models.IntegerField(default=0)),
+                ('updated', models.IntegerField(default=0)),
+                ('unchanged', models.IntegerField(default=0)),
+                ('errors', models.JSONField(default=dict)),
+                ('message', models.CharField(blank=True, default='', max_length=255)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Trabajo de carga',
+                'verbose_name_plural': 'Trabajos de carga',
+                'ordering': ['-created_at'],
+                'constraints': [models.UniqueConstraint(condition=models.Q(('status__in', ['queued', 'running'])), fields=('spec_key',), name='unique_active_load_job_per_spec')],
+            },
+        ),
+    ]
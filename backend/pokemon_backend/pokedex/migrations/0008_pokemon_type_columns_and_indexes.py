@@ -0,0 +1,53 @@
+# Generated by Django 5.1.1 on 2026-10-18 12:13
+
+from django.db import migrations, models
+
+
+def backfill_type_columns(apps, schema_editor):
+    # Rellenar primary_type / secondary_type desde la lista JSON 'types'
+    # (copia de models.split_types de esta versión: la migración no debe
+    # depender del código actual del modelo)
+    Pokemon = apps.get_model('pokedex', 'Pokemon')
+    pokemon_list = list(Pokemon.objects.only('pk', 'types'))
+    for pokemon in pokemon_list:
+        types = list(pokemon.types or [])
+        pokemon.primary_type = types[0] if types else ''
+        pokemon.secondary_type = types[1] if len(types) > 1 else ''
+    Pokemon.objects.bulk_update(pokemon_list, ['primary_type', 'secondary_type'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pokedex', '0006_loadjob'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='pokemon',
+            name='primary_type',
+            field=models.CharField(blank=True, default='', editable=False, help_text='Primer tipo del Pokémon', max_length=30),
+        ),
+        migrations.AddField(
+            model_name='pokemon',
+            name='secondary_type',
+            field=models.CharField(blank=True, default='', editable=False, help_text="Segundo tipo del Pokémon ('' si no tiene)", max_length=30),
+        ),
+        migrations.RunPython(backfill_type_columns, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='pokemon',
+            index=models.Index(fields=['weight'], name='pkmn_weight_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='pokemon',
+            index=models.Index(fields=['height'], name='pkmn_height_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='pokemon',
+            index=models.Index(fields=['primary_type', 'height'], name='pkmn_type1_height_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='pokemon',
+            index=models.Index(fields=['secondary_type', 'height'], name='pkmn_type2_height_idx'),
+        ),
+    ]
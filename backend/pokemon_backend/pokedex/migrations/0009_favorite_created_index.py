@@ -0,0 +1,17 @@
+# Generated by Django 5.1.1 on 2026-10-18 12:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pokedex', '0008_pokemon_type_columns_and_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='pokemonfavorite',
+            index=models.Index(fields=['-created_at'], name='fav_created_idx'),
+        ),
+    ]
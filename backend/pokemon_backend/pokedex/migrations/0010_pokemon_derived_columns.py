@@ -0,0 +1,68 @@
+# Generated by Django 5.1.1 on 2026-10-18 12:26
+
+from django.db import migrations, models
+
+
+def backfill_derived_columns(apps, schema_editor):
+    # Calcular las columnas nuevas para los Pokémon ya cargados (mismas
+    # reglas que models.compute_derived_fields en esta versión, copiadas:
+    # la migración no debe depender del código actual del modelo)
+    Pokemon = apps.get_model('pokedex', 'Pokemon')
+    fields = ['reversed_name', 'types_display', 'weight_filter_match', 'grass_type_match', 'flying_tall_match']
+    pokemon_list = list(Pokemon.objects.only('pk', 'name', 'types', 'height', 'weight'))
+    for pokemon in pokemon_list:
+        types = pokemon.types or []
+        pokemon.reversed_name = pokemon.name[::-1]
+        pokemon.types_display = ' / '.join(t.title() for t in types) if types else 'Unknown'
+        pokemon.weight_filter_match = 30 < pokemon.weight < 80
+        pokemon.grass_type_match = 'grass' in types
+        pokemon.flying_tall_match = 'flying' in types and pokemon.height > 10
+    Pokemon.objects.bulk_update(pokemon_list, fields, batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pokedex', '0009_favorite_created_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='pokemon',
+            name='flying_tall_match',
+            field=models.BooleanField(default=False, editable=False, help_text='Requisito 3: tipo flying y altura > 10'),
+        ),
+        migrations.AddField(
+            model_name='pokemon',
+            name='grass_type_match',
+            field=models.BooleanField(default=False, editable=False, help_text='Requisito 2: tipo grass'),
+        ),
+        migrations.AddField(
+            model_name='pokemon',
+            name='reversed_name',
+            field=models.CharField(blank=True, default='', editable=False, help_text='Requisito 4: nombre invertido', max_length=100),
+        ),
+        migrations.AddField(
+            model_name='pokemon',
+            name='types_display',
+            field=models.CharField(blank=True, default='', editable=False, help_text="Tipos como texto legible (ej: 'Grass / Poison')", max_length=255),
+        ),
+        migrations.AddField(
+            model_name='pokemon',
+            name='weight_filter_match',
+            field=models.BooleanField(default=False, editable=False, help_text='Requisito 1: peso entre 30 y 80'),
+        ),
+        migrations.RunPython(backfill_derived_columns, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='pokemon',
+            index=models.Index(condition=models.Q(('weight_filter_match', True)), fields=['pokemon_id'], name='pkmn_weight_match_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='pokemon',
+            index=models.Index(condition=models.Q(('grass_type_match', True)), fields=['pokemon_id'], name='pkmn_grass_match_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='pokemon',
+            index=models.Index(condition=models.Q(('flying_tall_match', True)), fields=['pokemon_id'], name='pkmn_flying_match_idx'),
+        ),
+    ]
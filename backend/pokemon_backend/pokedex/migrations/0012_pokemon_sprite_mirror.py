@@ -0,0 +1,23 @@
+# Generated by Django 5.1.1 on 2026-10-18 12:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pokedex', '0010_pokemon_derived_columns'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='pokemon',
+            name='sprite_local_url',
+            field=models.CharField(blank=True, editable=False, help_text='Ruta del sprite servido por el backend (/sprites/...)', max_length=200, null=True),
+        ),
+        migrations.AddField(
+            model_name='pokemon',
+            name='sprite_source',
+            field=models.URLField(blank=True, editable=False, help_text='sprite_url de la que salió la copia local', null=True),
+        ),
+    ]
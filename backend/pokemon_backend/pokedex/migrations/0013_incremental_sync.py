@@ -0,0 +1,51 @@
+# Generated by Django 5.1.1 on 2026-10-18 12:55
+
+from django.db import migrations, models
+from django.db.models import F
+
+
+def backfill_sync_columns(apps, schema_editor):
+    # Los Pokémon ya cargados forman el cambio #1 y cuentan como
+    # sincronizados en su última actualización
+    Pokemon = apps.get_model('pokedex', 'Pokemon')
+    ChangeCounter = apps.get_model('pokedex', 'ChangeCounter')
+    if Pokemon.objects.exists():
+        Pokemon.objects.update(change_version=1, last_synced_at=F('updated_at'))
+        ChangeCounter.objects.create(name='pokemon', value=1)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pokedex', '0012_pokemon_sprite_mirror'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ChangeCounter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=50, unique=True)),
+                ('value', models.BigIntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'Contador de cambios',
+                'verbose_name_plural': 'Contadores de cambios',
+            },
+        ),
+        migrations.AddField(
+            model_name='pokemon',
+            name='change_version',
+            field=models.BigIntegerField(default=0, editable=False, help_text='Número de cambio (ChangeCounter) de la última modificación'),
+        ),
+        migrations.AddField(
+            model_name='pokemon',
+            name='last_synced_at',
+            field=models.DateTimeField(blank=True, editable=False, help_text='Última vez que se comprobó contra la PokéAPI', null=True),
+        ),
+        migrations.AddIndex(
+            model_name='pokemon',
+            index=models.Index(fields=['change_version', 'pokemon_id'], name='pkmn_change_idx'),
+        ),
+        migrations.RunPython(backfill_sync_columns, migrations.RunPython.noop),
+    ]
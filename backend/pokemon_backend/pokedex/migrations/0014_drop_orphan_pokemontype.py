@@ -0,0 +1,27 @@
+from django.db import migrations
+
+
+# Tablas de la antigua 0007_pokemontype (retirada de la serie: 0008 ya
+# guarda el tipo primario y secundario como columnas). Una base de datos
+# que la aplicó conserva estas tablas sin modelo; una nueva nunca las tuvo.
+# La tabla M2M va primero porque referencia a pokedex_pokemontype.
+ORPHAN_TABLES = ['pokedex_pokemon_pokemon_types', 'pokedex_pokemontype']
+
+
+def drop_orphan_tables(apps, schema_editor):
+    existing = set(schema_editor.connection.introspection.table_names())
+    for table in ORPHAN_TABLES:
+        if table in existing:
+            schema_editor.execute(f'DROP TABLE {schema_editor.quote_name(table)}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pokedex', '0013_incremental_sync'),
+    ]
+
+    operations = [
+        # Solo toca tablas fuera del estado de los modelos: no hay state_operations
+        migrations.RunPython(drop_orphan_tables, migrations.RunPython.noop),
+    ]
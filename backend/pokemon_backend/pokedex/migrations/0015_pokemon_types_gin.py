@@ -0,0 +1,41 @@
+from django.db import migrations
+
+
+# Índice GIN sobre types (JSONField es jsonb en PostgreSQL) para los filtros
+# por tipo con contención (types @> '["grass"]'), ver queries._has_type.
+# SQLite no tiene índices GIN: ahí los filtros usan primary_type /
+# secondary_type y esta migración no hace nada.
+#
+# El índice no se declara en Pokemon.Meta.indexes: el estado de los modelos
+# es el mismo en los dos motores (state_operations vacías), así que
+# makemigrations no ve diferencias y las reconstrucciones de tabla de SQLite
+# nunca intentan crearlo. IF NOT EXISTS: una base de datos que aplicó la
+# antigua 0011 ya lo tiene.
+CREATE_INDEX = (
+    'CREATE INDEX IF NOT EXISTS pkmn_types_gin '
+    'ON pokedex_pokemon USING gin (types jsonb_path_ops)'
+)
+DROP_INDEX = 'DROP INDEX IF EXISTS pkmn_types_gin'
+
+
+def run_on_postgresql(sql):
+    def operation(apps, schema_editor):
+        if schema_editor.connection.vendor == 'postgresql':
+            schema_editor.execute(sql)
+    return operation
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pokedex', '0014_drop_orphan_pokemontype'),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            database_operations=[
+                migrations.RunPython(run_on_postgresql(CREATE_INDEX), run_on_postgresql(DROP_INDEX)),
+            ],
+            state_operations=[],
+        ),
+    ]
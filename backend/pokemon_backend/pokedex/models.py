@@ -1,6 +1,120 @@
-from django.db import models
+import hashlib
+import json
+
+from django.db import models, transaction
+from django.db.models import F
 from django.contrib.auth.models import User
 
+from .cache import invalidate_on_commit
+
+
+# Campos que vienen de la PokéAPI (los que entran en el hash del payload)
+PAYLOAD_FIELDS = ['pokemon_id', 'name', 'types', 'height', 'weight', 'sprite_url']
+
+
+def compute_payload_hash(record):
+    """
+    Hash estable (SHA-256) de los datos de un Pokémon
+
+    Sirve para saber si un registro cambió sin comparar campo por campo
+    """
+    payload = {field: record.get(field) for field in PAYLOAD_FIELDS}
+    encoded = json.dumps(payload, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(encoded.encode()).hexdigest()
+
+
+def split_types(types):
+    """
+    Tipo primario y secundario a partir de la lista JSON de tipos
+    
+    Un Pokémon tiene como máximo dos tipos; '' si no tiene segundo tipo.
+    """
+    types = list(types or [])
+    return (types[0] if types else ''), (types[1] if len(types) > 1 else '')
+
+
+def reverse_name(name):
+    """Nombre invertido: 'bulbasaur' → 'ruasablub'"""
+    return name[::-1]
+
+
+def format_types(types):
+    """Lista de tipos como texto legible: ['grass', 'poison'] → 'Grass / Poison'"""
+    if not types:
+        return "Unknown"
+    return " / ".join([t.title() for t in types])
+
+
+# Filtros del profesor Oak (valores directos de la PokéAPI, sin conversiones)
+
+def weight_filter_match(weight):
+    """Requisito 1: pesa más de 30 y menos de 80"""
+    return 30 < weight < 80
+
+
+def grass_type_match(types):
+    """Requisito 2: es tipo grass"""
+    return 'grass' in types if types else False
+
+
+def flying_tall_match(types, height):
+    """Requisito 3: es tipo flying y mide más de 10"""
+    is_flying = 'flying' in types if types else False
+    return is_flying and height > 10
+
+
+def compute_derived_fields(record):
+    """
+    Columnas precalculadas a partir de name, types, height y weight
+
+    record: diccionario o cualquier objeto con esas claves (ver Pokemon.sync_denormalized_fields)
+    """
+    primary_type, secondary_type = split_types(record['types'])
+    return {
+        'primary_type': primary_type,
+        'secondary_type': secondary_type,
+        'reversed_name': reverse_name(record['name']),
+        'types_display': format_types(record['types']),
+        'weight_filter_match': weight_filter_match(record['weight']),
+        'grass_type_match': grass_type_match(record['types']),
+        'flying_tall_match': flying_tall_match(record['types'], record['height']),
+    }
+
+
+# Campos desnormalizados: se recalculan a partir de los datos de la PokéAPI
+DENORMALIZED_FIELDS = [
+    'primary_type',
+    'secondary_type',
+    'reversed_name',
+    'types_display',
+    'weight_filter_match',
+    'grass_type_match',
+    'flying_tall_match',
+]
+
+
+class PokemonQuerySet(models.QuerySet):
+    """
+    update() cuenta como un cambio más del feed
+
+    Si no se pasa change_version, reserva el siguiente número y lo asigna a
+    todas las filas actualizadas, en la misma transacción, y deja sin validez
+    las respuestas guardadas: así los índices en memoria (table_signature) y
+    GET /pokemon/changes/ ven la escritura. Para tocar columnas que no son
+    parte de los datos (last_synced_at) sin generar un cambio, pasar
+    change_version=F('change_version').
+    """
+
+    def update(self, **kwargs):
+        if 'change_version' in kwargs:
+            return super().update(**kwargs)
+        with transaction.atomic(using=self.db):
+            kwargs['change_version'] = next_change_version()
+            rows = super().update(**kwargs)
+            invalidate_on_commit()
+        return rows
+
+
 class Pokemon(models.Model):
     """
     Modelo para almacenar información de Pokémon obtenida de la PokéAPI
@@ -22,6 +136,24 @@ class Pokemon(models.Model):
     # Los tipos se almacenan como JSON porque un Pokémon puede tener múltiples tipos
     types = models.JSONField(help_text="Lista de tipos del Pokémon (ej: ['grass', 'poison'])")
     
+    # Copia desnormalizada de 'types' en columnas indexables (ver split_types)
+    primary_type = models.CharField(max_length=30, blank=True, default='', editable=False,
+                                    help_text="Primer tipo del Pokémon")
+    secondary_type = models.CharField(max_length=30, blank=True, default='', editable=False,
+                                      help_text="Segundo tipo del Pokémon ('' si no tiene)")
+    
+    # Campos calculados guardados como columnas (ver compute_derived_fields)
+    reversed_name = models.CharField(max_length=100, blank=True, default='', editable=False,
+                                     help_text="Requisito 4: nombre invertido")
+    types_display = models.CharField(max_length=255, blank=True, default='', editable=False,
+                                     help_text="Tipos como texto legible (ej: 'Grass / Poison')")
+    weight_filter_match = models.BooleanField(default=False, editable=False,
+                                              help_text="Requisito 1: peso entre 30 y 80")
+    grass_type_match = models.BooleanField(default=False, editable=False,
+                                           help_text="Requisito 2: tipo grass")
+    flying_tall_match = models.BooleanField(default=False, editable=False,
+                                            help_text="Requisito 3: tipo flying y altura > 10")
+    
     # Medidas físicas (valores directos de la PokéAPI, sin conversiones)
     height = models.IntegerField(help_text="Altura en unidades de la PokéAPI")
     weight = models.IntegerField(help_text="Peso en unidades de la PokéAPI")
@@ -29,54 +161,148 @@ class Pokemon(models.Model):
     # URL del sprite para mostrar la imagen
     sprite_url = models.URLField(blank=True, null=True, help_text="URL de la imagen del Pokémon")
     
+    # Copia local del sprite (ver pokedex/sprites.py); sprite_url queda como respaldo
+    sprite_local_url = models.CharField(max_length=200, blank=True, null=True, editable=False,
+                                        help_text="Ruta del sprite servido por el backend (/sprites/...)")
+    sprite_source = models.URLField(blank=True, null=True, editable=False,
+                                    help_text="sprite_url de la que salió la copia local")
+    
+    # Hash de los datos de la PokéAPI: evita reescribir filas sin cambios
+    payload_hash = models.CharField(max_length=64, blank=True, default='', editable=False,
+                                    help_text="SHA-256 de los datos recibidos de la PokéAPI")
+    
+    # Sincronización incremental (ver loader.py y GET /pokemon/changes/)
+    last_synced_at = models.DateTimeField(null=True, blank=True, editable=False,
+                                          help_text="Última vez que se comprobó contra la PokéAPI")
+    change_version = models.BigIntegerField(default=0, editable=False,
+                                            help_text="Número de cambio (ChangeCounter) de la última modificación")
+    
     # Timestamps para saber cuándo se creó/actualizó
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    objects = PokemonQuerySet.as_manager()
+    
     class Meta:
         ordering = ['pokemon_id']  # Ordenar por ID de Pokémon
         verbose_name = "Pokémon"
         verbose_name_plural = "Pokémon"
+        indexes = [
+            # Filtro de peso (30 < peso < 80) y rangos de la consulta genérica
+            models.Index(fields=['weight'], name='pkmn_weight_idx'),
+            models.Index(fields=['height'], name='pkmn_height_idx'),
+            # Filtros por tipo: grass (tipo) y flying-tall (tipo + altura)
+            models.Index(fields=['primary_type', 'height'], name='pkmn_type1_height_idx'),
+            models.Index(fields=['secondary_type', 'height'], name='pkmn_type2_height_idx'),
+            # Filtros predefinidos: índices parciales con solo las filas que
+            # cumplen la marca, ya en orden de pokemon_id
+            models.Index(fields=['pokemon_id'], condition=models.Q(weight_filter_match=True),
+                         name='pkmn_weight_match_idx'),
+            models.Index(fields=['pokemon_id'], condition=models.Q(grass_type_match=True),
+                         name='pkmn_grass_match_idx'),
+            models.Index(fields=['pokemon_id'], condition=models.Q(flying_tall_match=True),
+                         name='pkmn_flying_match_idx'),
+            # Feed de cambios: ?since=<versión> en orden (versión, pokemon_id)
+            models.Index(fields=['change_version', 'pokemon_id'], name='pkmn_change_idx'),
+        ]
     
     def __str__(self):
         return f"#{self.pokemon_id:03d} - {self.name.title()}"
-
-
-    # PROPIEDADES CALCULADAS
-
     
-    @property
-    def reversed_name(self):
-        """
-        Requisito 4: Devuelve el nombre invertido
-        Ejemplo: 'bulbasaur' → 'ruasablub'
-        """
-        return self.name[::-1]
+    def sync_denormalized_fields(self):
+        """Recalcula las columnas desnormalizadas y calculadas a partir de los datos"""
+        record = {field: getattr(self, field) for field in ('name', 'types', 'height', 'weight')}
+        for field, value in compute_derived_fields(record).items():
+            setattr(self, field, value)
     
-    @property
-    def types_display(self):
-        """Convierte la lista de tipos en texto legible"""
-        if not self.types:
-            return "Unknown"
-        return " / ".join([t.title() for t in self.types])
+    def save(self, *args, **kwargs):
+        # Mantener hash y columnas desnormalizadas sincronizados aunque se
+        # guarde fuera del loader; cada guardado es un cambio nuevo del feed
+        # y deja sin validez las respuestas guardadas y el índice en memoria
+        self.sync_denormalized_fields()
+        self.payload_hash = compute_payload_hash(
+            {field: getattr(self, field) for field in PAYLOAD_FIELDS}
+        )
+        if kwargs.get('update_fields') is not None:
+            kwargs['update_fields'] = {
+                *kwargs['update_fields'], 'payload_hash', 'change_version', *DENORMALIZED_FIELDS
+            }
+        with transaction.atomic():
+            self.change_version = next_change_version()
+            super().save(*args, **kwargs)
+            invalidate_on_commit()
+
+    def delete(self, *args, **kwargs):
+        with transaction.atomic():
+            result = super().delete(*args, **kwargs)
+            invalidate_on_commit()
+        return result
+
     
 
     # MÉTODOS PARA LOS FILTROS DEL PROFESOR OAK
+    # Calculan sobre los datos actuales; las columnas *_match guardan el mismo
+    # resultado y son las que usan los filtros SQL de PokemonViewSet
 
     
     def matches_weight_filter(self):
         """Requisito 1: Verifica si pesa más de 30 y menos de 80 (valores directos API)"""
-        return 30 < self.weight < 80
+        return weight_filter_match(self.weight)
     
     def is_grass_type(self):
         """Requisito 2: Verifica si es tipo grass"""
-        return 'grass' in self.types if self.types else False
+        return grass_type_match(self.types)
     
     def is_flying_and_tall(self):
         """Requisito 3: Verifica si es tipo flying y mide más de 10 (valores directos API)"""
-        is_flying = 'flying' in self.types if self.types else False
-        is_tall = self.height > 10
-        return is_flying and is_tall
+        return flying_tall_match(self.types, self.height)
+
+
+class ChangeCounter(models.Model):
+    """
+    Contadores de cambios, uno por fila (name)
+
+    'pokemon': cada escritura de Pokémon (un lote del loader, un save(),
+    una copia de sprites) reserva el siguiente número y lo guarda en
+    Pokemon.change_version. El incremento es un UPDATE sobre esta fila,
+    así que dos escrituras simultáneas nunca reciben el mismo número.
+
+    'data': sube con cada invalidación de la caché de respuestas
+    (cache.bump_data_version), también con los favoritos.
+    """
+    
+    name = models.CharField(max_length=50, unique=True)
+    value = models.BigIntegerField(default=0)
+    
+    class Meta:
+        verbose_name = "Contador de cambios"
+        verbose_name_plural = "Contadores de cambios"
+    
+    def __str__(self):
+        return f"{self.name}: {self.value}"
+
+
+POKEMON_CHANGES = 'pokemon'
+DATA_CHANGES = 'data'
+
+
+def next_change_version():
+    """
+    Reserva el siguiente número de cambio
+
+    Debe llamarse dentro de la transacción que escribe las filas: el
+    UPDATE bloquea el contador hasta que esa transacción termina.
+    """
+    counter = ChangeCounter.objects.filter(name=POKEMON_CHANGES)
+    if not counter.update(value=F('value') + 1):
+        ChangeCounter.objects.get_or_create(name=POKEMON_CHANGES)
+        counter.update(value=F('value') + 1)
+    return counter.values_list('value', flat=True).get()
+
+
+def current_change_version():
+    """Último número de cambio confirmado (0 si nunca hubo cambios)"""
+    return ChangeCounter.objects.filter(name=POKEMON_CHANGES).values_list('value', flat=True).first() or 0
 
 
 class PokemonFavorite(models.Model):
@@ -93,8 +319,116 @@ class PokemonFavorite(models.Model):
     
     class Meta:
         ordering = ['-created_at']  # Los más recientes primero
+        indexes = [
+            # Paginación por cursor del listado (más recientes primero)
+            models.Index(fields=['-created_at'], name='fav_created_idx'),
+        ]
         verbose_name = "Pokémon Favorito"
         verbose_name_plural = "Pokémon Favoritos"
     
     def __str__(self):
         return f"⭐ {self.pokemon.name.title()}"
+    
+    def save(self, *args, **kwargs):
+        # Lo guarde quien lo guarde (API, shell, admin), las respuestas
+        # guardadas de listados y estado de favoritos dejan de valer
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            invalidate_on_commit()
+    
+    def delete(self, *args, **kwargs):
+        with transaction.atomic():
+            result = super().delete(*args, **kwargs)
+            invalidate_on_commit()
+        return result
+
+
+class LoadCheckpoint(models.Model):
+    """
+    Punto de control de una carga desde la PokéAPI
+
+    Guarda qué IDs ya se cargaron para que una carga interrumpida
+    (por ejemplo, toda la National Dex) se pueda reanudar sin empezar
+    otra vez desde el #1.
+    """
+    
+    # Identifica la carga: 'all', 'range:1-151', 'ids:<hash>'
+    key = models.CharField(max_length=100, unique=True)
+    
+    # IDs pedidos y IDs ya guardados en la base de datos
+    requested_ids = models.JSONField(default=list)
+    completed_ids = models.JSONField(default=list)
+    
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        verbose_name = "Punto de control de carga"
+        verbose_name_plural = "Puntos de control de carga"
+    
+    def __str__(self):
+        return f"{self.key}: {len(self.completed_ids)}/{len(self.requested_ids)}"
+    
+    @property
+    def pending_ids(self):
+        completed = set(self.completed_ids)
+        return [pokemon_id for pokemon_id in self.requested_ids if pokemon_id not in completed]
+
+
+class LoadJob(models.Model):
+    """
+    Trabajo en segundo plano de carga desde la PokéAPI
+
+    El POST de carga crea (o reutiliza) un LoadJob y responde de inmediato;
+    un hilo del propio proceso ejecuta la carga y va actualizando el avance.
+    """
+    
+    class Status(models.TextChoices):
+        QUEUED = 'queued', 'En cola'
+        RUNNING = 'running', 'En ejecución'
+        COMPLETED = 'completed', 'Completado'
+        FAILED = 'failed', 'Fallido'
+    
+    ACTIVE_STATUSES = [Status.QUEUED, Status.RUNNING]
+    
+    # Qué cargar (mismo formato que LoadSpec) y su clave de checkpoint
+    spec = models.JSONField(default=dict)
+    spec_key = models.CharField(max_length=100)
+    resume = models.BooleanField(default=True)
+    
+    status = models.CharField(max_length=10, choices=Status.choices, default=Status.QUEUED)
+    
+    # Avance de la carga
+    total = models.IntegerField(default=0)
+    processed = models.IntegerField(default=0)
+    resumed = models.IntegerField(default=0)
+    inserted = models.IntegerField(default=0)
+    updated = models.IntegerField(default=0)
+    unchanged = models.IntegerField(default=0)
+    errors = models.JSONField(default=dict)  # {pokemon_id: mensaje}
+    message = models.CharField(max_length=255, blank=True, default='')
+    
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        ordering = ['-created_at']
+        verbose_name = "Trabajo de carga"
+        verbose_name_plural = "Trabajos de carga"
+        constraints = [
+            # Solo un trabajo activo por carga: dos POST simultáneos se unen
+            models.UniqueConstraint(
+                fields=['spec_key'],
+                condition=models.Q(status__in=['queued', 'running']),
+                name='unique_active_load_job_per_spec',
+            ),
+        ]
+    
+    def __str__(self):
+        return f"Carga {self.spec_key} ({self.status}): {self.processed}/{self.total}"
+    
+    @property
+    def loaded(self):
+        return self.inserted + self.updated + self.unchanged
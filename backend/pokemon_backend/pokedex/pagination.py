@@ -0,0 +1,102 @@
+"""
+Paginación por cursor (keyset) para los listados
+
+En vez de OFFSET, cada página continúa desde el último valor visto
+(WHERE pokemon_id > X ORDER BY pokemon_id LIMIT N): la página 500 cuesta lo
+mismo que la primera. El cliente sigue el enlace 'next' de cada respuesta.
+
+- ?page_size=N elige el tamaño de página (con un máximo)
+- ?cursor=... lo genera el servidor; no se construye a mano
+
+Las vistas async (async_views.py) usan estas mismas clases con
+apaginate_queryset: el mismo cálculo de DRF, con la página leída por el
+ORM async.
+"""
+
+from rest_framework.pagination import CursorPagination
+
+from .memory_index import IndexedRows
+
+
+class _PlannedRows:
+    """
+    QuerySet (o IndexedRows) que CursorPagination ordena y filtra como
+    siempre, pero sin leerlo: el corte de la página se guarda en plan y
+    se responde con plan.rows (vacío mientras no se lean)
+    """
+
+    def __init__(self, queryset, plan):
+        self.queryset = queryset
+        self.plan = plan
+
+    def order_by(self, *ordering):
+        return _PlannedRows(self.queryset.order_by(*ordering), self.plan)
+
+    def filter(self, **kwargs):
+        return _PlannedRows(self.queryset.filter(**kwargs), self.plan)
+
+    def __getitem__(self, key):
+        if self.plan.rows is None:
+            self.plan.page = self.queryset[key]
+            return []
+        return self.plan.rows
+
+
+class _PagePlan:
+    def __init__(self):
+        self.page = None
+        self.rows = None
+
+
+class AsyncCursorMixin:
+    """
+    apaginate_queryset: paginate_queryset para las vistas async
+
+    CursorPagination solo lee la base de datos en un punto (la página más
+    una fila). Una primera pasada arma esa consulta (filtro keyset, orden
+    y LIMIT), se lee con async for y una segunda pasada calcula los
+    cursores sobre las filas leídas: mismos resultados y enlaces que
+    paginate_queryset, sin su copia del algoritmo.
+    """
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        plan = _PagePlan()
+        self.paginate_queryset(_PlannedRows(queryset, plan), request, view)
+        if isinstance(plan.page, list):
+            plan.rows = plan.page  # IndexedRows: ya está en memoria
+        else:
+            plan.rows = [row async for row in plan.page]
+        return self.paginate_queryset(_PlannedRows(queryset, plan), request, view)
+
+
+class PokemonCursorPagination(AsyncCursorMixin, CursorPagination):
+    """
+    Pokémon ordenados por pokemon_id
+
+    Si el QuerySet ya trae un orden (por ejemplo ?ordering=-weight en
+    /pokemon/query/), el cursor usa ese mismo orden. También pagina las
+    filas del índice en memoria (IndexedRows), con los mismos cursores.
+    """
+
+    ordering = 'pokemon_id'
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 200
+
+    def get_ordering(self, request, queryset, view):
+        if isinstance(queryset, _PlannedRows):
+            queryset = queryset.queryset
+        if isinstance(queryset, IndexedRows):
+            return queryset.ordering
+        if queryset.query.order_by:
+            return tuple(queryset.query.order_by)
+        return super().get_ordering(request, queryset, view)
+
+
+class FavoriteCursorPagination(AsyncCursorMixin, CursorPagination):
+    """Favoritos, del más reciente al más antiguo"""
+
+    ordering = '-created_at'
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 200
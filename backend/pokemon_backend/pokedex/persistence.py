@@ -0,0 +1,129 @@
+"""
+Capa de persistencia por lotes para los Pokémon
+
+Sustituye el get_or_create + save() por fila por un upsert masivo:
+- Una consulta para leer los hashes existentes de cada lote
+- Un único bulk_create(update_conflicts=True) por lote
+- Todo dentro de una sola transacción
+- Las filas cuyo hash no cambió no se reescriben (sin churn de updated_at):
+  solo se marca last_synced_at
+- Las filas escritas reciben un número de cambio nuevo (change_version),
+  uno por llamada, para el feed GET /pokemon/changes/?since=
+- Las columnas desnormalizadas (primary_type, secondary_type) se calculan
+  aquí mismo, igual que en Pokemon.save()
+- Si algo cambió, se invalida la caché de respuestas al confirmar
+"""
+
+from dataclasses import dataclass
+
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .cache import invalidate_on_commit
+from .models import Pokemon, PAYLOAD_FIELDS, DENORMALIZED_FIELDS, compute_payload_hash, next_change_version
+
+
+# Campos que se actualizan cuando el Pokémon ya existe
+UPDATE_FIELDS = [field for field in PAYLOAD_FIELDS if field != 'pokemon_id'] + DENORMALIZED_FIELDS + [
+    'payload_hash',
+    'last_synced_at',
+    'change_version',
+    'updated_at',
+]
+
+DEFAULT_BATCH_SIZE = 500
+
+
+@dataclass
+class UpsertResult:
+    """Conteo de filas afectadas por un upsert masivo"""
+
+    inserted: int = 0
+    updated: int = 0
+    unchanged: int = 0
+
+    @property
+    def total(self):
+        return self.inserted + self.updated + self.unchanged
+
+    def as_dict(self):
+        return {
+            'inserted': self.inserted,
+            'updated': self.updated,
+            'unchanged': self.unchanged,
+        }
+
+
+def bulk_upsert_pokemon(records, batch_size=DEFAULT_BATCH_SIZE, synced_at=None):
+    """
+    Inserta o actualiza Pokémon en lotes dentro de una transacción
+
+    records: diccionarios con los campos de PAYLOAD_FIELDS (ver parse_pokemon)
+    synced_at: fecha en que se comprobaron los datos (last_synced_at); por
+    defecto ahora, o la del snapshot al importar uno
+    """
+    # Si un ID viene repetido, gana el último registro
+    records = list({record['pokemon_id']: record for record in records}.values())
+    result = UpsertResult()
+    synced_at = synced_at or timezone.now()
+    change_version = None
+
+    with transaction.atomic():
+        for start in range(0, len(records), batch_size):
+            chunk = records[start:start + batch_size]
+
+            existing_hashes = dict(
+                Pokemon.objects
+                .filter(pokemon_id__in=[record['pokemon_id'] for record in chunk])
+                .values_list('pokemon_id', 'payload_hash')
+            )
+
+            to_write = []
+            unchanged_ids = []
+            for record in chunk:
+                payload_hash = compute_payload_hash(record)
+                current_hash = existing_hashes.get(record['pokemon_id'])
+
+                if current_hash == payload_hash:
+                    result.unchanged += 1
+                    unchanged_ids.append(record['pokemon_id'])
+                    continue
+
+                if current_hash is None:
+                    result.inserted += 1
+                else:
+                    result.updated += 1
+
+                # Un solo número de cambio para todo lo que escribe esta llamada
+                if change_version is None:
+                    change_version = next_change_version()
+
+                pokemon = Pokemon(
+                    **{field: record[field] for field in PAYLOAD_FIELDS},
+                    payload_hash=payload_hash,
+                    last_synced_at=synced_at,
+                    change_version=change_version,
+                )
+                pokemon.sync_denormalized_fields()
+                to_write.append(pokemon)
+
+            if unchanged_ids:
+                # Comprobados contra la PokéAPI: cuentan como frescos, sin
+                # ser un cambio del feed (se conserva su change_version)
+                Pokemon.objects.filter(pokemon_id__in=unchanged_ids).update(
+                    last_synced_at=synced_at, change_version=F('change_version')
+                )
+
+            if to_write:
+                Pokemon.objects.bulk_create(
+                    to_write,
+                    update_conflicts=True,
+                    unique_fields=['pokemon_id'],
+                    update_fields=UPDATE_FIELDS,
+                )
+
+        if result.inserted or result.updated:
+            invalidate_on_commit()
+
+    return result
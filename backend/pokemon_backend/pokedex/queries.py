@@ -0,0 +1,137 @@
+"""
+Consulta genérica de Pokémon
+
+Convierte los parámetros validados por PokemonQuerySerializer en un único
+QuerySet (una sola consulta SQL):
+- Tipos (any/all): comparaciones sobre las columnas indexadas
+  primary_type / secondary_type (un Pokémon tiene como máximo dos tipos);
+  en PostgreSQL, contención JSONB (types @> '["grass"]') con el índice GIN
+  de la migración 0015
+- Rangos de altura/peso: comparaciones directas sobre columnas
+- Filtros predefinidos (matches): columnas booleanas precalculadas
+- Prefijo de nombre, orden y proyección de columnas (.only)
+"""
+
+from django.db import connection
+from django.db.models import Q
+
+from .models import Pokemon
+
+
+RANGE_FIELDS = ['height', 'weight']
+RANGE_OPERATORS = ['gt', 'gte', 'lt', 'lte']
+
+# Filtros predefinidos (?matches=) -> columna booleana precalculada e indexada
+MATCH_COLUMNS = {
+    'weight_filter': 'weight_filter_match',
+    'grass_type': 'grass_type_match',
+    'flying_tall': 'flying_tall_match',
+}
+
+
+def columns_for_fields(fields):
+    """Columnas de Pokemon necesarias para serializar estos campos"""
+    # Todos los campos de la respuesta son columnas (los calculados se guardan al escribir)
+    return {'pokemon_id', *fields}
+
+
+def values_for_fields(queryset, fields):
+    """
+    QuerySet de diccionarios (.values) con las columnas que necesitan estos
+    campos y las del orden (el cursor de paginación las lee)
+    """
+    columns = columns_for_fields(fields) | {field.lstrip('-') for field in queryset.query.order_by}
+    return queryset.values(*columns)
+
+
+def _has_type(type_names):
+    """El Pokémon tiene alguno de estos tipos (como primario o secundario)"""
+    if connection.vendor == 'postgresql':
+        # types es jsonb: cada @> se resuelve con el índice GIN pkmn_types_gin
+        condition = Q()
+        for type_name in type_names:
+            condition |= Q(types__contains=[type_name])
+        return condition
+    return Q(primary_type__in=type_names) | Q(secondary_type__in=type_names)
+
+
+def _has_all_types(type_names):
+    """El Pokémon tiene todos estos tipos"""
+    if connection.vendor == 'postgresql':
+        return Q(types__contains=list(type_names))
+    condition = Q()
+    for type_name in type_names:
+        condition &= _has_type([type_name])
+    return condition
+
+
+def build_pokemon_queryset(params, queryset=None):
+    """
+    Compila los parámetros de consulta en un QuerySet de Pokemon
+
+    params: validated_data de PokemonQuerySerializer (o un dict equivalente)
+    """
+    queryset = Pokemon.objects.all() if queryset is None else queryset
+
+    for match in params.get('matches') or []:
+        queryset = queryset.filter(**{MATCH_COLUMNS[match]: True})
+
+    types = params.get('types')
+    if types:
+        if params.get('types_match', 'any') == 'all':
+            queryset = queryset.filter(_has_all_types(types))
+        else:
+            queryset = queryset.filter(_has_type(types))
+
+    for field in RANGE_FIELDS:
+        for operator in RANGE_OPERATORS:
+            value = params.get(f'{field}_{operator}')
+            if value is not None:
+                queryset = queryset.filter(**{f'{field}__{operator}': value})
+
+    if params.get('name_prefix'):
+        queryset = queryset.filter(name__startswith=params['name_prefix'].lower())
+
+    ordering = list(params.get('ordering') or [])
+    if 'pokemon_id' not in ordering and '-pokemon_id' not in ordering:
+        ordering.append('pokemon_id')  # Desempate estable
+    queryset = queryset.order_by(*ordering)
+
+    fields = params.get('fields')
+    if fields:
+        # Las columnas del orden también: el cursor de paginación las lee
+        columns = columns_for_fields(fields) | {field.lstrip('-') for field in ordering}
+        queryset = queryset.only(*columns)
+
+    return queryset
+
+
+def describe_query(params):
+    """Texto legible con los filtros aplicados (para 'filter_applied')"""
+    parts = []
+    labels = {'height': 'Altura', 'weight': 'Peso'}
+    match_labels = {
+        'weight_filter': 'Peso más de 30 y menos de 80',
+        'grass_type': 'Tipo: Grass',
+        'flying_tall': 'Tipo Flying y altura > 10',
+    }
+
+    for match in params.get('matches') or []:
+        parts.append(match_labels[match])
+    symbols = {'gt': '>', 'gte': '>=', 'lt': '<', 'lte': '<='}
+
+    types = params.get('types')
+    if types:
+        joiner = ' y ' if params.get('types_match') == 'all' else ' o '
+        parts.append('Tipo ' + joiner.join(type_name.title() for type_name in types))
+
+    for field in RANGE_FIELDS:
+        for operator in RANGE_OPERATORS:
+            value = params.get(f'{field}_{operator}')
+            if value is not None:
+                parts.append(f'{labels[field]} {symbols[operator]} {value}')
+
+    if params.get('name_prefix'):
+        parts.append(f"Nombre empieza por '{params['name_prefix']}'")
+
+    return ', '.join(parts) or 'Sin filtros'
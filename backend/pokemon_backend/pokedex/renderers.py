@@ -0,0 +1,68 @@
+"""
+Renderer JSON rápido para los listados
+
+Los listados arman sus filas con los constructores rápidos de
+serializers.py (FastRows: solo int, str, None y listas de str). Esas filas
+se codifican con orjson si está instalado; el resto de la respuesta
+(count, next, message...) se codifica igual que JSONRenderer de DRF, así
+que los bytes son idénticos a los de antes.
+
+Cualquier otra respuesta pasa sin cambios por JSONRenderer.
+"""
+
+from rest_framework.compat import SHORT_SEPARATORS
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils import json
+
+try:
+    import orjson
+except ImportError:  # Opcional: sin orjson se usa el json de la biblioteca estándar
+    orjson = None
+
+
+# U+2028 / U+2029 en UTF-8: DRF los escapa siempre (JSON válido como JavaScript)
+LINE_SEPARATOR = '\u2028'.encode()
+PARAGRAPH_SEPARATOR = '\u2029'.encode()
+
+
+class FastRows(list):
+    """Filas ya serializadas que solo contienen tipos JSON básicos"""
+
+
+class FastJSONRenderer(JSONRenderer):
+    """JSONRenderer que codifica las FastRows con orjson (mismo resultado, byte a byte)"""
+
+    def _dumps(self, value):
+        return json.dumps(
+            value, cls=self.encoder_class,
+            ensure_ascii=self.ensure_ascii,
+            allow_nan=not self.strict, separators=SHORT_SEPARATORS
+        ).encode()
+
+    def _dumps_rows(self, rows):
+        if orjson is not None and not self.ensure_ascii:
+            try:
+                return orjson.dumps(rows)
+            except orjson.JSONEncodeError:
+                pass  # Por ejemplo, enteros de más de 64 bits
+        return self._dumps(rows)
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        fast_path = (
+            isinstance(data, dict)
+            and self.compact
+            and any(isinstance(value, FastRows) for value in data.values())
+            and self.get_indent(accepted_media_type, renderer_context or {}) is None
+        )
+        if not fast_path:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        # Igual que json.dumps(data, separators=(',', ':')), clave por clave
+        parts = [
+            self._dumps(key) + b':' + (
+                self._dumps_rows(value) if isinstance(value, FastRows) else self._dumps(value)
+            )
+            for key, value in data.items()
+        ]
+        ret = b'{' + b','.join(parts) + b'}'
+        return ret.replace(LINE_SEPARATOR, b'\\u2028').replace(PARAGRAPH_SEPARATOR, b'\\u2029')
@@ -0,0 +1,247 @@
+"""
+Búsqueda por nombre (GET /pokemon/search/?q=)
+
+Un índice en memoria por proceso, precalculado a partir de name y
+reversed_name (un "término" por campo y Pokémon), en lugar de recorrer la
+tabla con icontains:
+- Prefijo: bisect sobre la lista ordenada de términos
+- Subcadena: lista de términos del trigrama menos frecuente de la consulta,
+  comprobada con `in`
+- Con errores (fuzzy=true): los términos que más trigramas comparten con
+  la consulta se comparan con distancia de edición (Damerau: una
+  transposición cuenta 1), contra el término completo o su comienzo
+  (búsquedas a medio escribir: "pikac" -> "pikachu")
+
+Orden de los resultados: exacto, prefijo, subcadena y con errores; dentro
+de cada grupo, primero los aciertos en name, menor distancia, nombre más
+corto y pokemon_id. Cada Pokémon aparece una vez, con su mejor acierto.
+
+Se reconstruye igual que el índice columnar (memory_index.LazyTableIndex):
+cada búsqueda compara la firma de la tabla, así que también ve lo que
+escriben otros procesos; el loader lo refresca al terminar cada carga
+(refresh_search_index).
+"""
+
+import heapq
+import re
+import time
+from bisect import bisect_left
+from collections import Counter, namedtuple
+from operator import itemgetter
+
+from .memory_index import LazyTableIndex, table_signature
+from .models import Pokemon
+
+# Campos indexados; el índice del campo es el bit bajo del id de término
+SEARCH_FIELDS = ('name', 'reversed_name')
+
+# Tipos de acierto, de mejor a peor
+MATCH_KINDS = ('exact', 'prefix', 'substring', 'fuzzy')
+MATCH_RANK = {kind: rank for rank, kind in enumerate(MATCH_KINDS)}
+
+# Longitud mínima de la consulta para buscar con errores
+FUZZY_MIN_LENGTH = 3
+
+# Términos que se comparan con distancia de edición en cada búsqueda con
+# errores: los que más trigramas comparten con la consulta y, a igualdad,
+# los de longitud más parecida
+FUZZY_CANDIDATES = 64
+
+SearchHit = namedtuple('SearchHit', ['pokemon_id', 'match', 'matched_on', 'distance'])
+
+_WHITESPACE = re.compile(r'\s+')
+
+
+def normalize_query(value):
+    """Como se guardan los nombres: minúsculas y guiones en lugar de espacios"""
+    return _WHITESPACE.sub('-', value.strip().lower())
+
+
+def max_distance_for(query):
+    """Errores tolerados según la longitud de la consulta"""
+    if len(query) <= 4:
+        return 1
+    if len(query) <= 8:
+        return 2
+    return 3
+
+
+def trigrams(term):
+    """Trigramas con relleno, como pg_trgm: '  ab', ' abc', ..., 'yz '"""
+    padded = f'  {term} '
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def edit_distances(query, term, max_distance):
+    """
+    (distancia al término completo, menor distancia a un comienzo del
+    término) con transposiciones de letras vecinas (OSA), o None si las
+    dos superan max_distance
+
+    Solo se calcula la franja de la matriz a max_distance de la diagonal:
+    fuera de ella la distancia ya es mayor.
+    """
+    too_far = max_distance + 1
+    previous2 = None
+    previous = [j if j <= max_distance else too_far for j in range(len(term) + 1)]
+    for i, query_char in enumerate(query, 1):
+        current = [i if i <= max_distance else too_far] + [too_far] * len(term)
+        for j in range(max(1, i - max_distance), min(len(term), i + max_distance) + 1):
+            term_char = term[j - 1]
+            value = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (query_char != term_char))
+            if (i > 1 and j > 1 and query_char != term_char
+                    and query_char == term[j - 2] and query[i - 2] == term_char):
+                value = min(value, previous2[j - 2] + 1)
+            current[j] = value
+        if min(current) > max_distance:
+            return None
+        previous2, previous = previous, current
+    return previous[-1], min(previous)
+
+
+class SearchIndex:
+    """
+    Términos de búsqueda de la tabla Pokemon
+
+    El término t es el campo SEARCH_FIELDS[t & 1] del Pokémon en la
+    posición t >> 1 (orden por pokemon_id).
+    """
+
+    def __init__(self, rows, signature=None):
+        started = time.perf_counter()
+        self.signature = signature
+
+        self.pokemon_ids = [row[0] for row in rows]
+        self.terms = [term or '' for row in rows for term in row[1:]]
+        self.term_lengths = [len(term) for term in self.terms]
+
+        ordered = sorted(range(len(self.terms)), key=self.terms.__getitem__)
+        self.sorted_terms = [self.terms[term_id] for term_id in ordered]
+        self.sorted_ids = ordered
+        # Orden de los aciertos de prefijo en un solo entero: campo, longitud, pokemon_id
+        self.sorted_ranks = [
+            (term_id & 1) << 48 | self.term_lengths[term_id] << 32 | self.pokemon_ids[term_id >> 1]
+            for term_id in ordered
+        ]
+
+        postings = {}
+        for term_id, term in enumerate(self.terms):
+            if term:
+                for trigram in trigrams(term):
+                    postings.setdefault(trigram, []).append(term_id)
+        self.postings = postings
+
+        self.build_seconds = time.perf_counter() - started
+
+    @classmethod
+    def from_database(cls):
+        signature = table_signature()
+        rows = list(Pokemon.objects.order_by('pokemon_id').values_list('pokemon_id', *SEARCH_FIELDS))
+        return cls(rows, signature=signature)
+
+    def __len__(self):
+        return len(self.pokemon_ids)
+
+    def search(self, query, limit=20, fuzzy=True):
+        """Los limit mejores SearchHit para query (ya normalizada)"""
+        best = {}  # posición -> (clave de orden, tipo, campo, distancia)
+
+        def offer(term_id, kind, distance):
+            position = term_id >> 1
+            key = (MATCH_RANK[kind], term_id & 1, distance, len(self.terms[term_id]), self.pokemon_ids[position])
+            current = best.get(position)
+            if current is None or key < current[0]:
+                best[position] = (key, kind, term_id & 1, distance)
+
+        # Exacto y prefijo: términos consecutivos en el orden alfabético. Con
+        # muchos (prefijos cortos) solo cuentan los 2 * limit mejores: cada
+        # Pokémon tiene dos términos, así que llegan para limit Pokémon
+        start = bisect_left(self.sorted_terms, query)
+        end = bisect_left(self.sorted_terms, query + '\U0010ffff', start)
+        exact_end = start
+        while exact_end < end and self.sorted_terms[exact_end] == query:
+            offer(self.sorted_ids[exact_end], 'exact', 0)
+            exact_end += 1
+        for i in heapq.nsmallest(2 * limit, range(exact_end, end), key=self.sorted_ranks.__getitem__):
+            offer(self.sorted_ids[i], 'prefix', 0)
+
+        # Subcadena (detrás de los prefijos: solo si no se llenó el límite);
+        # basta con revisar los términos del trigrama menos frecuente
+        if len(best) >= limit:
+            candidates = ()
+        elif len(query) >= 3:
+            lists = [self.postings.get(query[i:i + 3], ()) for i in range(len(query) - 2)]
+            candidates = min(lists, key=len)
+        else:
+            candidates = range(len(self.terms))
+        for term_id in candidates:
+            term = self.terms[term_id]
+            if query in term and not term.startswith(query):
+                offer(term_id, 'substring', 0)
+
+        # Los aciertos con errores van detrás de todos los demás: solo hacen
+        # falta si no se llenó el límite
+        if fuzzy and len(query) >= FUZZY_MIN_LENGTH and len(best) < limit:
+            self._fuzzy(query, best, offer)
+
+        ranked = sorted(best.values(), key=itemgetter(0))[:limit]
+        return [
+            SearchHit(key[-1], kind, SEARCH_FIELDS[field], distance)
+            for key, kind, field, distance in ranked
+        ]
+
+    def _fuzzy(self, query, best, offer):
+        max_distance = max_distance_for(query)
+        query_trigrams = trigrams(query)
+
+        shared = Counter()
+        for trigram in query_trigrams:
+            shared.update(self.postings.get(trigram, ()))
+
+        # Cada error cambia como mucho 3 trigramas (y el del final no está
+        # en una búsqueda a medio escribir): menos coincidencias, imposible
+        needed = max(1, len(query_trigrams) - 3 * max_distance - 1)
+
+        # Menor número de trigramas compartidos que entra entre los
+        # FUZZY_CANDIDATES mejores (sin ordenar todos los términos)
+        cutoff = needed
+        total = 0
+        for count, terms in sorted(Counter(shared.values()).items(), reverse=True):
+            total += terms
+            if count < needed or total >= FUZZY_CANDIDATES:
+                cutoff = max(count, needed)
+                break
+
+        lengths = self.term_lengths
+        candidates = heapq.nlargest(
+            FUZZY_CANDIDATES,
+            [item for item in shared.items() if item[1] >= cutoff],
+            key=lambda item: (item[1], -abs(lengths[item[0]] - len(query)))
+        )
+
+        # Un comienzo con más de len(query) + max_distance letras ya está
+        # a más de max_distance: basta con comparar ese trozo del término
+        shortest, longest = len(query) - max_distance, len(query) + max_distance
+        fuzzy_rank = MATCH_RANK['fuzzy']
+        for term_id, _ in candidates:
+            term = self.terms[term_id]
+            current = best.get(term_id >> 1)
+            if len(term) < shortest or (current is not None and current[0][0] < fuzzy_rank):
+                continue  # Demasiado corto, o ya encontrado sin errores
+            distances = edit_distances(query, term[:longest], max_distance)
+            if distances is not None:
+                distance = min(distances)
+                if distance <= max_distance:
+                    offer(term_id, 'fuzzy', distance)
+
+
+_search_index = LazyTableIndex(SearchIndex.from_database)
+
+
+def get_search_index():
+    """Índice de búsqueda al día de este proceso"""
+    return _search_index.get()
+
+
+def refresh_search_index():
+    _search_index.refresh()
@@ -1,5 +1,16 @@
 from rest_framework import serializers
-from .models import Pokemon, PokemonFavorite
+from django.utils import timezone
+
+from operator import itemgetter
+
+from .models import Pokemon, PokemonFavorite, LoadJob
+from .loader import LoadSpec
+from .ingestion import get_pokeapi_settings
+from .queries import MATCH_COLUMNS
+from .export import EXPORT_FORMATS
+from .favorites import add_favorite
+from .renderers import FastRows
+from .search import normalize_query
 
 
 class PokemonSerializer(serializers.ModelSerializer):
@@ -8,18 +19,14 @@ class PokemonSerializer(serializers.ModelSerializer):
     
     Este serializer se encarga de:
     1. Convertir objetos Pokemon de Python a JSON para la API
-    2. Incluir campos calculados como reversed_name
+    2. Incluir campos calculados como reversed_name (ya guardados como columnas)
     3. Usar valores directos de la PokéAPI sin conversiones
     """
     
-    # Campos calculados (solo lectura)
-    reversed_name = serializers.CharField(read_only=True)
-    types_display = serializers.CharField(read_only=True)
-    
-    # Campos de métodos útiles
-    matches_weight_filter = serializers.SerializerMethodField()
-    is_grass_type = serializers.SerializerMethodField()
-    is_flying_and_tall = serializers.SerializerMethodField()
+    # Filtros del profesor Oak: columnas precalculadas al guardar
+    matches_weight_filter = serializers.BooleanField(source='weight_filter_match', read_only=True)
+    is_grass_type = serializers.BooleanField(source='grass_type_match', read_only=True)
+    is_flying_and_tall = serializers.BooleanField(source='flying_tall_match', read_only=True)
     
     class Meta:
         model = Pokemon
@@ -32,34 +39,20 @@ class PokemonSerializer(serializers.ModelSerializer):
             'height',        # Valores directos de la PokéAPI
             'weight',        # Valores directos de la PokéAPI
             'sprite_url',
+            'sprite_local_url',  # Copia local (sprite_url queda como respaldo)
             'created_at',
             'updated_at',
             
-            # Campos calculados (propiedades)
+            # Campos calculados (columnas precalculadas)
             'reversed_name',
             'types_display',
             
-            # Métodos de filtro
+            # Marcas de filtro
             'matches_weight_filter',
             'is_grass_type',
             'is_flying_and_tall',
         ]
         read_only_fields = ['id', 'created_at', 'updated_at']
-    
-    # MÉTODOS PARA CAMPOS CALCULADOS
-
-    
-    def get_matches_weight_filter(self, obj):
-        """Indica si el Pokémon cumple el filtro de peso (30-80 kg)"""
-        return obj.matches_weight_filter()
-    
-    def get_is_grass_type(self, obj):
-        """Indica si el Pokémon es tipo grass"""
-        return obj.is_grass_type()
-    
-    def get_is_flying_and_tall(self, obj):
-        """Indica si el Pokémon es tipo flying y alto"""
-        return obj.is_flying_and_tall()
 
 
 class PokemonBasicSerializer(serializers.ModelSerializer):
@@ -67,10 +60,15 @@ class PokemonBasicSerializer(serializers.ModelSerializer):
     Serializer simplificado para listados rápidos
     Solo incluye los campos esenciales que pide el profesor Oak
     Con valores directos de la PokéAPI (sin conversiones)
+    
+    Acepta fields=[...] para devolver solo algunos campos (proyección)
     """
     
-    reversed_name = serializers.CharField(read_only=True)
-    types_display = serializers.CharField(read_only=True)
+    def __init__(self, *args, fields=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for field_name in set(self.fields) - set(fields):
+                self.fields.pop(field_name)
     
     class Meta:
         model = Pokemon
@@ -83,9 +81,231 @@ class PokemonBasicSerializer(serializers.ModelSerializer):
             'height',        # Valor directo de PokéAPI
             'weight',        # Valor directo de PokéAPI
             'sprite_url',
+            'sprite_local_url',  # Copia local (sprite_url queda como respaldo)
         ]
 
 
+class CommaSeparatedListField(serializers.ListField):
+    """Lista que también acepta el formato de query string 'a,b,c'"""
+    
+    def to_internal_value(self, data):
+        if isinstance(data, str):
+            data = [item.strip() for item in data.split(',') if item.strip()]
+        return super().to_internal_value(data)
+
+
+class PokemonQuerySerializer(serializers.Serializer):
+    """
+    Valida los parámetros de la consulta genérica GET /pokemon/query/
+    
+    Ejemplo: ?types=grass,poison&types_match=all&weight_gt=30&ordering=-height
+    Cualquier parámetro desconocido es un error (validación estricta).
+    """
+    
+    ORDERING_FIELDS = ['pokemon_id', 'name', 'height', 'weight']
+    PROJECTION_FIELDS = PokemonBasicSerializer.Meta.fields
+    
+    # Parámetros que no son filtros pero pueden venir en la URL
+    # (formato de salida y paginación por cursor)
+    IGNORED_PARAMS = {'format', 'cursor', 'page_size'}
+    
+    matches = CommaSeparatedListField(
+        child=serializers.ChoiceField(choices=sorted(MATCH_COLUMNS)),
+        required=False,
+        allow_empty=False
+    )
+    types = CommaSeparatedListField(
+        child=serializers.RegexField(r'^[a-z-]+$', max_length=30),
+        required=False,
+        allow_empty=False,
+        max_length=20
+    )
+    types_match = serializers.ChoiceField(choices=['any', 'all'], default='any')
+    
+    height_gt = serializers.IntegerField(min_value=0, required=False)
+    height_gte = serializers.IntegerField(min_value=0, required=False)
+    height_lt = serializers.IntegerField(min_value=0, required=False)
+    height_lte = serializers.IntegerField(min_value=0, required=False)
+    weight_gt = serializers.IntegerField(min_value=0, required=False)
+    weight_gte = serializers.IntegerField(min_value=0, required=False)
+    weight_lt = serializers.IntegerField(min_value=0, required=False)
+    weight_lte = serializers.IntegerField(min_value=0, required=False)
+    
+    name_prefix = serializers.RegexField(r'^[A-Za-z0-9 .\'-]+$', max_length=100, required=False)
+    
+    ordering = CommaSeparatedListField(
+        child=serializers.ChoiceField(
+            choices=ORDERING_FIELDS + [f'-{field}' for field in ORDERING_FIELDS]
+        ),
+        required=False,
+        allow_empty=False
+    )
+    fields = CommaSeparatedListField(
+        child=serializers.ChoiceField(choices=PROJECTION_FIELDS),
+        required=False,
+        allow_empty=False
+    )
+    
+    def to_internal_value(self, data):
+        unknown = set(data) - set(self.fields) - self.IGNORED_PARAMS
+        if unknown:
+            raise serializers.ValidationError({
+                param: 'Parámetro no soportado' for param in sorted(unknown)
+            })
+        
+        # QueryDict: usar el último valor de cada parámetro
+        if hasattr(data, 'dict'):
+            data = data.dict()
+        return super().to_internal_value(data)
+    
+    def validate(self, attrs):
+        for field in ('height', 'weight'):
+            if f'{field}_gt' in attrs and f'{field}_gte' in attrs:
+                raise serializers.ValidationError(f'Usa solo uno de {field}_gt o {field}_gte')
+            if f'{field}_lt' in attrs and f'{field}_lte' in attrs:
+                raise serializers.ValidationError(f'Usa solo uno de {field}_lt o {field}_lte')
+        return attrs
+
+
+
+class PokemonExportSerializer(PokemonQuerySerializer):
+    """
+    Parámetros de GET /pokemon/export/: los mismos filtros que /pokemon/query/
+    más el formato de salida (?output=ndjson|csv; 'format' ya lo usa DRF)
+    """
+    
+    output = serializers.ChoiceField(choices=sorted(EXPORT_FORMATS), default='ndjson')
+
+
+class FavoriteExportSerializer(serializers.Serializer):
+    """Parámetros de GET /favorites/export/"""
+    
+    output = serializers.ChoiceField(choices=sorted(EXPORT_FORMATS), default='ndjson')
+
+class PokemonChangesSerializer(serializers.Serializer):
+    """
+    Valida GET /pokemon/changes/?since=<versión>
+    
+    after y until los pone el enlace 'next' (posición dentro de la versión
+    since y versión hasta la que llega el recorrido); el cliente solo envía since.
+    """
+    
+    MAX_PAGE_SIZE = 1000
+    
+    since = serializers.IntegerField(min_value=0)
+    after = serializers.IntegerField(min_value=0, required=False)
+    until = serializers.IntegerField(min_value=0, required=False)
+    page_size = serializers.IntegerField(min_value=1, max_value=MAX_PAGE_SIZE, default=200)
+    
+    def to_internal_value(self, data):
+        # QueryDict: usar el último valor de cada parámetro
+        if hasattr(data, 'dict'):
+            data = data.dict()
+        return super().to_internal_value(data)
+
+
+class PokemonSearchSerializer(serializers.Serializer):
+    """
+    Valida GET /pokemon/search/?q=<texto>
+    
+    Ejemplo: ?q=pikchu&limit=10&fields=pokemon_id,name
+    Con fuzzy=false solo hay aciertos exactos, de prefijo o de subcadena.
+    """
+    
+    MAX_LIMIT = 100
+    
+    IGNORED_PARAMS = {'format'}
+    
+    q = serializers.CharField(max_length=50)
+    limit = serializers.IntegerField(min_value=1, max_value=MAX_LIMIT, default=20)
+    fuzzy = serializers.BooleanField(default=True)
+    fields = CommaSeparatedListField(
+        child=serializers.ChoiceField(choices=PokemonQuerySerializer.PROJECTION_FIELDS),
+        required=False,
+        allow_empty=False
+    )
+    
+    def to_internal_value(self, data):
+        unknown = set(data) - set(self.fields) - self.IGNORED_PARAMS
+        if unknown:
+            raise serializers.ValidationError({
+                param: 'Parámetro no soportado' for param in sorted(unknown)
+            })
+        
+        # QueryDict: usar el último valor de cada parámetro
+        if hasattr(data, 'dict'):
+            data = data.dict()
+        return super().to_internal_value(data)
+    
+    def validate_q(self, value):
+        # Mismo formato que los nombres guardados ("Mr Mime" -> "mr-mime")
+        return normalize_query(value)
+
+
+class PokemonLoadRequestSerializer(serializers.Serializer):
+    """
+    Valida qué Pokémon cargar desde la PokéAPI
+
+    Acepta uno solo de estos modos (por defecto: rango 1-50):
+    - { "start": 1, "end": 151 }
+    - { "ids": [1, 4, 7] }
+    - { "all": true }
+    
+    Con "incremental": true (o "max_age": segundos) solo se piden los que
+    faltan o están desactualizados.
+    """
+    
+    MAX_RANGE_SIZE = 20000
+    
+    start = serializers.IntegerField(min_value=1, required=False)
+    end = serializers.IntegerField(min_value=1, required=False)
+    ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        required=False,
+        allow_empty=False,
+        max_length=MAX_RANGE_SIZE
+    )
+    all = serializers.BooleanField(required=False, default=False)
+    resume = serializers.BooleanField(required=False, default=True)
+    incremental = serializers.BooleanField(required=False, default=False)
+    max_age = serializers.IntegerField(min_value=0, required=False)
+    
+    def validate(self, attrs):
+        has_range = 'start' in attrs or 'end' in attrs
+        modes = [has_range, 'ids' in attrs, attrs['all']]
+        
+        if sum(modes) > 1:
+            raise serializers.ValidationError(
+                'Usa solo uno de: rango (start/end), ids o all'
+            )
+        
+        if has_range:
+            if 'start' not in attrs or 'end' not in attrs:
+                raise serializers.ValidationError('El rango requiere start y end')
+            if attrs['start'] > attrs['end']:
+                raise serializers.ValidationError({'end': 'end debe ser mayor o igual que start'})
+            if attrs['end'] - attrs['start'] + 1 > self.MAX_RANGE_SIZE:
+                raise serializers.ValidationError(
+                    f'El rango no puede superar {self.MAX_RANGE_SIZE} Pokémon'
+                )
+        
+        return attrs
+    
+    def to_load_spec(self):
+        """Convierte los datos validados en un LoadSpec del loader"""
+        data = self.validated_data
+        max_age = data.get('max_age')
+        if max_age is None and data['incremental']:
+            max_age = get_pokeapi_settings()['SYNC_MAX_AGE']
+        return LoadSpec(
+            ids=data.get('ids'),
+            start=data.get('start'),
+            end=data.get('end'),
+            all=data['all'],
+            max_age=max_age,
+        )
+
+
 class PokemonLoadStatusSerializer(serializers.Serializer):
     """
     Serializer para respuestas de carga de datos
@@ -94,12 +314,87 @@ class PokemonLoadStatusSerializer(serializers.Serializer):
     
     message = serializers.CharField()
     total_loaded = serializers.IntegerField(required=False)
+    requested = serializers.IntegerField(required=False)
+    resumed = serializers.IntegerField(required=False)
+    inserted = serializers.IntegerField(required=False)
+    updated = serializers.IntegerField(required=False)
+    unchanged = serializers.IntegerField(required=False)
     errors = serializers.ListField(
         child=serializers.CharField(),
         required=False
     )
 
 
+class LoadJobSerializer(serializers.ModelSerializer):
+    """
+    Estado de un trabajo de carga en segundo plano
+    Incluye avance, velocidad (Pokémon/s), tiempo estimado y errores por ID
+    """
+    
+    loaded = serializers.IntegerField(read_only=True)
+    progress = serializers.SerializerMethodField()
+    throughput = serializers.SerializerMethodField()
+    eta_seconds = serializers.SerializerMethodField()
+    errors = serializers.SerializerMethodField()
+    
+    class Meta:
+        model = LoadJob
+        fields = [
+            'id',
+            'status',
+            'spec',
+            'message',
+            'total',
+            'processed',
+            'loaded',
+            'resumed',
+            'inserted',
+            'updated',
+            'unchanged',
+            'progress',
+            'throughput',
+            'eta_seconds',
+            'errors',
+            'created_at',
+            'started_at',
+            'finished_at',
+        ]
+    
+    def _elapsed(self, obj):
+        if not obj.started_at:
+            return 0
+        end = obj.finished_at or timezone.now()
+        return (end - obj.started_at).total_seconds()
+    
+    def get_progress(self, obj):
+        """Porcentaje completado (0-100)"""
+        if not obj.total:
+            return 100.0 if obj.status == LoadJob.Status.COMPLETED else 0.0
+        return round(100 * obj.processed / obj.total, 1)
+    
+    def get_throughput(self, obj):
+        """Pokémon procesados por segundo en esta ejecución (sin contar reanudados)"""
+        elapsed = self._elapsed(obj)
+        if not elapsed:
+            return 0.0
+        return round((obj.processed - obj.resumed) / elapsed, 2)
+    
+    def get_eta_seconds(self, obj):
+        """Segundos estimados para terminar (None si aún no se puede estimar)"""
+        if obj.status not in LoadJob.ACTIVE_STATUSES:
+            return 0
+        throughput = self.get_throughput(obj)
+        if not throughput:
+            return None
+        return round((obj.total - obj.processed) / throughput, 1)
+    
+    def get_errors(self, obj):
+        return [
+            {'pokemon_id': int(pokemon_id), 'error': message}
+            for pokemon_id, message in sorted(obj.errors.items(), key=lambda item: int(item[0]))
+        ]
+
+
 class PokemonFavoriteSerializer(serializers.ModelSerializer):
     """
     Serializer para gestionar favoritos simples (sin usuarios)
@@ -137,14 +432,116 @@ class PokemonFavoriteSerializer(serializers.ModelSerializer):
                 'pokemon_id': f'No se encontró un Pokémon con ID {pokemon_id}'
             })
         
-        # Crear o obtener el favorito (evita duplicados)
-        favorite, created = PokemonFavorite.objects.get_or_create(
-            pokemon=pokemon
-        )
+        # INSERT directo: la restricción única decide si ya era favorito
+        # (sin consultar antes, así dos peticiones simultáneas no chocan)
+        favorite = add_favorite(pokemon)
         
-        if not created:
+        if favorite is None:
             raise serializers.ValidationError({
                 'pokemon_id': f'{pokemon.name} ya está en favoritos'
             })
         
-        return favorite
\ No newline at end of file
+        return favorite
+
+
+class FavoriteBatchSerializer(serializers.Serializer):
+    """
+    Valida POST /favorites/batch/
+    
+    { "add": [1, 4, 7], "remove": [25] }  (al menos una de las dos listas)
+    """
+    
+    MAX_BATCH_SIZE = 1000
+    
+    add = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        required=False,
+        default=list,
+        max_length=MAX_BATCH_SIZE
+    )
+    remove = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        required=False,
+        default=list,
+        max_length=MAX_BATCH_SIZE
+    )
+    
+    def validate(self, attrs):
+        if not attrs['add'] and not attrs['remove']:
+            raise serializers.ValidationError('Indica al menos un pokemon_id en add o remove')
+        
+        both = set(attrs['add']) & set(attrs['remove'])
+        if both:
+            raise serializers.ValidationError(
+                f'Un mismo Pokémon no puede estar en add y remove: {sorted(both)}'
+            )
+        
+        # Sin duplicados, conservando el orden
+        attrs['add'] = list(dict.fromkeys(attrs['add']))
+        attrs['remove'] = list(dict.fromkeys(attrs['remove']))
+        return attrs
+
+
+class FavoriteStatusSerializer(serializers.Serializer):
+    """Valida GET /favorites/status/?ids=1,4,7"""
+    
+    ids = CommaSeparatedListField(
+        child=serializers.IntegerField(min_value=1),
+        allow_empty=False,
+        max_length=FavoriteBatchSerializer.MAX_BATCH_SIZE
+    )
+    
+    def to_internal_value(self, data):
+        # QueryDict: usar el último valor de cada parámetro
+        if hasattr(data, 'dict'):
+            data = data.dict()
+        return super().to_internal_value(data)
+
+
+# SERIALIZACIÓN RÁPIDA PARA LISTADOS
+
+
+def _basic_getters(fields=None, prefix=''):
+    """(campo, función) en el mismo orden que PokemonBasicSerializer"""
+    return [
+        (field, itemgetter(f'{prefix}{field}'))
+        for field in PokemonBasicSerializer.Meta.fields
+        if fields is None or field in fields
+    ]
+
+
+def pokemon_basic_row_builder(fields=None):
+    """Función fila de .values() -> diccionario de PokemonBasicSerializer"""
+    getters = _basic_getters(fields)
+    return lambda row: {field: get(row) for field, get in getters}
+
+
+def favorite_row_builder():
+    """
+    Función fila de .values('id', 'created_at', 'pokemon__<columna>', ...)
+    -> diccionario de PokemonFavoriteSerializer
+    """
+    getters = _basic_getters(prefix='pokemon__')
+    created_at = serializers.DateTimeField()
+    return lambda row: {
+        'id': row['id'],
+        'pokemon': {field: get(row) for field, get in getters},
+        'created_at': created_at.to_representation(row['created_at']),
+    }
+
+
+def pokemon_basic_rows(rows, fields=None):
+    """
+    Mismo resultado que PokemonBasicSerializer(rows, many=True, fields=fields).data
+    pero a partir de diccionarios de .values(), sin instanciar modelos ni
+    campos de DRF por fila (los campos calculados ya son columnas)
+    """
+    return FastRows(map(pokemon_basic_row_builder(fields), rows))
+
+
+def favorite_rows(rows):
+    """
+    Mismo resultado que PokemonFavoriteSerializer(rows, many=True).data a partir
+    de .values('id', 'created_at', 'pokemon__<columna>', ...)
+    """
+    return FastRows(map(favorite_row_builder(), rows))
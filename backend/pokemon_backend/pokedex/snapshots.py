@@ -0,0 +1,335 @@
+"""
+Snapshots de la Pokédex (sin red)
+
+Un snapshot es un archivo NDJSON comprimido con gzip con todos los Pokémon
+(solo los datos de la PokéAPI; el resto se recalcula al importar) y los
+favoritos:
+
+    {"format": "pokedex-snapshot", "version": 1, "created_at": ..., "fields": [...]}
+    {"type": "pokemon", "pokemon_id": 1, "name": "bulbasaur", ...}
+    {"type": "favorite", "pokemon_id": 25, "created_at": "..."}
+    {"type": "end", "counts": {"pokemon": N, "favorite": M}, "sha256": "..."}
+
+La última línea cierra el archivo con los conteos y el SHA-256 de las
+líneas de datos: un snapshot truncado o modificado se rechaza antes de
+escribir nada. La importación usa la misma escritura por lotes que el
+loader (bulk_upsert_pokemon), y SnapshotClient permite usar un snapshot
+como fuente de run_load() en lugar de la PokéAPI (CI, máquinas sin red).
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import tempfile
+import time
+import zlib
+from dataclasses import dataclass
+
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .cache import invalidate_on_commit
+from .export import EXPORT_CHUNK_SIZE, ndjson_lines
+from .ingestion import IngestionResult, get_pokeapi_settings
+from .models import PAYLOAD_FIELDS, Pokemon, PokemonFavorite
+from .persistence import bulk_upsert_pokemon
+
+SNAPSHOT_FORMAT = 'pokedex-snapshot'
+SNAPSHOT_VERSION = 1
+
+RECORD_TYPES = ('pokemon', 'favorite')
+
+# Pokémon por llamada a bulk_upsert_pokemon al importar
+IMPORT_BATCH_SIZE = 2000
+
+
+class SnapshotError(Exception):
+    """El archivo no es un snapshot válido o está dañado"""
+
+
+@dataclass
+class SnapshotInfo:
+    """Cabecera, conteos y checksum de un snapshot verificado"""
+
+    path: str
+    header: dict
+    counts: dict
+    sha256: str
+    size_bytes: int = 0
+
+    @property
+    def created_at(self):
+        return parse_datetime(self.header['created_at'])
+
+
+@dataclass
+class SnapshotImportResult:
+    """Resultado de importar un snapshot"""
+
+    inserted: int = 0
+    updated: int = 0
+    unchanged: int = 0
+    favorites_added: int = 0
+    favorites_skipped: int = 0   # Ya eran favoritos, o su Pokémon no está
+    elapsed: float = 0.0
+
+
+# EXPORTACIÓN
+
+
+def _snapshot_records():
+    """Registros de datos en orden: Pokémon y después favoritos"""
+    pokemon_rows = Pokemon.objects.order_by('pokemon_id').values(*PAYLOAD_FIELDS)
+    for row in pokemon_rows.iterator(chunk_size=EXPORT_CHUNK_SIZE):
+        yield {'type': 'pokemon', **row}
+
+    favorite_rows = PokemonFavorite.objects.order_by('created_at').values_list('pokemon__pokemon_id', 'created_at')
+    for pokemon_id, created_at in favorite_rows.iterator(chunk_size=EXPORT_CHUNK_SIZE):
+        yield {'type': 'favorite', 'pokemon_id': pokemon_id, 'created_at': created_at.isoformat()}
+
+
+def _record_type(line):
+    # Las líneas de datos empiezan siempre por {"type":"<tipo>"
+    return 'pokemon' if line.startswith(b'{"type":"pokemon"') else 'favorite'
+
+
+def export_snapshot(path):
+    """
+    Escribe un snapshot de toda la base de datos en path
+
+    Se escribe en un temporal que se renombra al terminar: nunca queda un
+    snapshot a medias con el nombre final. Devuelve su SnapshotInfo.
+    """
+    header = {
+        'format': SNAPSHOT_FORMAT,
+        'version': SNAPSHOT_VERSION,
+        'created_at': timezone.now().isoformat(),
+        'fields': PAYLOAD_FIELDS,
+    }
+    counts = dict.fromkeys(RECORD_TYPES, 0)
+    digest = hashlib.sha256()
+
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as raw, gzip.GzipFile(fileobj=raw, mode='wb') as f:
+            f.write(next(ndjson_lines([header])))
+
+            # Una sola transacción: Pokémon y favoritos del mismo instante
+            with transaction.atomic():
+                for line in ndjson_lines(_snapshot_records()):
+                    counts[_record_type(line)] += 1
+                    digest.update(line)
+                    f.write(line)
+
+            f.write(next(ndjson_lines([{'type': 'end', 'counts': counts, 'sha256': digest.hexdigest()}])))
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+    return SnapshotInfo(path=path, header=header, counts=counts, sha256=digest.hexdigest(),
+                        size_bytes=os.path.getsize(path))
+
+
+# LECTURA Y VERIFICACIÓN
+
+
+def _read_lines(path):
+    """Líneas del archivo descomprimido; SnapshotError si el gzip está dañado"""
+    try:
+        with gzip.open(path, 'rb') as f:
+            yield from f
+    except (OSError, EOFError, zlib.error) as e:
+        raise SnapshotError(f'{path}: archivo gzip dañado o incompleto ({e})') from e
+
+
+def _parse(line, path):
+    try:
+        return json.loads(line)
+    except ValueError as e:
+        raise SnapshotError(f'{path}: línea que no es JSON ({e})') from e
+
+
+def _check_header(header, path):
+    if not isinstance(header, dict) or header.get('format') != SNAPSHOT_FORMAT:
+        raise SnapshotError(f'{path}: no es un snapshot de la Pokédex')
+    if header.get('version') != SNAPSHOT_VERSION:
+        raise SnapshotError(
+            f"{path}: versión de snapshot {header.get('version')} no soportada (se espera {SNAPSHOT_VERSION})"
+        )
+
+
+def read_snapshot(path):
+    """
+    Recorre el snapshot entero y comprueba cabecera, conteos y SHA-256
+
+    Devuelve su SnapshotInfo o lanza SnapshotError. No guarda las filas en
+    memoria: se vuelven a leer, ya verificadas, con iter_records().
+    """
+    if not os.path.isfile(path):
+        raise SnapshotError(f'{path}: no existe')
+
+    lines = _read_lines(path)
+    header = _parse(next(lines, b'null'), path)
+    _check_header(header, path)
+
+    counts = dict.fromkeys(RECORD_TYPES, 0)
+    digest = hashlib.sha256()
+    trailer = None
+
+    for line in lines:
+        if trailer is not None:
+            raise SnapshotError(f'{path}: hay datos después de la línea de cierre')
+        if line.startswith(b'{"type":"end"'):
+            trailer = _parse(line, path)
+            continue
+        record_type = _parse(line, path).get('type')
+        if record_type not in counts:
+            raise SnapshotError(f'{path}: tipo de registro desconocido {record_type!r}')
+        counts[record_type] += 1
+        digest.update(line)
+
+    if trailer is None:
+        raise SnapshotError(f'{path}: snapshot incompleto (falta la línea de cierre)')
+    if trailer.get('counts') != counts:
+        raise SnapshotError(f"{path}: los conteos no coinciden ({counts} != {trailer.get('counts')})")
+    if trailer.get('sha256') != digest.hexdigest():
+        raise SnapshotError(f'{path}: el checksum SHA-256 no coincide')
+
+    return SnapshotInfo(path=path, header=header, counts=counts, sha256=digest.hexdigest(),
+                        size_bytes=os.path.getsize(path))
+
+
+def iter_records(path, record_type):
+    """Registros de un tipo ('pokemon' o 'favorite'), sin la clave 'type'"""
+    prefix = f'{{"type":"{record_type}"'.encode()
+    lines = _read_lines(path)
+    next(lines, None)  # Cabecera
+    for line in lines:
+        if line.startswith(prefix):
+            record = _parse(line, path)
+            del record['type']
+            yield record
+
+
+# IMPORTACIÓN
+
+
+def _chunks(iterable, size):
+    chunk = []
+    for item in iterable:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _import_favorites(path, result):
+    """
+    Añade los favoritos que falten, con su fecha original
+
+    created_at es auto_now_add (bulk_create pondría la fecha actual): se
+    crean y después se les devuelve la fecha con bulk_update. Si añade
+    alguno invalida la caché de respuestas al confirmar la importación
+    (bulk_create no pasa por favorites.py).
+    """
+    favorites = {record['pokemon_id']: parse_datetime(record['created_at'])
+                 for record in iter_records(path, 'favorite')}
+    if not favorites:
+        return
+
+    pks = list(
+        Pokemon.objects
+        .filter(pokemon_id__in=list(favorites), is_favorite__isnull=True)
+        .values_list('pk', flat=True)
+    )
+    result.favorites_skipped = len(favorites) - len(pks)
+    if not pks:
+        return
+
+    PokemonFavorite.objects.bulk_create([PokemonFavorite(pokemon_id=pk) for pk in pks])
+    created = list(PokemonFavorite.objects.filter(pokemon_id__in=pks).select_related('pokemon'))
+    for favorite in created:
+        favorite.created_at = favorites[favorite.pokemon.pokemon_id]
+    PokemonFavorite.objects.bulk_update(created, ['created_at'], batch_size=500)
+    result.favorites_added = len(created)
+    invalidate_on_commit()
+
+
+def import_snapshot(path, batch_size=IMPORT_BATCH_SIZE):
+    """
+    Verifica el snapshot y lo importa en una sola transacción
+
+    Los Pokémon pasan por bulk_upsert_pokemon (hash, columnas
+    desnormalizadas, change_version, invalidación de la caché) y cuentan
+    como comprobados en la fecha del snapshot: una carga incremental
+    posterior con red refresca lo que ya sea antiguo. Los favoritos se
+    suman a los existentes. Si el archivo no es válido lanza SnapshotError
+    sin tocar la base de datos.
+    """
+    started = time.monotonic()
+    info = read_snapshot(path)
+    result = SnapshotImportResult()
+
+    with transaction.atomic():
+        for chunk in _chunks(iter_records(path, 'pokemon'), batch_size):
+            upsert = bulk_upsert_pokemon(chunk, synced_at=info.created_at)
+            result.inserted += upsert.inserted
+            result.updated += upsert.updated
+            result.unchanged += upsert.unchanged
+
+        _import_favorites(path, result)
+
+    result.elapsed = time.monotonic() - started
+    return result
+
+
+# FUENTE PARA EL LOADER
+
+
+class SnapshotClient:
+    """
+    Fuente de run_load() leída de un snapshot, sin red
+
+    Implementa la parte de PokeAPIClient que usa el loader
+    (list_pokemon_ids, fetch_many, deadline, close): rangos, listas, --all,
+    puntos de control y carga incremental funcionan igual que contra la
+    PokéAPI. Con offline=True el loader no intenta copiar sprites.
+    """
+
+    offline = True
+
+    def __init__(self, path, deadline=None):
+        self.info = read_snapshot(path)
+        self.records = {record['pokemon_id']: record for record in iter_records(path, 'pokemon')}
+        self.deadline = deadline or get_pokeapi_settings()['DEADLINE']
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def list_pokemon_ids(self):
+        return sorted(self.records)
+
+    def fetch_many(self, pokemon_ids, deadline_at=None):
+        """Como PokeAPIClient.fetch_many: los IDs que no están quedan en result.errors"""
+        started = time.monotonic()
+        result = IngestionResult()
+        for pokemon_id in sorted(set(pokemon_ids)):
+            record = self.records.get(pokemon_id)
+            if record is None:
+                result.errors[pokemon_id] = f'Pokémon #{pokemon_id} no está en el snapshot'
+            else:
+                result.records.append(dict(record))
+        result.elapsed = time.monotonic() - started
+        return result
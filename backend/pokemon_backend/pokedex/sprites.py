@@ -0,0 +1,301 @@
+"""
+Copia local de los sprites de la PokéAPI
+
+Cada tarjeta del frontend enlazaba directamente la imagen de GitHub: lenta,
+sin caché nuestra y rota sin conexión. Aquí los sprites se descargan una
+vez, en paralelo, y se sirven desde /sprites/:
+- Almacenamiento por contenido: el archivo se llama como el SHA-256 de sus
+  bytes, así una imagen repetida se guarda una sola vez y una URL local
+  nunca cambia de contenido (Cache-Control: immutable)
+- Con Pillow (requirements.txt) se guarda además una variante WebP
+  redimensionada (la que devuelve la API); si falta se sirve el original
+  y se avisa al arrancar (check pokedex.W001) y en cada copia
+- sprite_source recuerda de qué URL salió la copia: si la PokéAPI cambia
+  el sprite, se vuelve a descargar
+- sprite_url (la URL externa) sigue en la API como respaldo
+"""
+
+import hashlib
+import io
+import logging
+import os
+import re
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import requests
+from django.conf import settings
+from django.core import checks
+from django.db import transaction
+
+from .cache import invalidate_on_commit
+from .ingestion import PokeAPIClient
+from .models import Pokemon, next_change_version
+
+try:
+    from PIL import Image
+except ImportError:  # Sin Pillow solo se guarda el original (ver check_webp_support)
+    Image = None
+
+logger = logging.getLogger(__name__)
+
+
+# CONFIGURACIÓN POR DEFECTO (se puede sobrescribir con settings.POKEDEX_SPRITES)
+
+DEFAULT_SPRITE_SETTINGS = {
+    'ENABLED': True,      # Copiar los sprites al cargar desde la PokéAPI
+    'DIR': None,          # Directorio local (None = desactivado)
+    'URL': '/sprites/',   # Prefijo público (ver la ruta en urls.py)
+    'SIZE': 96,           # Lado máximo de la variante WebP (px)
+    'WEBP_QUALITY': 80,
+}
+
+# Nombres válidos dentro del directorio: <2 hex>/<sha256>[-<tamaño>].<ext>
+SPRITE_NAME = re.compile(r'^[0-9a-f]{2}/[0-9a-f]{64}(?:-\d+)?\.(?:png|gif|jpg|webp)$')
+
+CONTENT_TYPES = {
+    'png': 'image/png',
+    'gif': 'image/gif',
+    'jpg': 'image/jpeg',
+    'webp': 'image/webp',
+}
+
+
+def get_sprite_settings():
+    """Combina los valores por defecto con settings.POKEDEX_SPRITES"""
+    config = dict(DEFAULT_SPRITE_SETTINGS)
+    config.update(getattr(settings, 'POKEDEX_SPRITES', {}))
+    return config
+
+
+def sniff_extension(content):
+    """Extensión según los primeros bytes; ValueError si no es una imagen"""
+    if content.startswith(b'\x89PNG\r\n\x1a\n'):
+        return 'png'
+    if content[:6] in (b'GIF87a', b'GIF89a'):
+        return 'gif'
+    if content.startswith(b'\xff\xd8\xff'):
+        return 'jpg'
+    if content[:4] == b'RIFF' and content[8:12] == b'WEBP':
+        return 'webp'
+    raise ValueError('El contenido descargado no es una imagen')
+
+
+class SpriteStore:
+    """
+    Directorio de sprites direccionado por contenido
+
+    save() es idempotente: los mismos bytes dan siempre el mismo nombre y
+    no se vuelven a escribir. Las escrituras son atómicas (temporal y
+    renombrado), así que un archivo servido nunca está a medias.
+    """
+
+    def __init__(self, directory, url='/sprites/', size=96, webp_quality=80):
+        self.directory = Path(directory)
+        self.url_prefix = url
+        self.size = size
+        self.webp_quality = webp_quality
+
+    def path(self, name):
+        return self.directory / name
+
+    def exists(self, name):
+        return bool(name) and self.path(name).is_file()
+
+    def url(self, name):
+        """URL pública de un archivo guardado"""
+        return f'{self.url_prefix}{name}'
+
+    def has_url(self, url):
+        """La URL local apunta a un archivo que sigue en el directorio"""
+        return bool(url) and url.startswith(self.url_prefix) and self.exists(url[len(self.url_prefix):])
+
+    def _write(self, name, content):
+        path = self.path(name)
+        if path.exists():
+            return False
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(content)
+            os.replace(tmp_path, path)
+        except OSError:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        return True
+
+    def _webp_variant(self, content):
+        with Image.open(io.BytesIO(content)) as image:
+            image = image.convert('RGBA')
+            image.thumbnail((self.size, self.size))
+            output = io.BytesIO()
+            image.save(output, format='WEBP', quality=self.webp_quality, method=6)
+            return output.getvalue()
+
+    def save(self, content):
+        """
+        Guarda los bytes de un sprite y devuelve el nombre que se sirve
+
+        Devuelve la variante WebP si Pillow está instalado y la pudo
+        generar; si no, el original.
+        """
+        extension = sniff_extension(content)
+        digest = hashlib.sha256(content).hexdigest()
+        original = f'{digest[:2]}/{digest}.{extension}'
+        self._write(original, content)
+
+        if Image is None or not self.size:
+            return original
+
+        variant = f'{digest[:2]}/{digest}-{self.size}.webp'
+        if not self.path(variant).exists():
+            try:
+                self._write(variant, self._webp_variant(content))
+            except (OSError, ValueError) as e:
+                logger.warning(f"No se pudo generar la variante WebP de {original}: {e}")
+                return original
+        return variant
+
+    def stats(self):
+        files = [path for path in self.directory.glob('*/*') if path.is_file()]
+        return {'files': len(files), 'size_bytes': sum(path.stat().st_size for path in files)}
+
+
+def check_webp_support(app_configs=None, **kwargs):
+    """
+    Aviso al arrancar (runserver, migrate, check): copia de sprites activa
+    sin Pillow. Se registra en PokedexConfig.ready()
+    """
+    config = get_sprite_settings()
+    if config['ENABLED'] and config.get('DIR') and config['SIZE'] and Image is None:
+        return [checks.Warning(
+            'Pillow no está instalado: los sprites se copian sin la variante WebP',
+            hint='pip install -r requirements.txt y después python manage.py mirror_sprites --force',
+            id='pokedex.W001',
+        )]
+    return []
+
+
+def get_sprite_store(config=None):
+    """SpriteStore configurado en settings.POKEDEX_SPRITES, o None si no hay directorio"""
+    config = config or get_sprite_settings()
+    if not config.get('DIR'):
+        return None
+    return SpriteStore(config['DIR'], url=config['URL'], size=config['SIZE'],
+                       webp_quality=config['WEBP_QUALITY'])
+
+
+@dataclass
+class SpriteMirrorResult:
+    """Resultado de una copia de sprites"""
+
+    mirrored: int = 0        # Pokémon con una copia local nueva
+    up_to_date: int = 0      # Ya tenían copia de la misma URL
+    downloads: int = 0       # URLs distintas descargadas
+    errors: dict = field(default_factory=dict)   # {pokemon_id: mensaje de error}
+    webp: bool = False       # Se generaron variantes WebP (Pillow instalado)
+    elapsed: float = 0.0
+
+
+def _needs_mirror(row, store):
+    return row['sprite_source'] != row['sprite_url'] or not store.has_url(row['sprite_local_url'])
+
+
+def mirror_sprites(pokemon_ids=None, client=None, force=False, deadline_at=None, store=None):
+    """
+    Descarga en paralelo los sprites que falten y guarda sprite_local_url
+
+    pokemon_ids: limita la copia a esos Pokémon (None = todos)
+    client: PokeAPIClient (su sesión, concurrencia y reintentos); si no se
+    indica se crea uno. force=True vuelve a descargar aunque ya haya copia.
+    """
+    store = store or get_sprite_store()
+    result = SpriteMirrorResult()
+    started = time.monotonic()
+    if store is None:
+        return result
+    result.webp = Image is not None and bool(store.size)
+
+    queryset = Pokemon.objects.exclude(sprite_url=None).exclude(sprite_url='')
+    if pokemon_ids is not None:
+        queryset = queryset.filter(pokemon_id__in=list(pokemon_ids))
+    rows = list(queryset.values('pk', 'pokemon_id', 'sprite_url', 'sprite_source', 'sprite_local_url'))
+
+    pending = [row for row in rows if force or _needs_mirror(row, store)]
+    result.up_to_date = len(rows) - len(pending)
+    if not pending:
+        result.elapsed = time.monotonic() - started
+        return result
+
+    # Una descarga por URL aunque varios Pokémon compartan sprite
+    rows_by_url = {}
+    for row in pending:
+        rows_by_url.setdefault(row['sprite_url'], []).append(row)
+
+    own_client = client is None
+    client = client or PokeAPIClient(cache=False)
+    if deadline_at is None:
+        deadline_at = started + client.deadline
+
+    def download(url):
+        return store.save(client.fetch_bytes(url, deadline_at))
+
+    executor = ThreadPoolExecutor(max_workers=client.max_workers)
+    futures = {executor.submit(download, url): url for url in rows_by_url}
+    pending_futures = set(futures)
+    names = {}
+
+    try:
+        while pending_futures:
+            remaining = deadline_at - time.monotonic()
+            if remaining <= 0:
+                break
+
+            done, pending_futures = wait(pending_futures, timeout=remaining, return_when=FIRST_COMPLETED)
+
+            for future in done:
+                url = futures[future]
+                try:
+                    names[url] = future.result()
+                except (requests.RequestException, ValueError, OSError) as e:
+                    for row in rows_by_url[url]:
+                        result.errors[row['pokemon_id']] = f"Sprite de Pokémon #{row['pokemon_id']}: {e}"
+    finally:
+        # Se cancelan las descargas en cola y se esperan las que ya usan la
+        # sesión (acotadas por deadline_at): cerrarla antes las rompería
+        executor.shutdown(wait=True, cancel_futures=True)
+        if own_client:
+            client.close()
+
+    for future in pending_futures:
+        for row in rows_by_url[futures[future]]:
+            result.errors[row['pokemon_id']] = f"Sprite de Pokémon #{row['pokemon_id']}: tiempo límite agotado"
+
+    updates = [
+        Pokemon(pk=row['pk'], sprite_source=url, sprite_local_url=store.url(name))
+        for url, name in names.items()
+        for row in rows_by_url[url]
+    ]
+    if updates:
+        with transaction.atomic():
+            # sprite_local_url cambia en la API: es un cambio más del feed
+            change_version = next_change_version()
+            for pokemon in updates:
+                pokemon.change_version = change_version
+            Pokemon.objects.bulk_update(
+                updates, ['sprite_source', 'sprite_local_url', 'change_version'], batch_size=500
+            )
+            invalidate_on_commit()
+
+    result.downloads = len(names)
+    result.mirrored = len(updates)
+    result.elapsed = time.monotonic() - started
+    if names and store.size and Image is None:
+        logger.warning(f'Pillow no está instalado: {len(names)} sprites copiados sin la variante WebP')
+    return result
@@ -0,0 +1,209 @@
+"""
+Datos y servidores de prueba de la Pokédex
+
+Los usan tests.py y los escenarios de benchmarks.py; nada de la aplicación
+los importa.
+"""
+
+import json
+import re
+import struct
+import threading
+import time
+import zlib
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from .ingestion import parse_pokemon
+from .persistence import bulk_upsert_pokemon
+
+# Para override_settings: medir o comprobar sin la caché de respuestas
+NO_RESPONSE_CACHE = {'POKEDEX_RESPONSE_CACHE': {'ENABLED': False}}
+
+
+# SERVIDOR STUB DE LA POKÉAPI (local, sin red)
+
+
+TYPE_CYCLE = [['grass', 'poison'], ['fire'], ['water'], ['normal', 'flying'], ['bug'], ['electric']]
+
+
+def fake_pokemon_payload(pokemon_id):
+    """Respuesta con la misma forma que /api/v2/pokemon/{id} de la PokéAPI"""
+    types = TYPE_CYCLE[pokemon_id % len(TYPE_CYCLE)]
+    return {
+        'id': pokemon_id,
+        'name': f'pokemon-{pokemon_id}',
+        'types': [{'slot': slot, 'type': {'name': name}} for slot, name in enumerate(types, 1)],
+        'height': (pokemon_id * 7) % 25 + 1,
+        'weight': (pokemon_id * 13) % 150 + 1,
+        'sprites': {'front_default': f'https://example.invalid/sprites/{pokemon_id}.png'},
+    }
+
+
+# Sprites distintos que sirve el stub (el resto se repiten: deduplicación)
+SPRITE_VARIANTS = 20
+
+
+def fake_sprite_png(seed, size=96):
+    """PNG RGBA de size x size de un color que depende de seed (sin Pillow)"""
+    def chunk(kind, data):
+        return struct.pack('>I', len(data)) + kind + data + struct.pack('>I', zlib.crc32(kind + data))
+
+    color = bytes([(seed * 67) % 256, (seed * 131) % 256, (seed * 199) % 256, 255])
+    rows = b''.join(b'\x00' + color * size for _ in range(size))
+    return (
+        b'\x89PNG\r\n\x1a\n'
+        + chunk(b'IHDR', struct.pack('>IIBBBBB', size, size, 8, 6, 0, 0, 0))
+        + chunk(b'IDAT', zlib.compress(rows))
+        + chunk(b'IEND', b'')
+    )
+
+
+class StubPokeAPIServer:
+    """
+    Servidor HTTP local que imita la PokéAPI
+
+    latency simula el tiempo de respuesta del servidor real; con
+    fail_every=N una de cada N peticiones responde 503 (para probar reintentos).
+    Fallos por Pokémon: failures ({pokemon_id: [503, 429, ...]}) son las
+    respuestas de sus primeras peticiones, en orden (con Retry-After si
+    retry_after no es None); los IDs de missing responden siempre 404.
+    requests_by_pokemon y max_in_flight cuentan peticiones y concurrencia.
+    Cada Pokémon lleva un ETag y responde 304 a If-None-Match; revisions
+    ({pokemon_id: n}) simula cambios en la PokéAPI (otro peso y otro ETag).
+    /sprites/{id}.png devuelve uno de SPRITE_VARIANTS PNG distintos.
+    """
+
+    def __init__(self, latency=0.05, fail_every=0, total=1025):
+        stub = self
+        self.latency = latency
+        self.fail_every = fail_every
+        self.total = total
+        self.revisions = {}
+        self.failures = {}
+        self.missing = set()
+        self.retry_after = None
+        self.requests_served = 0
+        self.requests_by_pokemon = Counter()
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.bytes_sent = 0
+        self._lock = threading.Lock()
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                match = re.match(r'^/pokemon/(\d+)/?$', self.path)
+                sprite = re.match(r'^/sprites/(\d+)\.png$', self.path)
+                pokemon_id = int(match.group(1)) if match else None
+
+                with stub._lock:
+                    stub.requests_served += 1
+                    count = stub.requests_served
+                    stub.in_flight += 1
+                    stub.max_in_flight = max(stub.max_in_flight, stub.in_flight)
+                    injected = None
+                    if pokemon_id is not None:
+                        stub.requests_by_pokemon[pokemon_id] += 1
+                        if stub.failures.get(pokemon_id):
+                            injected = stub.failures[pokemon_id].pop(0)
+
+                try:
+                    time.sleep(stub.latency)
+                    self._respond(match, sprite, pokemon_id, count, injected)
+                except (BrokenPipeError, ConnectionResetError):
+                    pass  # El cliente se fue (deadline agotado)
+                finally:
+                    with stub._lock:
+                        stub.in_flight -= 1
+
+            def _respond(self, match, sprite, pokemon_id, count, injected):
+                if injected is not None:
+                    self._send(injected, {'detail': 'Injected failure'})
+                elif stub.fail_every and count % stub.fail_every == 0:
+                    self._send(503, {'detail': 'Service Unavailable'})
+                elif pokemon_id in stub.missing:
+                    self._send(404, {'detail': 'Not found'})
+                elif sprite:
+                    self._send_bytes(fake_sprite_png(int(sprite.group(1)) % SPRITE_VARIANTS), 'image/png')
+                elif self.path.startswith('/pokemon/?'):
+                    self._send(200, stub.list_page(self.path))
+                elif match:
+                    payload, etag = stub.pokemon(pokemon_id)
+                    if self.headers.get('If-None-Match') == etag:
+                        self._send(304, None, etag)
+                    else:
+                        self._send(200, payload, etag)
+                else:
+                    self._send(404, {'detail': 'Not found'})
+
+            def _send(self, status_code, payload, etag=None):
+                body = json.dumps(payload).encode() if payload is not None else b''
+                self._send_bytes(body, 'application/json', status_code, etag)
+
+            def _send_bytes(self, body, content_type, status_code=200, etag=None):
+                with stub._lock:
+                    stub.bytes_sent += len(body)
+                self.send_response(status_code)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(body)))
+                if etag:
+                    self.send_header('ETag', etag)
+                if status_code in (429, 503) and stub.retry_after is not None:
+                    self.send_header('Retry-After', str(stub.retry_after))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass  # Silenciar logs del servidor stub
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.server.daemon_threads = True
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    def pokemon(self, pokemon_id):
+        """(payload, ETag) de la revisión actual de un Pokémon"""
+        revision = self.revisions.get(pokemon_id, 1)
+        payload = fake_pokemon_payload(pokemon_id)
+        payload['weight'] += revision - 1
+        return payload, f'"pokemon-{pokemon_id}-v{revision}"'
+
+    def list_page(self, path):
+        """Página de /pokemon/?limit=&offset= con el formato de la PokéAPI"""
+        query = parse_qs(urlparse(path).query)
+        limit = int(query.get('limit', ['20'])[0])
+        offset = int(query.get('offset', ['0'])[0])
+        ids = range(offset + 1, min(offset + limit, self.total) + 1)
+
+        next_offset = offset + limit
+        return {
+            'count': self.total,
+            'next': f'{self.base_url}/pokemon/?limit={limit}&offset={next_offset}'
+            if next_offset < self.total else None,
+            'results': [
+                {'name': f'pokemon-{pokemon_id}', 'url': f'{self.base_url}/pokemon/{pokemon_id}/'}
+                for pokemon_id in ids
+            ],
+        }
+
+    @property
+    def base_url(self):
+        host, port = self.server.server_address
+        return f'http://{host}:{port}'
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+# DATOS SINTÉTICOS
+
+
+def seed_synthetic_pokemon(total):
+    """Inserta N Pokémon sintéticos por la ruta de carga normal"""
+    records = [parse_pokemon(fake_pokemon_payload(pokemon_id)) for pokemon_id in range(1, total + 1)]
+    bulk_upsert_pokemon(records)
@@ -1,3 +1,1265 @@
-from django.test import TestCase
+import csv
+import gzip
+import importlib
+import io
+import json
+import os
+import tempfile
+import threading
+import time
+from datetime import timedelta
+from urllib.parse import parse_qs, urlparse
+from unittest import mock, skipUnless
 
+import requests
+from django.apps import apps
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection, transaction
+from django.db.models import F
+from django.test import Client, SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
 
+from . import jobs, renderers
+from .testing import NO_RESPONSE_CACHE, TYPE_CYCLE, StubPokeAPIServer, fake_pokemon_payload, seed_synthetic_pokemon
+from .cache import get_data_version
+from .favorites import add_favorite, flip_favorite
+from .http_cache import HTTPResponseCache, get_http_cache
+from .jobs import enqueue_load
+from .ingestion import IngestionResult, PokeAPIClient, parse_pokemon
+from .persistence import bulk_upsert_pokemon
+from .loader import LoadSpec, run_load
+from .memory_index import get_memory_index
+from .models import LoadCheckpoint, LoadJob, Pokemon, PokemonFavorite, compute_payload_hash, next_change_version
+from .queries import build_pokemon_queryset, columns_for_fields
+from .search import FUZZY_MIN_LENGTH, SearchIndex, edit_distances, get_search_index
+from .serializers import (
+    FavoriteBatchSerializer, PokemonBasicSerializer, PokemonFavoriteSerializer, favorite_rows, pokemon_basic_rows,
+)
+from .snapshots import export_snapshot, import_snapshot
+
+
+def run_in_other_connection(func):
+    """
+    Ejecuta func en otro hilo, con su propia conexión a la base de datos:
+    como una escritura desde otro proceso (nada pasa por este hilo)
+    """
+    errors = []
+
+    def run():
+        try:
+            func()
+        except Exception as e:
+            errors.append(e)
+        finally:
+            connection.close()
+
+    thread = threading.Thread(target=run)
+    thread.start()
+    thread.join()
+    if errors:
+        raise errors[0]
+
+
+def run_in_threads(count, work):
+    """
+    Ejecuta work(worker) en count hilos que arrancan a la vez, cada uno con
+    su conexión; devuelve las excepciones
+    """
+    errors = []
+    barrier = threading.Barrier(count)
+
+    def run(worker):
+        barrier.wait()
+        try:
+            work(worker)
+        except Exception as e:
+            errors.append(e)
+        finally:
+            connection.close()
+
+    threads = [threading.Thread(target=run, args=(worker,)) for worker in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return errors
+
+
+def rename_pokemon(pokemon_id, name):
+    """Escritura directa con un UPDATE, sin pasar por Pokemon.save()"""
+    with transaction.atomic():
+        Pokemon.objects.filter(pokemon_id=pokemon_id).update(
+            name=name, reversed_name=name[::-1], change_version=next_change_version()
+        )
+
+
+class FakeClient:
+    """
+    Fuente de run_load() sin red: los IDs de missing responden como un 404
+
+    offline=True: el loader no intenta copiar sprites.
+    """
+
+    offline = True
+    deadline = 60
+
+    def __init__(self, missing=()):
+        self.missing = set(missing)
+        self.requested = []
+
+    def list_pokemon_ids(self):
+        return []
+
+    def fetch_many(self, pokemon_ids, deadline_at=None):
+        self.requested += pokemon_ids
+        result = IngestionResult()
+        for pokemon_id in pokemon_ids:
+            if pokemon_id in self.missing:
+                result.errors[pokemon_id] = f'404 Client Error: Not Found for Pokémon #{pokemon_id}'
+            else:
+                result.records.append(parse_pokemon(fake_pokemon_payload(pokemon_id)))
+        return result
+
+    def close(self):
+        pass
+
+
+class PokeAPIClientTests(SimpleTestCase):
+    """PokeAPIClient contra el servidor stub local, con fallos inyectados"""
+
+    def setUp(self):
+        self.stub = StubPokeAPIServer(latency=0)
+        self.stub.__enter__()
+        self.addCleanup(self.stub.__exit__)
+
+    def client_for(self, **kwargs):
+        options = {'max_workers': 4, 'max_retries': 3, 'backoff_factor': 0.01, 'deadline': 30, 'cache': False}
+        options.update(kwargs)
+        client = PokeAPIClient(base_url=self.stub.base_url, **options)
+        self.addCleanup(client.close)
+        return client
+
+    def test_records_are_parsed_and_sorted(self):
+        result = self.client_for().fetch_many([5, 3, 1, 4, 2])
+
+        self.assertEqual(result.errors, {})
+        self.assertFalse(result.deadline_exceeded)
+        self.assertEqual(result.records, [parse_pokemon(fake_pokemon_payload(i)) for i in range(1, 6)])
+
+    def test_server_errors_are_retried(self):
+        self.stub.failures = {1: [503, 500], 2: [502]}
+
+        result = self.client_for().fetch_many([1, 2, 3])
+
+        self.assertEqual(result.errors, {})
+        self.assertEqual([record['pokemon_id'] for record in result.records], [1, 2, 3])
+        self.assertEqual(self.stub.requests_by_pokemon, {1: 3, 2: 2, 3: 1})
+
+    def test_retries_are_bounded(self):
+        self.stub.failures = {1: [503] * 10}
+
+        result = self.client_for(max_retries=2).fetch_many([1, 2])
+
+        self.assertEqual([record['pokemon_id'] for record in result.records], [2])
+        self.assertIn('503', result.errors[1])
+        self.assertEqual(self.stub.requests_by_pokemon[1], 3)
+
+    def test_rate_limit_waits_for_retry_after(self):
+        self.stub.failures = {1: [429]}
+        self.stub.retry_after = 1
+
+        started = time.monotonic()
+        result = self.client_for(backoff_factor=0).fetch_many([1])
+
+        self.assertEqual(result.errors, {})
+        self.assertEqual(self.stub.requests_by_pokemon[1], 2)
+        self.assertGreaterEqual(time.monotonic() - started, 1)
+
+    def test_not_found_is_permanent(self):
+        self.stub.missing = {2}
+
+        result = self.client_for().fetch_many([1, 2, 3])
+
+        self.assertEqual([record['pokemon_id'] for record in result.records], [1, 3])
+        self.assertEqual(list(result.errors), [2])
+        self.assertIn('404', result.errors[2])
+        self.assertEqual(self.stub.requests_by_pokemon[2], 1)  # Sin reintentos
+
+    def test_concurrency_is_bounded(self):
+        self.stub.latency = 0.05
+
+        result = self.client_for(max_workers=3).fetch_many(range(1, 13))
+
+        self.assertEqual(len(result.records), 12)
+        self.assertEqual(self.stub.max_in_flight, 3)
+
+    def test_deadline_stops_the_run(self):
+        self.stub.latency = 0.2
+
+        result = self.client_for(max_workers=2, deadline=0.5).fetch_many(range(1, 21))
+
+        self.assertTrue(result.deadline_exceeded)
+        self.assertLess(len(result.records), 20)
+        self.assertEqual(len(result.records) + len(result.errors), 20)
+        self.assertTrue(any('Tiempo límite' in error for error in result.errors.values()))
+
+
+class HTTPResponseCacheTests(SimpleTestCase):
+    """Caché en disco de la PokéAPI: TTL, revalidación con 304 y LRU"""
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+
+    def store(self, cache, url, body, mtime=None):
+        response = requests.Response()
+        response.status_code = 200
+        response._content = body
+        path = cache.store(url, response)
+        if mtime is not None:
+            os.utime(path, (mtime, mtime))
+        return path
+
+    def test_ttl_expiry_revalidates_and_reuses_the_body(self):
+        cache = HTTPResponseCache(self.directory, ttl=3600, max_bytes=10 * 1024 * 1024)
+        with StubPokeAPIServer(latency=0) as stub, \
+                PokeAPIClient(base_url=stub.base_url, cache=cache, backoff_factor=0) as client:
+            first = client.fetch_pokemon(1)
+            self.assertEqual(client.fetch_pokemon(1), first)  # Dentro del TTL: sin red
+            self.assertEqual((stub.requests_by_pokemon[1], cache.hits, cache.misses), (1, 1, 1))
+
+            cache.ttl = 0  # Vencida: petición condicional, el stub responde 304
+            self.assertEqual(client.fetch_pokemon(1), first)
+            self.assertEqual((stub.requests_by_pokemon[1], cache.revalidated), (2, 1))
+            self.assertTrue(cache.stats()['bytes_saved'] > 0)
+
+            stub.revisions[1] = 2  # Cambió en la PokéAPI: 200 con el cuerpo nuevo
+            self.assertEqual(client.fetch_pokemon(1)['weight'], first['weight'] + 1)
+            self.assertEqual(cache.misses, 2)
+
+    def test_least_recently_used_entries_are_evicted(self):
+        body = os.urandom(1000)  # Sin compresión posible: ~1 KB por entrada
+        cache = HTTPResponseCache(self.directory, ttl=3600, max_bytes=2500)
+        now = time.time()
+        self.store(cache, 'https://pokeapi.test/a', body, mtime=now - 100)
+        self.store(cache, 'https://pokeapi.test/b', body, mtime=now - 50)
+        cache.record_hit(cache.get('https://pokeapi.test/a'))  # a pasa a ser la más reciente
+
+        self.store(cache, 'https://pokeapi.test/c', body)
+
+        self.assertIsNone(cache.get('https://pokeapi.test/b'))
+        self.assertIsNotNone(cache.get('https://pokeapi.test/a'))
+        self.assertIsNotNone(cache.get('https://pokeapi.test/c'))
+        self.assertEqual(cache.evictions, 1)
+        self.assertLessEqual(cache.size(), 2500)
+
+    def test_settings_changes_reach_the_shared_cache(self):
+        config = {'CACHE_DIR': self.directory, 'CACHE_TTL': 60, 'CACHE_MAX_BYTES': 1000}
+        cache = get_http_cache(config)
+
+        again = get_http_cache({**config, 'CACHE_TTL': 5, 'CACHE_MAX_BYTES': 500})
+        self.assertIs(again, cache)
+        self.assertEqual((cache.ttl, cache.max_bytes), (5, 500))
+
+
+class LoadCheckpointTests(TestCase):
+    """Puntos de control de run_load()"""
+
+    def test_permanent_failures_do_not_keep_the_checkpoint(self):
+        spec = LoadSpec(start=1, end=12)
+
+        summary = run_load(spec, client=FakeClient(missing={11, 12}))
+        self.assertEqual(summary.inserted, 10)
+        self.assertEqual(sorted(summary.errors), [11, 12])
+        self.assertFalse(LoadCheckpoint.objects.filter(key=spec.key).exists())
+
+        # La siguiente carga con resume=True vuelve a pedir todo el rango
+        client = FakeClient(missing={11, 12})
+        run_load(spec, client=client)
+        self.assertEqual(sorted(client.requested), list(range(1, 13)))
+
+    def test_deadline_keeps_the_checkpoint(self):
+        spec = LoadSpec(start=1, end=5)
+        client = FakeClient()
+        client.deadline = 0
+
+        summary = run_load(spec, client=client)
+        self.assertTrue(summary.deadline_exceeded)
+        checkpoint = LoadCheckpoint.objects.get(key=spec.key)
+        self.assertEqual(checkpoint.pending_ids, [1, 2, 3, 4, 5])
+
+
+class LoadPokemonCommandTests(TestCase):
+    """Mensajes finales de load_pokemon según por qué quedó incompleta la carga"""
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        seed_synthetic_pokemon(3)
+        self.snapshot = os.path.join(directory.name, 'pokedex.ndjson.gz')
+        export_snapshot(self.snapshot)
+
+    def load(self, *args):
+        out = io.StringIO()
+        call_command('load_pokemon', *args, '--snapshot', self.snapshot, stdout=out, stderr=io.StringIO())
+        return out.getvalue()
+
+    def test_permanent_errors_are_listed_without_the_resume_hint(self):
+        output = self.load('--ids', '1', '2', '98', '99')
+
+        self.assertIn('2 Pokémon no se pudieron cargar: 98 99', output)
+        self.assertIn('load_pokemon --ids 98 99', output)
+        self.assertNotIn('reanudarla', output)
+
+    @override_settings(POKEAPI={**getattr(settings, 'POKEAPI', {}), 'DEADLINE': 0})
+    def test_deadline_suggests_resuming(self):
+        output = self.load('--range', '1-3')
+
+        self.assertIn('vuelve a ejecutar el comando para reanudarla', output)
+        self.assertNotIn('no se pudieron cargar', output)
+
+    def test_complete_load_prints_no_warning(self):
+        output = self.load('--range', '1-3')
+
+        self.assertNotIn('reanudarla', output)
+        self.assertNotIn('no se pudieron cargar', output)
+
+
+class LoadJobTests(TransactionTestCase):
+    """Trabajos de carga: POST simultáneos se unen y el estado muestra el avance"""
+
+    POKEMON = 120  # Tres lotes de CHECKPOINT_CHUNK_SIZE
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        seed_synthetic_pokemon(self.POKEMON)
+        snapshot = os.path.join(directory.name, 'pokedex.ndjson.gz')
+        export_snapshot(snapshot)
+        Pokemon.objects.all().delete()
+
+        # Sin red: el loader lee el snapshot
+        settings_override = override_settings(POKEAPI={**getattr(settings, 'POKEAPI', {}), 'SNAPSHOT': snapshot})
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        # El hilo de trabajo no arranca solo: cada test llama a run_job() aquí
+        self.started = []
+        patcher = mock.patch.object(jobs, '_start_worker', self.started.append)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_concurrent_posts_share_one_job(self):
+        responses = []
+
+        def post(worker):
+            responses.append(Client().post(
+                '/api/pokemon/load-pokemon-data/', {'start': 1, 'end': self.POKEMON}, content_type='application/json'
+            ))
+
+        self.assertEqual(run_in_threads(2, post), [])
+        self.assertEqual([response.status_code for response in responses], [202, 202])
+        bodies = [response.json() for response in responses]
+        self.assertEqual(len({body['job_id'] for body in bodies}), 1)
+        self.assertEqual(sorted(body['coalesced'] for body in bodies), [False, True])
+        self.assertEqual(self.started, [bodies[0]['job_id']])
+        self.assertEqual(LoadJob.objects.count(), 1)
+
+    def test_status_reports_progress_and_summary(self):
+        job, created = enqueue_load(LoadSpec(start=1, end=self.POKEMON))
+        self.assertTrue(created)
+        url = f'/api/pokemon/load-jobs/{job.pk}/'
+        self.assertEqual(self.client.get(url).json()['status'], 'queued')
+
+        # Lo que ve quien consulta el estado después de cada lote
+        seen = []
+        report_progress = jobs._report_progress
+
+        def report_and_poll(job, summary):
+            report_progress(job, summary)
+            data = self.client.get(url).json()
+            seen.append((data['status'], data['processed'], data['total']))
+
+        with mock.patch.object(jobs, '_report_progress', report_and_poll):
+            jobs.run_job(job.pk)
+
+        self.assertIn(('running', 50, self.POKEMON), seen)
+        self.assertIn(('running', 100, self.POKEMON), seen)
+
+        data = self.client.get(url).json()
+        self.assertEqual(data['status'], 'completed')
+        self.assertEqual((data['processed'], data['inserted'], data['progress']), (self.POKEMON, self.POKEMON, 100.0))
+        self.assertEqual(data['errors'], [])
+        self.assertIn(f'{self.POKEMON}/{self.POKEMON} Pokémon cargados', data['message'])
+        self.assertIsNotNone(data['finished_at'])
+
+
+class BulkUpsertTests(TestCase):
+    """bulk_upsert_pokemon: conteos, hash del payload y columnas derivadas"""
+
+    def records(self, ids, changes=None):
+        """Registros de parse_pokemon; changes = {pokemon_id: {campo: valor}}"""
+        changes = changes or {}
+        return [{**parse_pokemon(fake_pokemon_payload(i)), **changes.get(i, {})} for i in ids]
+
+    def test_counts_inserted_updated_and_unchanged(self):
+        result = bulk_upsert_pokemon(self.records(range(1, 6)), batch_size=2)
+        self.assertEqual(result.as_dict(), {'inserted': 5, 'updated': 0, 'unchanged': 0})
+
+        result = bulk_upsert_pokemon(self.records(range(1, 8), {2: {'weight': 500}}), batch_size=2)
+        self.assertEqual(result.as_dict(), {'inserted': 2, 'updated': 1, 'unchanged': 4})
+        self.assertEqual(Pokemon.objects.count(), 7)
+
+    def test_same_hash_leaves_the_row_untouched(self):
+        bulk_upsert_pokemon(self.records([1, 2]))
+        before = dict(Pokemon.objects.values_list('pokemon_id', 'change_version'))
+        updated_at = Pokemon.objects.get(pokemon_id=1).updated_at
+
+        bulk_upsert_pokemon(self.records([1, 2], {2: {'height': 99}}))
+
+        after = dict(Pokemon.objects.values_list('pokemon_id', 'change_version'))
+        self.assertEqual(after[1], before[1])
+        self.assertGreater(after[2], before[2])
+        self.assertEqual(Pokemon.objects.get(pokemon_id=1).updated_at, updated_at)
+
+    def test_derived_columns_are_recomputed_on_update(self):
+        bulk_upsert_pokemon(self.records([7], {7: {'name': 'oddish', 'types': ['grass'], 'weight': 50}}))
+        pidgey = {'name': 'pidgey', 'types': ['normal', 'flying'], 'height': 12, 'weight': 18}
+        record, = self.records([7], {7: pidgey})
+        bulk_upsert_pokemon([record])
+
+        pokemon = Pokemon.objects.get(pokemon_id=7)
+        self.assertEqual((pokemon.primary_type, pokemon.secondary_type), ('normal', 'flying'))
+        self.assertEqual((pokemon.reversed_name, pokemon.types_display), ('yegdip', 'Normal / Flying'))
+        self.assertEqual(
+            (pokemon.weight_filter_match, pokemon.grass_type_match, pokemon.flying_tall_match),
+            (False, False, True)
+        )
+        self.assertEqual(pokemon.payload_hash, compute_payload_hash(record))
+
+
+class IncrementalLoadTests(TestCase):
+    """Carga incremental: solo los IDs que faltan o llevan más de max_age sin comprobarse"""
+
+    def test_fresh_records_are_skipped(self):
+        seed_synthetic_pokemon(10)
+        Pokemon.objects.filter(pokemon_id__in=[3, 4]).update(last_synced_at=timezone.now() - timedelta(days=30))
+        spec = LoadSpec(start=1, end=12, max_age=24 * 3600)
+
+        client = FakeClient()
+        summary = run_load(spec, client=client)
+        self.assertEqual(sorted(client.requested), [3, 4, 11, 12])
+        self.assertEqual((summary.fresh, summary.inserted, summary.unchanged), (8, 2, 2))
+
+        # Los comprobados quedan al día aunque no cambiaran
+        client = FakeClient()
+        summary = run_load(spec, client=client)
+        self.assertEqual(client.requested, [])
+        self.assertEqual(summary.fresh, 12)
+
+
+@override_settings(**NO_RESPONSE_CACHE)
+class ChangesFeedTests(TestCase):
+    """GET /pokemon/changes/: recorrido por páginas (since / after / until)"""
+
+    URL = '/api/pokemon/changes/'
+
+    def setUp(self):
+        # Dos versiones: 1-15 en un lote y 16-25 en otro
+        bulk_upsert_pokemon([parse_pokemon(fake_pokemon_payload(i)) for i in range(1, 16)])
+        bulk_upsert_pokemon([parse_pokemon(fake_pokemon_payload(i)) for i in range(16, 26)])
+
+    def walk(self, since, during=None):
+        """(pokemon_id de cada fila, versión del recorrido); during() corre tras la primera página"""
+        data = self.client.get(self.URL, {'since': since, 'page_size': 7}).json()
+        version = data['version']
+        seen = [row['pokemon_id'] for row in data['results']]
+        if during:
+            during()
+        while data['next']:
+            data = self.client.get(data['next']).json()
+            self.assertEqual(data['version'], version)
+            seen += [row['pokemon_id'] for row in data['results']]
+        return seen, version
+
+    def test_walk_across_a_write_skips_and_repeats_nothing(self):
+        def write():
+            pokemon = Pokemon.objects.get(pokemon_id=20)
+            pokemon.weight += 1
+            pokemon.save()
+
+        seen, version = self.walk(since=0, during=write)
+
+        # El Pokémon escrito durante el recorrido llega en la sincronización siguiente
+        self.assertEqual(len(seen), len(set(seen)))
+        self.assertEqual(sorted(seen), [i for i in range(1, 26) if i != 20])
+        self.assertEqual(self.walk(since=version), ([20], version + 1))
+
+    def test_since_returns_only_newer_versions(self):
+        first_batch = Pokemon.objects.get(pokemon_id=1).change_version
+
+        seen, _ = self.walk(since=first_batch)
+        self.assertEqual(seen, list(range(16, 26)))
+
+        _, version = self.walk(since=0)
+        self.assertEqual(self.walk(since=version), ([], version))
+
+
+@override_settings(POKEDEX_MEMORY_INDEX={'ENABLED': True})
+class MemoryIndexFreshnessTests(TransactionTestCase):
+    """El índice en memoria ve las escrituras hechas desde otra conexión"""
+
+    def setUp(self):
+        seed_synthetic_pokemon(20)
+
+    def test_unchanged_table_keeps_the_index(self):
+        self.assertIs(get_memory_index(), get_memory_index())
+
+    def test_update_from_other_connection_rebuilds(self):
+        index = get_memory_index()
+        run_in_other_connection(lambda: rename_pokemon(1, 'renamed'))
+
+        rebuilt = get_memory_index()
+        self.assertIsNot(rebuilt, index)
+        self.assertEqual(rebuilt.columns['name'][0], 'renamed')
+
+    def test_delete_from_other_connection_rebuilds(self):
+        self.assertEqual(get_memory_index().size, 20)
+        run_in_other_connection(lambda: Pokemon.objects.filter(pokemon_id=20).delete())
+
+        self.assertEqual(get_memory_index().size, 19)
+
+    def test_queryset_update_without_change_version_rebuilds(self):
+        index = get_memory_index()
+        run_in_other_connection(lambda: Pokemon.objects.filter(pokemon_id=3).update(weight=999))
+
+        rebuilt = get_memory_index()
+        self.assertIsNot(rebuilt, index)
+        self.assertEqual(rebuilt.columns['weight'][2], 999)
+
+    def test_bookkeeping_update_keeping_change_version_is_not_a_change(self):
+        index = get_memory_index()
+        Pokemon.objects.update(last_synced_at=timezone.now(), change_version=F('change_version'))
+
+        self.assertIs(get_memory_index(), index)
+
+
+class SearchIndexRankingTests(SimpleTestCase):
+    """Orden y tolerancia a errores de SearchIndex sobre filas fijas"""
+
+    NAMES = {
+        10: 'pika', 25: 'pikachu', 26: 'raichu', 172: 'pichu',
+        300: 'pikachu-rock-star', 500: 'xpikax', 600: 'pikz', 700: 'uhcxyz',
+    }
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.index = SearchIndex([(pokemon_id, name, name[::-1]) for pokemon_id, name in sorted(cls.NAMES.items())])
+
+    def hits(self, query, fuzzy=True):
+        return [tuple(hit) for hit in self.index.search(query, fuzzy=fuzzy)]
+
+    def test_exact_then_prefix_then_substring_then_fuzzy(self):
+        self.assertEqual(self.hits('pika'), [
+            (10, 'exact', 'name', 0),
+            (25, 'prefix', 'name', 0),   # Nombre más corto primero
+            (300, 'prefix', 'name', 0),
+            (500, 'substring', 'name', 0),
+            (600, 'fuzzy', 'name', 1),
+        ])
+
+    def test_name_before_reversed_name(self):
+        self.assertEqual(self.hits('uhc', fuzzy=False), [
+            (700, 'prefix', 'name', 0),
+            (172, 'prefix', 'reversed_name', 0),  # uhcip, uhciar, uhcakip: por longitud
+            (26, 'prefix', 'reversed_name', 0),
+            (25, 'prefix', 'reversed_name', 0),
+            (300, 'substring', 'reversed_name', 0),
+        ])
+
+    def test_transposition_counts_as_one_edit(self):
+        self.assertEqual(edit_distances('pikahcu', 'pikachu', 2)[0], 1)
+        self.assertEqual(self.hits('pikahcu')[0], (25, 'fuzzy', 'name', 1))
+
+    def test_short_queries_are_not_fuzzy(self):
+        self.assertLess(len('pk'), FUZZY_MIN_LENGTH)
+        self.assertEqual(self.hits('pk'), [])
+
+        self.assertEqual(len('pka'), FUZZY_MIN_LENGTH)
+        self.assertEqual([hit[:2] for hit in self.hits('pka')], [(10, 'fuzzy'), (25, 'fuzzy'), (300, 'fuzzy')])
+
+    def test_half_typed_queries(self):
+        self.assertEqual(self.hits('pikac')[:2], [(25, 'prefix', 'name', 0), (300, 'prefix', 'name', 0)])
+        # Con un error: se compara con el comienzo del término, no con el nombre completo
+        self.assertEqual(self.hits('pikxc')[0], (25, 'fuzzy', 'name', 1))
+
+
+class SearchIndexFreshnessTests(TransactionTestCase):
+    """La búsqueda ve las escrituras hechas desde otra conexión"""
+
+    def setUp(self):
+        seed_synthetic_pokemon(20)
+
+    def test_update_from_other_connection_is_found(self):
+        self.assertEqual(get_search_index().search('zygarde', fuzzy=False), [])
+        run_in_other_connection(lambda: rename_pokemon(7, 'zygarde'))
+
+        hits = get_search_index().search('zygarde', fuzzy=False)
+        self.assertEqual([(hit.pokemon_id, hit.match) for hit in hits], [(7, 'exact')])
+
+    def test_search_endpoint_sees_the_update(self):
+        self.client.get('/api/pokemon/search/', {'q': 'zygarde'})
+        run_in_other_connection(lambda: rename_pokemon(7, 'zygarde'))
+
+        response = self.client.get('/api/pokemon/search/', {'q': 'zygarde', 'fuzzy': 'false'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([row['pokemon_id'] for row in response.json()['results']], [7])
+
+
+# Consultas SQL de cada endpoint, sin importar cuántas filas haya. Con el
+# índice en memoria los listados solo comprueban la firma de la tabla
+QUERY_BUDGETS = [
+    ('/api/pokemon/', 1),
+    ('/api/pokemon/?page_size=200', 1),
+    ('/api/pokemon/weight-filter/', 1),
+    ('/api/pokemon/grass-type/', 1),
+    ('/api/pokemon/flying-tall/', 1),
+    ('/api/pokemon/query/?types=grass,poison&types_match=all&ordering=-weight', 1),
+    ('/api/pokemon/query/?height_gt=10&fields=pokemon_id,name', 1),
+    ('/api/pokemon/{pokemon_pk}/', 1),
+    ('/api/pokemon/stats/', 2),
+    ('/api/pokemon/load-jobs/{job_id}/', 1),
+    ('/api/favorites/', 1),
+    ('/api/favorites/{favorite_id}/', 1),
+    ('/api/favorites/check/{pokemon_id}/', 1),
+    ('/api/favorites/status/?ids=1,2,3,4,5,6,7,8,9,10', 1),
+    ('/api/pokemon/changes/?since=0', 2),
+    ('/api/pokemon/search/?q=pokemon-1', 2),
+    ('/api/pokemon/search/?q=pokmeon-12&fuzzy=false', 1),
+    ('/api/async/pokemon/', 1),
+    ('/api/async/pokemon/grass-type/', 1),
+    ('/api/async/pokemon/query/?height_gt=10&fields=pokemon_id,name', 1),
+    ('/api/async/favorites/', 1),
+    ('/api/async/favorites/status/?ids=1,2,3,4,5,6,7,8,9,10', 1),
+]
+
+
+@override_settings(POKEDEX_MEMORY_INDEX={'ENABLED': False}, **NO_RESPONSE_CACHE)
+class QueryBudgetTests(TestCase):
+    """
+    Cada endpoint evalúa su QuerySet una sola vez: ni COUNT extra ni N+1
+
+    También se sigue el enlace 'next' de la primera página de cada listado.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        seed_synthetic_pokemon(120)
+        pokemon = Pokemon.objects.order_by('pokemon_id').first()
+        favorite = PokemonFavorite.objects.create(pokemon=pokemon)
+        PokemonFavorite.objects.bulk_create(
+            PokemonFavorite(pokemon=other) for other in Pokemon.objects.exclude(pk=pokemon.pk)[:80]
+        )
+        job = LoadJob.objects.create(spec={}, spec_key='tests', status=LoadJob.Status.COMPLETED)
+        cls.placeholders = {
+            'pokemon_pk': pokemon.pk,
+            'pokemon_id': pokemon.pokemon_id,
+            'favorite_id': favorite.pk,
+            'job_id': job.pk,
+        }
+
+    def setUp(self):
+        # Los índices en memoria se construyen una vez por cambio de datos,
+        # no en cada petición: fuera del presupuesto
+        get_memory_index()
+        get_search_index()
+
+    def test_endpoints_stay_within_budget(self):
+        for url, budget in QUERY_BUDGETS:
+            url = url.format(**self.placeholders)
+            with self.subTest(url=url):
+                with self.assertNumQueries(budget):
+                    response = self.client.get(url)
+                self.assertEqual(response.status_code, 200)
+
+                next_url = response.json().get('next')
+                if next_url:
+                    with self.assertNumQueries(budget):
+                        response = self.client.get(next_url)
+                    self.assertEqual(response.status_code, 200)
+
+
+@override_settings(POKEDEX_MEMORY_INDEX={'ENABLED': True}, **NO_RESPONSE_CACHE)
+class MemoryIndexQueryBudgetTests(QueryBudgetTests):
+    """Los mismos presupuestos con POKEDEX_MEMORY_INDEX activado"""
+
+
+class ConditionalGetTests(TestCase):
+    """ETag / 304 (ConditionalGetMiddleware) y Cache-Control por acción"""
+
+    @classmethod
+    def setUpTestData(cls):
+        seed_synthetic_pokemon(30)
+
+    def setUp(self):
+        cache.clear()
+
+    def test_matching_etag_returns_304(self):
+        response = self.client.get('/api/pokemon/?page_size=10')
+        self.assertEqual(response.status_code, 200)
+        etag = response['ETag']
+
+        response = self.client.get('/api/pokemon/?page_size=10', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b'')
+        self.assertEqual(response['ETag'], etag)
+
+    def test_write_changes_the_etag(self):
+        etag = self.client.get('/api/favorites/')['ETag']
+
+        # La caché de respuestas se invalida al confirmar la transacción
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post('/api/favorites/toggle/', {'pokemon_id': 3}, content_type='application/json')
+
+        response = self.client.get('/api/favorites/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertEqual([row['pokemon']['pokemon_id'] for row in response.json()['results']], [3])
+
+    def test_cache_control_per_action(self):
+        pokemon = Pokemon.objects.get(pokemon_id=1)
+        expected = [
+            ('/api/pokemon/', 'no-cache'),
+            ('/api/pokemon/query/?types=grass', 'no-cache'),
+            (f'/api/pokemon/{pokemon.pk}/', 'max-age=300'),
+            ('/api/pokemon/stats/', 'no-store'),
+            ('/api/favorites/', 'no-cache'),
+        ]
+        for url, cache_control in expected:
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(response['Cache-Control'], cache_control)
+
+    def test_response_cache_hit_keeps_the_etag(self):
+        miss = self.client.get('/api/pokemon/grass-type/')
+        hit = self.client.get('/api/pokemon/grass-type/')
+
+        self.assertEqual((miss['X-Cache'], hit['X-Cache']), ('MISS', 'HIT'))
+        self.assertEqual(hit['ETag'], miss['ETag'])
+        self.assertEqual(hit['Cache-Control'], miss['Cache-Control'])
+        self.assertEqual(self.client.get('/api/pokemon/grass-type/', HTTP_IF_NONE_MATCH=miss['ETag']).status_code, 304)
+
+
+@override_settings(**NO_RESPONSE_CACHE)
+class ExportTests(TestCase):
+    """GET /pokemon/export/ y /favorites/export/ en streaming"""
+
+    @classmethod
+    def setUpTestData(cls):
+        seed_synthetic_pokemon(30)
+        PokemonFavorite.objects.bulk_create(PokemonFavorite(pokemon=p) for p in Pokemon.objects.all()[:5])
+
+    def export(self, url, **headers):
+        response = self.client.get(url, **headers)
+        self.assertEqual(response.status_code, 200)
+        return response, b''.join(response.streaming_content)
+
+    def test_ndjson_has_one_list_row_per_line(self):
+        response, body = self.export('/api/pokemon/export/?output=ndjson')
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson; charset=utf-8')
+
+        rows = [json.loads(line) for line in body.decode().splitlines()]
+        listed = self.client.get('/api/pokemon/?page_size=200').json()['results']
+        self.assertEqual(rows, listed)
+
+    def test_favorites_ndjson_matches_the_list(self):
+        _, body = self.export('/api/favorites/export/?output=ndjson')
+
+        rows = [json.loads(line) for line in body.decode().splitlines()]
+        self.assertEqual(rows, self.client.get('/api/favorites/?page_size=200').json()['results'])
+
+    def test_csv_header_comes_from_the_first_row(self):
+        response, body = self.export('/api/pokemon/export/?output=csv&fields=pokemon_id,name,types')
+        self.assertEqual(response['Content-Type'], 'text/csv; charset=utf-8')
+        self.assertIn('filename="pokedex.csv"', response['Content-Disposition'])
+
+        header, *rows = csv.reader(io.StringIO(body.decode()))
+        self.assertEqual(header, ['pokemon_id', 'name', 'types'])
+        self.assertEqual(len(rows), 30)
+        by_id = {int(row[0]): row for row in rows}
+        self.assertEqual(by_id[6], ['6', 'pokemon-6', 'grass|poison'])
+        self.assertEqual(by_id[1], ['1', 'pokemon-1', 'fire'])
+
+    def test_gzip_when_accepted(self):
+        _, plain = self.export('/api/pokemon/export/?output=ndjson')
+        response, body = self.export('/api/pokemon/export/?output=ndjson', HTTP_ACCEPT_ENCODING='gzip, deflate')
+
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertIn('Accept-Encoding', response['Vary'])
+        self.assertEqual(gzip.decompress(body), plain)
+
+    def test_unknown_output_is_rejected(self):
+        response = self.client.get('/api/pokemon/export/?output=xml')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('output', response.json())
+
+
+class PresetQueryPlanTests(TestCase):
+    """Los filtros predefinidos leen su índice parcial, no la tabla completa"""
+
+    PRESET_INDEXES = [
+        ({'matches': ['weight_filter']}, 'pkmn_weight_match_idx'),
+        ({'matches': ['grass_type']}, 'pkmn_grass_match_idx'),
+        ({'matches': ['flying_tall']}, 'pkmn_flying_match_idx'),
+    ]
+
+    @classmethod
+    def setUpTestData(cls):
+        seed_synthetic_pokemon(200)
+
+    def setUp(self):
+        if connection.vendor == 'postgresql':
+            # Con tan pocas filas PostgreSQL preferiría recorrer la tabla
+            with connection.cursor() as cursor:
+                cursor.execute('SET LOCAL enable_seqscan = off')
+
+    def test_presets_use_their_partial_index(self):
+        for params, index_name in self.PRESET_INDEXES:
+            with self.subTest(index=index_name):
+                # Como lo pide la paginación: primera página en orden
+                plan = build_pokemon_queryset(params)[:50].explain()
+                self.assertIn(index_name, plan)
+                self.assertNotIn('USE TEMP B-TREE', plan)
+
+
+class ConcurrentFavoriteTests(TransactionTestCase):
+    """Varios hilos (cada uno con su conexión) cambian los mismos favoritos a la vez"""
+
+    WORKERS = 8
+
+    def setUp(self):
+        cache.clear()
+        seed_synthetic_pokemon(3)
+        self.pokemon_list = list(Pokemon.objects.order_by('pokemon_id'))
+
+    def test_simultaneous_adds_create_one_row(self):
+        added = []
+        errors = run_in_threads(self.WORKERS, 
+            lambda worker: added.extend(
+                pokemon.pk for pokemon in self.pokemon_list if add_favorite(pokemon) is not None
+            )
+        )
+
+        self.assertEqual(errors, [])
+        self.assertEqual(sorted(added), [pokemon.pk for pokemon in self.pokemon_list])
+        for pokemon in self.pokemon_list:
+            self.assertEqual(PokemonFavorite.objects.filter(pokemon=pokemon).count(), 1)
+
+    def test_simultaneous_flips_change_the_state_once_each(self):
+        flips_per_worker = 20
+        errors = run_in_threads(self.WORKERS, 
+            lambda worker: [flip_favorite(pokemon) for _ in range(flips_per_worker) for pokemon in self.pokemon_list]
+        )
+
+        self.assertEqual(errors, [])
+        # Un número par de toggles por Pokémon: todos vuelven a no ser favoritos
+        self.assertFalse(PokemonFavorite.objects.exists())
+
+        run_in_threads(self.WORKERS, lambda worker: flip_favorite(self.pokemon_list[0]) if worker < 3 else None)
+        self.assertEqual(PokemonFavorite.objects.filter(pokemon=self.pokemon_list[0]).count(), 1)
+
+
+@skipUnless(connection.vendor == 'sqlite', 'Solo SQLite')
+class SQLiteSettingsTests(TestCase):
+    """Cada conexión nueva aplica los ajustes de DATABASES (settings.py)"""
+
+    PRAGMAS = {
+        'journal_mode': 'wal',
+        'synchronous': 1,  # NORMAL
+        'busy_timeout': 5000,
+        'temp_store': 2,   # MEMORY
+    }
+
+    def test_connection_pragmas(self):
+        with connection.cursor() as cursor:
+            for pragma, expected in self.PRAGMAS.items():
+                with self.subTest(pragma=pragma):
+                    cursor.execute(f'PRAGMA {pragma}')
+                    self.assertEqual(cursor.fetchone()[0], expected)
+
+    def test_transactions_take_the_write_lock_at_begin(self):
+        self.assertEqual(connection.transaction_mode, 'IMMEDIATE')
+
+
+@skipUnless(connection.vendor == 'postgresql', 'Solo PostgreSQL')
+class PostgreSQLSettingsTests(TestCase):
+    """Conexiones y tipos de columna en PostgreSQL"""
+
+    def test_types_is_jsonb(self):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT data_type FROM information_schema.columns "
+                "WHERE table_name = 'pokedex_pokemon' AND column_name = 'types'"
+            )
+            self.assertEqual(cursor.fetchone()[0], 'jsonb')
+
+    def test_types_gin_index_backs_the_type_filters(self):
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT indexdef FROM pg_indexes WHERE indexname = 'pkmn_types_gin'")
+            self.assertIn('gin', cursor.fetchone()[0].lower())
+
+        sql = str(build_pokemon_queryset({'types': ['grass']}).query)
+        self.assertIn('@>', sql)
+
+    def test_connections_are_reused_safely(self):
+        settings_dict = connection.settings_dict
+        self.assertTrue(settings_dict['CONN_HEALTH_CHECKS'])
+        if settings_dict['OPTIONS'].get('pool'):
+            # El pool no admite conexiones persistentes de Django
+            self.assertEqual(settings_dict['CONN_MAX_AGE'], 0)
+
+
+class OrphanTypeTableMigrationTests(TransactionTestCase):
+    """0014 borra las tablas de la antigua 0007_pokemontype si siguen ahí"""
+
+    def test_drops_the_orphan_tables_only_when_present(self):
+        migration = importlib.import_module('pokedex.migrations.0014_drop_orphan_pokemontype')
+        with connection.cursor() as cursor:
+            cursor.execute('CREATE TABLE pokedex_pokemontype (id integer PRIMARY KEY, name varchar(30))')
+            cursor.execute(
+                'CREATE TABLE pokedex_pokemon_pokemon_types (id integer PRIMARY KEY, '
+                'pokemon_id bigint, pokemontype_id bigint REFERENCES pokedex_pokemontype (id))'
+            )
+
+        for _ in range(2):  # La segunda vez no hay nada que borrar
+            with connection.schema_editor() as editor:
+                migration.drop_orphan_tables(apps, editor)
+
+        tables = connection.introspection.table_names()
+        self.assertNotIn('pokedex_pokemontype', tables)
+        self.assertNotIn('pokedex_pokemon_pokemon_types', tables)
+        self.assertIn('pokedex_pokemon', tables)
+
+
+class TypeFilterTests(TestCase):
+    """Los filtros por tipo devuelven lo mismo que comparar las listas en Python"""
+
+    @classmethod
+    def setUpTestData(cls):
+        seed_synthetic_pokemon(60)
+
+    def test_type_filters_match_python(self):
+        pokemon_list = list(Pokemon.objects.only('pk', 'types'))
+        for params in [
+            {'types': ['grass']},
+            {'types': ['fire', 'water']},
+            {'types': ['normal', 'flying'], 'types_match': 'all'},
+            {'types': ['grass', 'fire'], 'types_match': 'all'},
+        ]:
+            with self.subTest(**params):
+                wanted = set(params['types'])
+                if params.get('types_match') == 'all':
+                    expected = sorted(p.pk for p in pokemon_list if wanted <= set(p.types))
+                else:
+                    expected = sorted(p.pk for p in pokemon_list if wanted & set(p.types))
+                self.assertEqual(sorted(build_pokemon_queryset(params).values_list('pk', flat=True)), expected)
+
+
+class MixedLoadTests(TransactionTestCase):
+    """
+    Recargas, toggles y lecturas a la vez desde varios hilos: con los ajustes
+    de la base de datos (SQLite: WAL, busy timeout, IMMEDIATE) no hay errores
+    """
+
+    WORKERS = 6
+    ROUNDS = 10
+
+    def setUp(self):
+        seed_synthetic_pokemon(120)
+        self.pokemon_ids = list(Pokemon.objects.order_by('pokemon_id').values_list('pokemon_id', flat=True))
+
+    def test_concurrent_writes_and_reads(self):
+        def work(worker):
+            mine = self.pokemon_ids[worker::self.WORKERS]
+            for round_number in range(self.ROUNDS):
+                if worker % 2 == 0:
+                    # Cada escritor reescribe su porción con otro peso
+                    records = [parse_pokemon(fake_pokemon_payload(pokemon_id)) for pokemon_id in mine]
+                    for record in records:
+                        record['weight'] += round_number + 1
+                    bulk_upsert_pokemon(records)
+                    flip_favorite(Pokemon.objects.get(pokemon_id=mine[0]))
+                else:
+                    type_name = TYPE_CYCLE[(worker + round_number) % len(TYPE_CYCLE)][0]
+                    list(build_pokemon_queryset({'types': [type_name], 'weight_gte': 30})
+                         .values('pokemon_id', 'name')[:200])
+
+        self.assertEqual(run_in_threads(self.WORKERS, work), [])
+
+
+class FavoriteBatchTests(TestCase):
+    """POST /favorites/batch/ y GET /favorites/status/"""
+
+    def setUp(self):
+        cache.clear()
+        seed_synthetic_pokemon(10)
+        for pokemon_id in (1, 2):
+            PokemonFavorite.objects.create(pokemon=Pokemon.objects.get(pokemon_id=pokemon_id))
+
+    def batch(self, **data):
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.client.post('/api/favorites/batch/', data, content_type='application/json')
+
+    def favorite_ids(self):
+        return set(PokemonFavorite.objects.values_list('pokemon__pokemon_id', flat=True))
+
+    def test_add_and_remove_in_one_request(self):
+        data = self.batch(add=[3, 4], remove=[1]).json()
+
+        self.assertEqual((data['added'], data['removed'], data['unchanged'], data['not_found']),
+                         ([3, 4], [1], [], []))
+        self.assertEqual({row['pokemon']['pokemon_id'] for row in data['favorites']}, {3, 4})
+        self.assertEqual(self.favorite_ids(), {2, 3, 4})
+
+    def test_repeating_a_batch_changes_nothing(self):
+        self.batch(add=[3, 4], remove=[1])
+        data = self.batch(add=[3, 4], remove=[1]).json()
+
+        self.assertEqual((data['added'], data['removed'], data['unchanged']), ([], [], [3, 4, 1]))
+        self.assertEqual(self.favorite_ids(), {2, 3, 4})
+
+    def test_unknown_ids_do_not_cancel_the_rest(self):
+        data = self.batch(add=[5, 999], remove=[998]).json()
+
+        self.assertEqual((data['added'], data['not_found'], data['unchanged']), ([5], [999], [998]))
+        self.assertEqual(self.favorite_ids(), {1, 2, 5})
+
+    def test_invalid_batches_are_rejected(self):
+        too_many = list(range(1, FavoriteBatchSerializer.MAX_BATCH_SIZE + 2))
+        for data in ({'add': too_many}, {'add': [3], 'remove': [3]}, {}):
+            with self.subTest(data=data):
+                self.assertEqual(self.batch(**data).status_code, 400)
+        self.assertEqual(self.favorite_ids(), {1, 2})
+
+    def test_status_of_favorites_others_and_missing(self):
+        response = self.client.get('/api/favorites/status/?ids=2,5,999')
+
+        self.assertEqual(response.json(), {'results': {'2': True, '5': False, '999': False}, 'count': 1})
+        too_many = ','.join(str(i) for i in range(1, FavoriteBatchSerializer.MAX_BATCH_SIZE + 2))
+        self.assertEqual(self.client.get(f'/api/favorites/status/?ids={too_many}').status_code, 400)
+
+    def test_batch_invalidates_cached_responses(self):
+        url = '/api/favorites/status/?ids=1,3'
+        self.client.get(url)
+        self.assertEqual(self.client.get(url)['X-Cache'], 'HIT')
+
+        self.batch(add=[3], remove=[1])
+
+        response = self.client.get(url)
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(response.json()['results'], {'1': False, '3': True})
+
+
+class FavoriteInvalidationTests(TestCase):
+    """Un favorito escrito por el ORM (shell, admin) invalida la caché de respuestas"""
+
+    def setUp(self):
+        cache.clear()
+        seed_synthetic_pokemon(3)
+        self.pokemon = Pokemon.objects.get(pokemon_id=2)
+
+    def assertBumpsDataVersion(self, write):
+        version = get_data_version()
+        with self.captureOnCommitCallbacks(execute=True):
+            write()
+        self.assertNotEqual(get_data_version(), version)
+
+    def test_create_bumps_the_data_version(self):
+        self.assertBumpsDataVersion(lambda: PokemonFavorite.objects.create(pokemon=self.pokemon))
+
+    def test_delete_bumps_the_data_version(self):
+        favorite = PokemonFavorite.objects.create(pokemon=self.pokemon)
+        self.assertBumpsDataVersion(favorite.delete)
+
+    def test_cached_status_is_not_served_after_an_orm_write(self):
+        url = '/api/favorites/status/?ids=1,2,3'
+        self.assertEqual(self.client.get(url).json()['count'], 0)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            PokemonFavorite.objects.create(pokemon=self.pokemon)
+
+        response = self.client.get(url)
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(response.json()['count'], 1)
+
+
+class FastJSONRendererTests(TestCase):
+    """FastJSONRenderer + filas rápidas: los mismos bytes que DRF (JSONRenderer + serializers)"""
+
+    @classmethod
+    def setUpTestData(cls):
+        seed_synthetic_pokemon(6)
+        # Caracteres que cada codificador JSON escapa a su manera, y campos nulos
+        Pokemon.objects.filter(pokemon_id=1).update(name='nidoran♀ "x"\\ \u2028\u2029 é😀')
+        Pokemon.objects.filter(pokemon_id=2).update(name='mr-mime\x00\x1f\t', types=[])
+        Pokemon.objects.filter(pokemon_id=3).update(sprite_url=None, sprite_local_url=None)
+        PokemonFavorite.objects.bulk_create(PokemonFavorite(pokemon=p) for p in Pokemon.objects.all())
+
+    def envelope(self, results):
+        return {'count': len(results), 'next': None, 'previous': None, 'results': results,
+                'message': 'Encontrados Pokémon – “prueba”'}
+
+    def assertSameBytes(self, expected, render):
+        """Con orjson (si está instalado) y con el json de la biblioteca estándar"""
+        installed = renderers.orjson
+        for module in {installed, None}:
+            with self.subTest(orjson=module is not None):
+                renderers.orjson = module
+                try:
+                    self.assertEqual(render(), expected)
+                finally:
+                    renderers.orjson = installed
+
+    def test_pokemon_page(self):
+        columns = sorted(columns_for_fields(PokemonBasicSerializer.Meta.fields))
+        rows = list(Pokemon.objects.order_by('pokemon_id').values(*columns))
+        objects = list(Pokemon.objects.order_by('pokemon_id'))
+        self.assertIsNone(rows[2]['sprite_url'])
+
+        for fields in (None, ['name', 'types_display', 'sprite_local_url']):
+            with self.subTest(fields=fields):
+                expected = JSONRenderer().render(self.envelope(
+                    PokemonBasicSerializer(objects, many=True, fields=fields).data
+                ))
+                self.assertSameBytes(expected, lambda: renderers.FastJSONRenderer().render(
+                    self.envelope(pokemon_basic_rows(rows, fields))
+                ))
+
+    def test_favorites_page(self):
+        columns = sorted(columns_for_fields(PokemonBasicSerializer.Meta.fields))
+        values = ['id', 'created_at'] + [f'pokemon__{column}' for column in columns]
+        favorites = PokemonFavorite.objects.order_by('-created_at', '-id')
+
+        expected = JSONRenderer().render(self.envelope(
+            PokemonFavoriteSerializer(favorites.select_related('pokemon'), many=True).data
+        ))
+        self.assertSameBytes(expected, lambda: renderers.FastJSONRenderer().render(
+            self.envelope(favorite_rows(favorites.values(*values)))
+        ))
+
+    def test_other_responses_fall_back_to_json_renderer(self):
+        data = {'detail': 'No encontrado – é', 'results': [{'name': 'bulbasaur'}]}
+        self.assertEqual(renderers.FastJSONRenderer().render(data), JSONRenderer().render(data))
+
+
+class SnapshotImportTests(TestCase):
+    """Importar un snapshot invalida la caché de respuestas"""
+
+    def test_importing_only_favorites_bumps_the_data_version(self):
+        seed_synthetic_pokemon(5)
+        PokemonFavorite.objects.create(pokemon=Pokemon.objects.get(pokemon_id=3))
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'pokedex.ndjson.gz')
+            export_snapshot(path)
+            PokemonFavorite.objects.all().delete()
+
+            # Los Pokémon no cambian: solo vuelve el favorito
+            version = get_data_version()
+            with self.captureOnCommitCallbacks(execute=True):
+                result = import_snapshot(path)
+
+        self.assertEqual((result.unchanged, result.favorites_added), (5, 1))
+        self.assertNotEqual(get_data_version(), version)
+
+
+@override_settings(**NO_RESPONSE_CACHE)
+class AsyncViewTests(TestCase):
+    """Las vistas de /api/async/ devuelven lo mismo que sus equivalentes sync"""
+
+    URLS = [
+        '/pokemon/?page_size=20',
+        '/pokemon/grass-type/?page_size=8',
+        '/pokemon/query/?types=flying&height_gt=10&ordering=-weight&page_size=8',
+        '/favorites/?page_size=20',
+    ]
+
+    @classmethod
+    def setUpTestData(cls):
+        seed_synthetic_pokemon(120)
+        PokemonFavorite.objects.bulk_create(PokemonFavorite(pokemon=p) for p in Pokemon.objects.all()[:50])
+
+    def assertSamePage(self, sync_data, async_data):
+        self.assertEqual(
+            {key: value for key, value in async_data.items() if key not in ('next', 'previous')},
+            {key: value for key, value in sync_data.items() if key not in ('next', 'previous')},
+        )
+        for link in ('next', 'previous'):
+            # Mismo cursor; cambia solo la ruta (/api/async/...)
+            self.assertEqual(
+                async_data[link] and parse_qs(urlparse(async_data[link]).query),
+                sync_data[link] and parse_qs(urlparse(sync_data[link]).query),
+            )
+
+    async def test_pages_match_the_sync_views(self):
+        for url in self.URLS:
+            with self.subTest(url=url):
+                sync_data = (await self.async_client.get(f'/api{url}')).json()
+                async_data = (await self.async_client.get(f'/api/async{url}')).json()
+                self.assertSamePage(sync_data, async_data)
+
+                # Segunda página (si la hay) y vuelta atrás (cursor inverso),
+                # siguiendo los enlaces de cada una
+                for link in ('next', 'previous'):
+                    if sync_data[link]:
+                        sync_data = (await self.async_client.get(sync_data[link])).json()
+                        async_data = (await self.async_client.get(async_data[link])).json()
+                        self.assertSamePage(sync_data, async_data)
+
+
+@override_settings(POKEDEX_MEMORY_INDEX={'ENABLED': True}, **NO_RESPONSE_CACHE)
+class MemoryIndexAsyncViewTests(AsyncViewTests):
+    """Con el índice en memoria, las dos versiones leen las filas de él"""
+
+    def test_pages_come_from_the_index(self):
+        get_memory_index()
+        for url in self.URLS:
+            if not url.startswith('/pokemon/'):
+                continue
+            with self.subTest(url=url):
+                with CaptureQueriesContext(connection) as queries:
+                    response = self.client.get(f'/api/async{url}')
+                self.assertEqual(response.status_code, 200)
+                # Solo la firma de la tabla: ninguna consulta lee las columnas
+                self.assertEqual(len(queries), 1)
+                self.assertNotIn('"name"', queries[0]['sql'])
+
+
+class AsyncResponseCacheTests(TestCase):
+    """Las vistas async usan la caché de respuestas como las sync"""
+
+    @classmethod
+    def setUpTestData(cls):
+        seed_synthetic_pokemon(60)
+
+    def setUp(self):
+        cache.clear()
+
+    async def test_second_request_is_served_from_cache(self):
+        for url in ('/api/async/pokemon/?page_size=20', '/api/async/favorites/status/?ids=1,2,3'):
+            with self.subTest(url=url):
+                first = await self.async_client.get(url)
+                self.assertEqual(first['X-Cache'], 'MISS')
+
+                second = await self.async_client.get(url)
+                self.assertEqual(second['X-Cache'], 'HIT')
+                self.assertEqual(second.content, first.content)
+                self.assertEqual(second['ETag'], first['ETag'])
+                self.assertEqual(second['Cache-Control'], first['Cache-Control'])
@@ -1,6 +1,6 @@
-from django.urls import path, include
+from django.urls import path, re_path, include
 from rest_framework.routers import DefaultRouter
-from . import views
+from . import async_views, views
 
 
 # CONFIGURACIÓN DE RUTAS PARA LA API
@@ -11,27 +11,59 @@ router = DefaultRouter()
 router.register(r'pokemon', views.PokemonViewSet, basename='pokemon')
 router.register(r'favorites', views.PokemonFavoriteViewSet, basename='favorites')
 
+# Versiones async de los endpoints de lectura (ver async_views.py)
+async_urlpatterns = [
+    path('pokemon/', async_views.pokemon_list, name='async-pokemon-list'),
+    path('pokemon/weight-filter/', async_views.pokemon_weight_filter, name='async-pokemon-weight-filter'),
+    path('pokemon/grass-type/', async_views.pokemon_grass_type, name='async-pokemon-grass-type'),
+    path('pokemon/flying-tall/', async_views.pokemon_flying_tall, name='async-pokemon-flying-tall'),
+    path('pokemon/query/', async_views.pokemon_query, name='async-pokemon-query'),
+    path('pokemon/stats/', async_views.pokemon_stats, name='async-pokemon-stats'),
+    path('pokemon/<int:pk>/', async_views.pokemon_detail, name='async-pokemon-detail'),
+    path('favorites/', async_views.favorite_list, name='async-favorites-list'),
+    path('favorites/status/', async_views.favorite_status, name='async-favorites-status'),
+]
+
 # Todas las URLs de la app pokedex
 urlpatterns = [
     # Incluir todas las rutas del router
     path('api/', include(router.urls)),
+    path('api/async/', include(async_urlpatterns)),
+    # Sprites copiados a disco (ver sprites.py); el nombre se valida en la vista
+    re_path(r'^sprites/(?P<name>[0-9a-f]{2}/[^/]+)$', views.sprite_file, name='sprite-file'),
 ]
 
 
 # RUTAS GENERADAS AUTOMÁTICAMENTE:
 
 # 🔍 POKÉMON ENDPOINTS
-# GET    /api/pokemon/                    -> Lista primeros 50 Pokémon
-# POST   /api/pokemon/load-pokemon-data/ -> Carga datos desde PokéAPI
+# GET    /api/pokemon/                    -> Lista Pokémon por páginas (cursor)
+# POST   /api/pokemon/load-pokemon-data/ -> Encola carga desde PokéAPI (202 + job_id)
+#        body: {"start": 1, "end": 151} | {"ids": [1, 4, 7]} | {"all": true}
+#              + "incremental": true -> solo faltantes o desactualizados
+# GET    /api/pokemon/load-jobs/{id}/    -> Avance, velocidad, ETA y errores de la carga
+# GET    /api/pokemon/stats/             -> Totales y métricas de la caché HTTP de PokéAPI
 # GET    /api/pokemon/weight-filter/     -> Pokémon con peso entre 30-80 
 # GET    /api/pokemon/grass-type/        -> Pokémon tipo grass  
 # GET    /api/pokemon/flying-tall/       -> Pokémon flying con altura > 10
+# GET    /api/pokemon/query/             -> Consulta combinable (tipos any/all, rangos,
+#                                           name_prefix, ordering, fields)
+# GET    /api/pokemon/export/            -> Exportación en streaming (NDJSON / CSV)
+# GET    /api/pokemon/changes/?since=N   -> Pokémon cambiados después de la versión N
 # GET    /api/pokemon/{id}/              -> Detalle de un Pokémon específico
 
 # ⭐ FAVORITOS ENDPOINTS
-# GET    /api/favorites/                 -> Lista favoritos del usuario
+# GET    /api/favorites/                 -> Lista favoritos por páginas (cursor)
 # POST   /api/favorites/                 -> Agregar Pokémon a favoritos  
 # DELETE /api/favorites/{id}/           -> Remover de favoritos
 # POST   /api/favorites/toggle/          -> Toggle favorito (agregar/quitar)
 # GET    /api/favorites/check/{pokemon_id}/ -> Verificar si es favorito
+# POST   /api/favorites/batch/           -> Agregar / quitar varios en una transacción
+# GET    /api/favorites/status/?ids=     -> Estado de favorito de muchos Pokémon
+# GET    /api/favorites/export/          -> Exportación en streaming (NDJSON / CSV)
+
+# 🖼️ SPRITES
+# GET    /sprites/{hash}.webp            -> Sprite local (Cache-Control: immutable)
+
+# ⚡ VERSIONES ASYNC (ORM async, mismo JSON): /api/async/pokemon/..., /api/async/favorites/...
 #
\ No newline at end of file
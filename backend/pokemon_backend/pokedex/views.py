@@ -1,36 +1,133 @@
 from django.shortcuts import render
+from django.http import FileResponse, Http404
+from django.utils.cache import patch_cache_control
+from django.views.decorators.http import condition, require_GET
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
-from django.db.models import Q
-import requests
+from rest_framework.reverse import reverse
+from rest_framework.utils.urls import replace_query_param
+from django.db import transaction
+from django.db.models import Q, Count, Exists, OuterRef
 import logging
-from .models import Pokemon, PokemonFavorite
+from .models import Pokemon, PokemonFavorite, LoadJob, current_change_version
+from .jobs import enqueue_load
+from .queries import build_pokemon_queryset, describe_query, columns_for_fields, values_for_fields
+from .memory_index import indexed_rows
+from .search import get_search_index
+from .http_cache import get_http_cache
+from .ingestion import get_pokeapi_settings
+from .pagination import PokemonCursorPagination, FavoriteCursorPagination
+from .cache import CacheControlMixin, cache_response, invalidate_on_commit, response_cache_stats
+from .export import EXPORT_CHUNK_SIZE, streaming_export
+from .renderers import FastRows
+from .favorites import flip_favorite, remove_favorite
+from .sprites import CONTENT_TYPES, SPRITE_NAME, get_sprite_store
 from .serializers import (
     PokemonSerializer, 
     PokemonBasicSerializer, 
     PokemonLoadStatusSerializer,
-    PokemonFavoriteSerializer
+    PokemonLoadRequestSerializer,
+    LoadJobSerializer,
+    PokemonQuerySerializer,
+    PokemonExportSerializer,
+    PokemonChangesSerializer,
+    PokemonSearchSerializer,
+    PokemonFavoriteSerializer,
+    FavoriteBatchSerializer,
+    FavoriteStatusSerializer,
+    FavoriteExportSerializer,
+    pokemon_basic_rows,
+    pokemon_basic_row_builder,
+    favorite_rows,
+    favorite_row_builder
 )
 
 # Configurar logging para debug
 logger = logging.getLogger(__name__)
 
 
-class PokemonViewSet(viewsets.ModelViewSet):
+# RESPUESTAS COMPARTIDAS CON LAS VISTAS ASYNC (async_views.py)
+# Solo arman el JSON de filas ya leídas: cada versión lee con su ORM
+
+
+def pokemon_page_data(paginator, page, fields, message, **extra):
+    """
+    Respuesta estándar de una página de Pokémon ya paginada
+    
+    count es el número de resultados de esta página; next / previous son
+    los enlaces a las páginas vecinas (None en los extremos).
+    message puede usar {count}
+    """
+    return {
+        'count': len(page),
+        'next': paginator.get_next_link(),
+        'previous': paginator.get_previous_link(),
+        'results': pokemon_basic_rows(page, fields),
+        **extra,
+        'message': message.format(count=len(page))
+    }
+
+
+def favorite_queryset():
+    """Favoritos con las columnas de su Pokémon (un JOIN), más recientes primero"""
+    return PokemonFavorite.objects.order_by('-created_at').values(
+        'id', 'created_at', *PokemonFavoriteViewSet.POKEMON_COLUMNS
+    )
+
+
+def favorite_page_data(paginator, page):
+    return {
+        'count': len(page),
+        'next': paginator.get_next_link(),
+        'previous': paginator.get_previous_link(),
+        'results': favorite_rows(page),
+        'message': f'{len(page)} Pokémon favoritos'
+    }
+
+
+def favorited_ids(ids):
+    """IDs de Pokémon favoritos entre ids, en una sola consulta (IN)"""
+    return PokemonFavorite.objects.filter(pokemon__pokemon_id__in=ids).values_list('pokemon__pokemon_id', flat=True)
+
+
+def favorite_status_data(ids, favorited):
+    return {
+        'results': {pokemon_id: pokemon_id in favorited for pokemon_id in ids},
+        'count': len(favorited)
+    }
+
+
+class PokemonViewSet(CacheControlMixin, viewsets.ModelViewSet):
     """
     ViewSet principal para manejar todas las operaciones con Pokémon
     
     Endpoints disponibles:
-    - GET /pokemon/ : Lista los primeros 50 Pokémon
-    - POST /pokemon/load_pokemon_data/ : Carga datos desde PokéAPI
+    - GET /pokemon/ : Lista los Pokémon por páginas (cursor, ?page_size=N)
+    - POST /pokemon/load_pokemon_data/ : Encola una carga desde PokéAPI (rango, lista o todos)
+    - GET /pokemon/load-jobs/{id}/ : Avance de un trabajo de carga
+    - GET /pokemon/stats/ : Estadísticas y métricas de la caché HTTP
     - GET /pokemon/weight_filter/ : Pokémon que pesen entre 30-80 kg
     - GET /pokemon/grass_type/ : Pokémon tipo grass
     - GET /pokemon/flying_tall/ : Pokémon tipo flying > 1 metro
+    - GET /pokemon/query/ : Consulta combinable (tipos, rangos, prefijo, orden, campos)
+    - GET /pokemon/search/?q= : Búsqueda por nombre (prefijo, subcadena, con errores)
+    - GET /pokemon/export/ : Exportación completa en streaming (NDJSON / CSV)
+    - GET /pokemon/changes/?since=N : Pokémon que cambiaron después de la versión N
     """
     
     queryset = Pokemon.objects.all()
     serializer_class = PokemonSerializer
+    pagination_class = PokemonCursorPagination
+    
+    # Cache-Control por endpoint. Por defecto no-cache: el navegador guarda
+    # la respuesta pero la revalida con If-None-Match (304 si no cambió)
+    cache_control = {
+        'retrieve': {'max_age': 300},   # El detalle solo cambia con una recarga
+        'stats': {'no_store': True},    # Contadores en vivo
+        'load_job': {'no_store': True}, # Avance en vivo
+        'export': {'no_store': True},   # Descarga completa, no se guarda
+    }
     
     def get_serializer_class(self):
         """
@@ -40,87 +137,288 @@ class PokemonViewSet(viewsets.ModelViewSet):
             return PokemonBasicSerializer
         return PokemonSerializer
     
+    def _page_response(self, params, message, **extra):
+        """
+        Pagina por cursor y arma la respuesta estándar (pokemon_page_data)
+        
+        Las filas salen de .values() y se serializan con pokemon_basic_rows
+        (mismo JSON que PokemonBasicSerializer, sin su costo por fila).
+        Con POKEDEX_MEMORY_INDEX activado salen del índice en memoria
+        (memory_index.py) sin consultar la tabla.
+        """
+        fields = params.get('fields') or PokemonBasicSerializer.Meta.fields
+        rows = indexed_rows(params, fields)
+        if rows is None:
+            rows = values_for_fields(build_pokemon_queryset(params), fields)
+        page = self.paginate_queryset(rows)
+        
+        return Response(pokemon_page_data(self.paginator, page, fields, message, **extra))
+    
+    @cache_response
     def list(self, request):
         """
-        TABLA PRINCIPAL: Lista los primeros 50 Pokémon
+        TABLA PRINCIPAL: Lista los Pokémon por páginas (50 por defecto)
         
         Esta es la tabla base que pide el profesor Oak con:
         - ID, Nombre, Tipo(s), Altura, Peso
         - Plus: Nombres invertidos (columna adicional)
+        
+        La primera página son los primeros 50; las siguientes se piden con
+        el enlace 'next' de la respuesta.
+        """
+        return self._page_response({}, message='{count} Pokémon - Tabla Principal')
+    
+
+    # CONSULTA GENÉRICA
+
+    
+    # Los filtros del profesor Oak son consultas predefinidas sobre sus
+    # marcas precalculadas (una búsqueda por índice cada una)
+    WEIGHT_FILTER_PRESET = {'matches': ['weight_filter']}
+    GRASS_TYPE_PRESET = {'matches': ['grass_type']}
+    FLYING_TALL_PRESET = {'matches': ['flying_tall']}
+    
+    # Acción -> (consulta, filter_applied, message); también las usa async_views.py
+    PRESET_RESPONSES = {
+        'weight_filter': (WEIGHT_FILTER_PRESET, 'Peso más de 30 y menos de 80',
+                          'Encontrados {count} Pokémon con peso entre 30-80'),
+        'grass_type': (GRASS_TYPE_PRESET, 'Tipo: Grass',
+                       'Encontrados {count} Pokémon tipo Grass'),
+        'flying_tall': (FLYING_TALL_PRESET, 'Tipo Flying y altura > 10',
+                        'Encontrados {count} Pokémon tipo Flying altos'),
+    }
+    
+    def _query_response(self, params, filter_applied, message):
+        """
+        Ejecuta una consulta (una sola SQL por página) y arma la respuesta estándar
+        message puede usar {count}
         """
-        queryset = self.queryset.order_by('pokemon_id')[:50]
-        serializer = self.get_serializer(queryset, many=True)
+        return self._page_response(params, message=message, filter_applied=filter_applied)
+    
+    def _preset_response(self, name):
+        params, filter_applied, message = self.PRESET_RESPONSES[name]
+        return self._query_response(params, filter_applied=filter_applied, message=message)
+    
+    @action(detail=False, methods=['get'], url_path='query')
+    @cache_response
+    def query(self, request):
+        """
+        Consulta combinable sobre los Pokémon
         
-        return Response({
-            'count': queryset.count(),
-            'results': serializer.data,
-            'message': 'Primeros 50 Pokémon - Tabla Principal'
-        })
+        Parámetros (todos opcionales):
+        - matches=grass_type        -> filtros predefinidos (weight_filter, grass_type, flying_tall)
+        - types=grass,poison        -> tipos
+        - types_match=any|all       -> alguno / todos los tipos (por defecto any)
+        - height_gt, height_gte, height_lt, height_lte
+        - weight_gt, weight_gte, weight_lt, weight_lte
+        - name_prefix=char          -> nombre que empieza por...
+        - ordering=-weight,name     -> orden (pokemon_id, name, height, weight)
+        - fields=pokemon_id,name    -> solo estos campos en la respuesta
+        - page_size=N, cursor=...   -> paginación (seguir el enlace 'next')
+        
+        GET /pokemon/query/?types=flying&height_gt=10&ordering=-height
+        """
+        query_params = PokemonQuerySerializer(data=request.query_params)
+        query_params.is_valid(raise_exception=True)
+        params = query_params.validated_data
+        
+        return self._query_response(
+            params,
+            filter_applied=describe_query(params),
+            message='Encontrados {count} Pokémon'
+        )
     
 
     # FILTROS REQUERIDOS POR EL PROFESOR OAK
 
     
     @action(detail=False, methods=['get'], url_path='weight-filter')
+    @cache_response
     def weight_filter(self, request):
         """
          REQUISITO 1: Pokémon que pesen más de 30 y menos de 80
         
         Usando valores directos de la PokéAPI (sin conversiones)
-        Condición: 30 < peso < 80
+        Condición: 30 < peso < 80 (columna weight_filter_match)
+        Equivale a /pokemon/query/?weight_gt=30&weight_lt=80
         """
-        queryset = self.queryset.filter(
-            weight__gt=30,   # > 30 (mayor que)
-            weight__lt=80    # < 80 (menor que)
-        ).order_by('pokemon_id')
+        return self._preset_response('weight_filter')
+    
+    @action(detail=False, methods=['get'], url_path='grass-type')
+    @cache_response
+    def grass_type(self, request):
+        """
+         REQUISITO 2: Pokémon tipo "grass"
+        
+        Equivale a Pokemon.is_grass_type() (columna grass_type_match)
+        y a /pokemon/query/?types=grass
+        """
+        return self._preset_response('grass_type')
+    
+    @action(detail=False, methods=['get'], url_path='flying-tall')
+    @cache_response
+    def flying_tall(self, request):
+        """
+         REQUISITO 3: Pokémon tipo "flying" que midan más de 10
         
-        serializer = PokemonBasicSerializer(queryset, many=True)
+        Equivale a Pokemon.is_flying_and_tall() (columna flying_tall_match)
+        y a /pokemon/query/?types=flying&height_gt=10
+        """
+        return self._preset_response('flying_tall')
+    
+
+    # ESTADÍSTICAS
+
+    
+    @action(detail=False, methods=['get'], url_path='stats')
+    def stats(self, request):
+        """
+        Estadísticas generales de la Pokédex
+        Incluye las métricas de la caché HTTP de la PokéAPI (aciertos, bytes ahorrados)
+        y de la caché de respuestas de esta API
+        """
+        http_cache = get_http_cache(get_pokeapi_settings())
+        
+        # Ambos totales en una sola consulta (LEFT JOIN con favoritos)
+        totals = Pokemon.objects.aggregate(
+            total_pokemon=Count('pk'),
+            total_favorites=Count('is_favorite')
+        )
         
         return Response({
-            'count': queryset.count(),
-            'results': serializer.data,
-            'filter_applied': 'Peso más de 30 y menos de 80',
-            'message': f'Encontrados {queryset.count()} Pokémon con peso entre 30-80'
+            **totals,
+            'http_cache': http_cache.stats() if http_cache else {'enabled': False},
+            'response_cache': response_cache_stats.as_dict(),
         })
     
-    @action(detail=False, methods=['get'], url_path='grass-type')
-    def grass_type(self, request):
+
+    # EXPORTACIÓN
+
+    
+    @action(detail=False, methods=['get'], url_path='export')
+    def export(self, request):
         """
-         REQUISITO 2: Pokémon tipo "grass"
+        Exporta todos los Pokémon (o los que cumplan los filtros) sin paginar
+        
+        Parámetros: los mismos filtros que /pokemon/query/ (matches, types,
+        rangos, name_prefix, ordering, fields) más output=ndjson|csv.
+        Las filas se leen por bloques y se envían a medida que llegan
+        (memoria constante); gzip si el cliente envía Accept-Encoding: gzip.
         
-        Usa el método del modelo para filtrar por tipo grass
+        GET /pokemon/export/?output=csv&types=grass
         """
-        # Obtener todos los Pokémon y filtrar usando el método del modelo
-        all_pokemon = self.queryset.all()
-        grass_pokemon = [p for p in all_pokemon if p.is_grass_type()]
+        export_params = PokemonExportSerializer(data=request.query_params)
+        export_params.is_valid(raise_exception=True)
+        params = export_params.validated_data
         
-        serializer = PokemonBasicSerializer(grass_pokemon, many=True)
+        fields = params.get('fields') or PokemonBasicSerializer.Meta.fields
+        rows = values_for_fields(build_pokemon_queryset(params), fields).iterator(chunk_size=EXPORT_CHUNK_SIZE)
         
+        return streaming_export(
+            request,
+            map(pokemon_basic_row_builder(fields), rows),
+            output=params['output'],
+            filename='pokedex'
+        )
+    
+
+    # BÚSQUEDA
+
+    
+    @action(detail=False, methods=['get'], url_path='search')
+    @cache_response
+    def search(self, request):
+        """
+        Búsqueda por nombre en name y reversed_name, ordenada por relevancia
+        
+        ?q=pika -> pikachu (prefijo), ?q=chu -> pikachu, raichu (subcadena),
+        ?q=pikchu -> pikachu (con errores). Cada resultado indica el tipo
+        de acierto (match), en qué campo (matched_on) y con cuántos errores
+        (distance). Los candidatos salen del índice de search.py; la tabla
+        solo se consulta una vez, para las filas de los resultados.
+        """
+        search_params = PokemonSearchSerializer(data=request.query_params)
+        search_params.is_valid(raise_exception=True)
+        params = search_params.validated_data
+        fields = params.get('fields') or PokemonBasicSerializer.Meta.fields
+        
+        hits = get_search_index().search(params['q'], limit=params['limit'], fuzzy=params['fuzzy'])
+        rows = {
+            row['pokemon_id']: row
+            for row in Pokemon.objects.filter(pokemon_id__in=[hit.pokemon_id for hit in hits])
+            .values(*columns_for_fields(fields))
+        }
+        
+        # Un Pokémon borrado desde la última reconstrucción no tiene fila
+        build_row = pokemon_basic_row_builder(fields)
+        results = FastRows(
+            {**build_row(rows[hit.pokemon_id]), 'match': hit.match,
+             'matched_on': hit.matched_on, 'distance': hit.distance}
+            for hit in hits if hit.pokemon_id in rows
+        )
         return Response({
-            'count': len(grass_pokemon),
-            'results': serializer.data,
-            'filter_applied': 'Tipo: Grass',
-            'message': f'Encontrados {len(grass_pokemon)} Pokémon tipo Grass'
+            'query': params['q'],
+            'count': len(results),
+            'results': results,
+            'message': f"{len(results)} resultados para '{params['q']}'"
         })
     
-    @action(detail=False, methods=['get'], url_path='flying-tall')
-    def flying_tall(self, request):
+
+    # FEED DE CAMBIOS
+
+    
+    @action(detail=False, methods=['get'], url_path='changes')
+    @cache_response
+    def changes(self, request):
         """
-         REQUISITO 3: Pokémon tipo "flying" que midan más de 10
+        Pokémon que cambiaron después de una versión (sincronización incremental)
+        
+        Cada escritura (carga, edición, copia de sprites) le da a las filas que
+        cambia un número de cambio nuevo (change_version). El cliente guarda
+        'version' y la próxima vez pide ?since=<version>:
+        1. GET /pokemon/changes/?since=0      -> todo (primera sincronización)
+        2. Seguir 'next' hasta que sea null (orden: versión, pokemon_id)
+        3. Guardar 'version' de la respuesta para la próxima vez
         
-        Usa el método del modelo para filtrar por tipo flying alto
+        'version' es la última confirmada al empezar el recorrido: lo que cambie
+        mientras tanto llega en la sincronización siguiente.
         """
-        # Obtener todos los Pokémon y filtrar usando el método del modelo
-        all_pokemon = self.queryset.all()
-        flying_tall_pokemon = [p for p in all_pokemon if p.is_flying_and_tall()]
+        changes_params = PokemonChangesSerializer(data=request.query_params)
+        changes_params.is_valid(raise_exception=True)
+        params = changes_params.validated_data
+        since = params['since']
+        
+        # La versión se lee antes que las filas: todo lo que tenga un número
+        # menor o igual ya está confirmado
+        version = params['until'] if 'until' in params else current_change_version()
+        
+        newer = Q(change_version__gt=since)
+        if 'after' in params:
+            newer |= Q(change_version=since, pokemon_id__gt=params['after'])
+        
+        rows = list(
+            Pokemon.objects.filter(newer, change_version__lte=version)
+            .order_by('change_version', 'pokemon_id')
+            .values('change_version', *columns_for_fields(PokemonBasicSerializer.Meta.fields))
+            [:params['page_size'] + 1]
+        )
         
-        serializer = PokemonBasicSerializer(flying_tall_pokemon, many=True)
+        next_link = None
+        if len(rows) > params['page_size']:
+            rows = rows[:params['page_size']]
+            last = rows[-1]
+            next_link = request.build_absolute_uri()
+            for param, value in [('since', last['change_version']), ('after', last['pokemon_id']),
+                                 ('until', version)]:
+                next_link = replace_query_param(next_link, param, value)
         
+        build_row = pokemon_basic_row_builder()
         return Response({
-            'count': len(flying_tall_pokemon),
-            'results': serializer.data,
-            'filter_applied': 'Tipo Flying y altura > 10',
-            'message': f'Encontrados {len(flying_tall_pokemon)} Pokémon tipo Flying altos'
+            'since': since,
+            'version': version,
+            'count': len(rows),
+            'next': next_link,
+            'results': FastRows({**build_row(row), 'change_version': row['change_version']} for row in rows),
         })
     
 
@@ -130,119 +428,97 @@ class PokemonViewSet(viewsets.ModelViewSet):
     @action(detail=False, methods=['post'], url_path='load-pokemon-data')
     def load_pokemon_data(self, request):
         """
-         Carga los primeros 50 Pokémon desde la PokéAPI
+         Encola una carga de Pokémon desde la PokéAPI (por defecto los primeros 50)
+        
+        La carga se ejecuta en segundo plano:
+        1. Responde de inmediato (202) con el ID del trabajo
+        2. Un hilo consulta la PokéAPI en paralelo con reintentos y deadline
+        3. Guarda en la base de datos (upsert por lotes, sin reescribir filas iguales)
+        4. El avance se consulta en GET /pokemon/load-jobs/{id}/
+        
+        Si ya hay una carga igual en marcha, se devuelve ese mismo trabajo.
+        
+        Body opcional (uno solo de los modos):
+        - { "start": 1, "end": 151 }  -> rango de IDs
+        - { "ids": [1, 4, 7] }        -> lista explícita
+        - { "all": true }             -> toda la National Dex
+        - "resume": false             -> ignorar el punto de control anterior
+        """
+        load_request = PokemonLoadRequestSerializer(data=request.data)
+        load_request.is_valid(raise_exception=True)
+        spec = load_request.to_load_spec()
+        
+        job, created = enqueue_load(spec, resume=load_request.validated_data['resume'])
         
-        Este endpoint:
-        1. Consulta la PokéAPI para cada Pokémon (1-50)
-        2. Extrae la información necesaria
-        3. Guarda en nuestra base de datos
-        4. Maneja errores si la API no responde
+        if created:
+            logger.info(f"Carga encolada como trabajo #{job.pk} ({spec.describe()})")
+            message = f'Carga de {spec.describe()} en cola'
+        else:
+            message = f'Ya hay una carga igual en curso (trabajo #{job.pk})'
+        
+        return Response({
+            'message': message,
+            'job_id': job.pk,
+            'coalesced': not created,
+            'status_url': reverse('pokemon-load-job', kwargs={'job_id': job.pk}, request=request),
+            'job': LoadJobSerializer(job).data
+        }, status=status.HTTP_202_ACCEPTED)
+    
+    @action(detail=False, methods=['get'], url_path=r'load-jobs/(?P<job_id>\d+)', url_name='load-job')
+    def load_job(self, request, job_id=None):
+        """
+        Estado de un trabajo de carga: avance, velocidad, ETA y errores por ID
+        GET /pokemon/load-jobs/7/
         """
         try:
-            loaded_count = 0
-            errors = []
-            
-            logger.info("Iniciando carga de datos desde PokéAPI...")
-            
-            for pokemon_id in range(1, 51):  # Primeros 50 Pokémon
-                try:
-                    # Consultar PokéAPI
-                    response = requests.get(
-                        f'https://pokeapi.co/api/v2/pokemon/{pokemon_id}',
-                        timeout=10  # Timeout de 10 segundos
-                    )
-                    
-                    if response.status_code == 200:
-                        data = response.json()
-                        
-                        # Extraer tipos del JSON de la PokéAPI
-                        types = [type_info['type']['name'] for type_info in data['types']]
-                        
-                        # Crear o actualizar Pokémon en nuestra DB
-                        pokemon, created = Pokemon.objects.get_or_create(
-                            pokemon_id=data['id'],
-                            defaults={
-                                'name': data['name'],
-                                'types': types,
-                                'height': data['height'],
-                                'weight': data['weight'],
-                                'sprite_url': data['sprites']['front_default']
-                            }
-                        )
-                        
-                        # Si ya existía, actualizar datos
-                        if not created:
-                            pokemon.name = data['name']
-                            pokemon.types = types
-                            pokemon.height = data['height']
-                            pokemon.weight = data['weight']
-                            pokemon.sprite_url = data['sprites']['front_default']
-                            pokemon.save()
-                        
-                        loaded_count += 1
-                        logger.info(f"Pokémon #{pokemon_id} - {data['name']} cargado correctamente")
-                        
-                    else:
-                        error_msg = f"Error HTTP {response.status_code} para Pokémon #{pokemon_id}"
-                        errors.append(error_msg)
-                        logger.warning(error_msg)
-                        
-                except requests.RequestException as e:
-                    error_msg = f"Error de conexión para Pokémon #{pokemon_id}: {str(e)}"
-                    errors.append(error_msg)
-                    logger.error(error_msg)
-                
-                except Exception as e:
-                    error_msg = f"Error inesperado para Pokémon #{pokemon_id}: {str(e)}"
-                    errors.append(error_msg)
-                    logger.error(error_msg)
-            
-            # Preparar respuesta
-            response_data = {
-                'message': f'Carga completada: {loaded_count}/50 Pokémon cargados',
-                'total_loaded': loaded_count,
-                'errors': errors[:5] if errors else []  # Solo primeros 5 errores
-            }
-            
-            logger.info(f"Carga finalizada: {loaded_count} Pokémon cargados")
-            
-            return Response(response_data, status=status.HTTP_200_OK)
-            
-        except Exception as e:
-            logger.error(f"Error crítico en carga de datos: {str(e)}")
+            job = LoadJob.objects.get(pk=job_id)
+        except LoadJob.DoesNotExist:
             return Response({
-                'message': f'Error crítico: {str(e)}',
-                'total_loaded': 0,
-                'errors': [str(e)]
-            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+                'error': f'Trabajo de carga #{job_id} no encontrado'
+            }, status=status.HTTP_404_NOT_FOUND)
+        
+        return Response(LoadJobSerializer(job).data)
 
-class PokemonFavoriteViewSet(viewsets.ModelViewSet):
+class PokemonFavoriteViewSet(CacheControlMixin, viewsets.ModelViewSet):
     """
     ViewSet para gestionar favoritos simples (sin usuarios)
     Sistema personal - cualquiera puede agregar/quitar favoritos
     
     Endpoints disponibles:
-    - GET /favorites/ : Lista todos los favoritos
+    - GET /favorites/ : Lista los favoritos por páginas (cursor)
     - POST /favorites/ : Agregar Pokémon a favoritos
     - DELETE /favorites/{id}/ : Remover de favoritos
     - POST /favorites/toggle/ : Toggle favorito (agregar/quitar)
+    - POST /favorites/batch/ : Agregar y quitar muchos en una transacción
+    - GET /favorites/status/?ids=1,4,7 : ¿Son favoritos? (muchos a la vez)
+    - GET /favorites/export/ : Exportación completa en streaming (NDJSON / CSV)
     """
     
     queryset = PokemonFavorite.objects.all()
     serializer_class = PokemonFavoriteSerializer
+    pagination_class = FavoriteCursorPagination
+    cache_control = {'export': {'no_store': True}}
+    
+    # Columnas del Pokémon que usa el serializer anidado (PokemonBasicSerializer)
+    POKEMON_COLUMNS = [
+        f'pokemon__{column}'
+        for column in sorted(columns_for_fields(PokemonBasicSerializer.Meta.fields))
+    ]
+    
+    def get_queryset(self):
+        """
+        Favoritos con su Pokémon en la misma consulta (JOIN), solo con las
+        columnas que se serializan: sin una consulta extra por favorito
+        """
+        return self.queryset.select_related('pokemon').only('id', 'created_at', *self.POKEMON_COLUMNS)
     
+    @cache_response
     def list(self, request):
         """
-        Lista todos los Pokémon favoritos
+        Lista los Pokémon favoritos por páginas (más recientes primero)
         """
-        queryset = self.queryset.order_by('-created_at')
-        serializer = self.get_serializer(queryset, many=True)
-        
-        return Response({
-            'count': queryset.count(),
-            'results': serializer.data,
-            'message': f'{queryset.count()} Pokémon favoritos'
-        })
+        page = self.paginate_queryset(favorite_queryset())
+        return Response(favorite_page_data(self.paginator, page))
     
     def create(self, request):
         """
@@ -269,26 +545,29 @@ class PokemonFavoriteViewSet(viewsets.ModelViewSet):
     def destroy(self, request, pk=None):
         """
         Remover un Pokémon de favoritos
+        
+        El DELETE es condicional: si otra petición lo borró primero, esta
+        responde 404 en lugar de confirmar un borrado que no hizo.
         """
-        try:
-            favorite = self.queryset.get(pk=pk)
-            pokemon_name = favorite.pokemon.name
-            favorite.delete()
-            
-            return Response({
-                'message': f'{pokemon_name} removido de favoritos'
-            }, status=status.HTTP_200_OK)
-            
-        except PokemonFavorite.DoesNotExist:
+        favorite = self.queryset.select_related('pokemon').only('id', 'pokemon__name').filter(pk=pk).first()
+        
+        if favorite is None or not remove_favorite(pk=pk):
             return Response({
                 'error': 'Favorito no encontrado'
             }, status=status.HTTP_404_NOT_FOUND)
+        
+        return Response({
+            'message': f'{favorite.pokemon.name} removido de favoritos'
+        }, status=status.HTTP_200_OK)
     
     @action(detail=False, methods=['post'], url_path='toggle')
     def toggle_favorite(self, request):
         """
         Toggle favorito: agregar si no existe, quitar si existe
         Requiere: { "pokemon_id": 123 }
+        
+        Atómico aunque lleguen varios toggles a la vez (ver favorites.py):
+        cada uno cambia el estado exactamente una vez.
         """
         pokemon_id = request.data.get('pokemon_id')
         
@@ -297,35 +576,122 @@ class PokemonFavoriteViewSet(viewsets.ModelViewSet):
                 'error': 'pokemon_id es requerido'
             }, status=status.HTTP_400_BAD_REQUEST)
         
-        try:
-            pokemon = Pokemon.objects.get(pokemon_id=pokemon_id)
-        except Pokemon.DoesNotExist:
+        # Solo las columnas que se serializan con el favorito
+        pokemon = Pokemon.objects.only(*columns_for_fields(PokemonBasicSerializer.Meta.fields)).filter(
+            pokemon_id=pokemon_id
+        ).first()
+        if pokemon is None:
             return Response({
                 'error': f'Pokémon con ID {pokemon_id} no encontrado'
             }, status=status.HTTP_404_NOT_FOUND)
         
-        try:
-            # Intentar encontrar favorito existente
-            favorite = PokemonFavorite.objects.get(pokemon=pokemon)
-            # Si existe, removerlo
-            favorite.delete()
-            
+        action_taken, favorite = flip_favorite(pokemon)
+        
+        if action_taken == 'removed':
             return Response({
                 'action': 'removed',
                 'message': f'{pokemon.name} removido de favoritos',
                 'is_favorite': False
             })
+        
+        return Response({
+            'action': 'added',
+            'message': f'{pokemon.name} agregado a favoritos',
+            'is_favorite': True,
+            'favorite': PokemonFavoriteSerializer(favorite).data
+        })
+    
+    @action(detail=False, methods=['post'], url_path='batch')
+    def batch(self, request):
+        """
+        Agregar y quitar varios favoritos en una sola transacción
+        Requiere: { "add": [1, 4, 7], "remove": [25] }
+        
+        Los IDs que ya estaban en el estado pedido se informan en 'unchanged';
+        los de add que no existen, en 'not_found' (no anulan el resto).
+        """
+        serializer = FavoriteBatchSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        add = serializer.validated_data['add']
+        remove = serializer.validated_data['remove']
+        
+        added, removed, unchanged = [], [], []
+        with transaction.atomic():
+            if add:
+                # Pokémon pedidos con su marca de favorito (una consulta)
+                candidates = {
+                    row['pokemon_id']: row
+                    for row in Pokemon.objects.filter(pokemon_id__in=add).annotate(
+                        favorited=Exists(PokemonFavorite.objects.filter(pokemon=OuterRef('pk')))
+                    ).values('pk', 'pokemon_id', 'favorited')
+                }
+                for pokemon_id in add:
+                    if pokemon_id in candidates:
+                        (unchanged if candidates[pokemon_id]['favorited'] else added).append(pokemon_id)
+                
+                PokemonFavorite.objects.bulk_create(
+                    [PokemonFavorite(pokemon_id=candidates[pokemon_id]['pk']) for pokemon_id in added],
+                    ignore_conflicts=True
+                )
             
-        except PokemonFavorite.DoesNotExist:
-            # Si no existe, agregarlo
-            favorite = PokemonFavorite.objects.create(pokemon=pokemon)
+            if remove:
+                favorites = PokemonFavorite.objects.filter(pokemon__pokemon_id__in=remove)
+                removed_ids = set(favorites.values_list('pokemon__pokemon_id', flat=True))
+                favorites.delete()
+                removed = [pokemon_id for pokemon_id in remove if pokemon_id in removed_ids]
+                unchanged += [pokemon_id for pokemon_id in remove if pokemon_id not in removed_ids]
             
-            return Response({
-                'action': 'added',
-                'message': f'{pokemon.name} agregado a favoritos',
-                'is_favorite': True,
-                'favorite': PokemonFavoriteSerializer(favorite).data
-            })
+            # bulk_create / delete en bloque no pasan por save(): invalidar a mano
+            if added or removed:
+                invalidate_on_commit()
+        
+        new_favorites = PokemonFavorite.objects.filter(pokemon__pokemon_id__in=added).order_by(
+            '-created_at'
+        ).values('id', 'created_at', *self.POKEMON_COLUMNS) if added else []
+        
+        return Response({
+            'added': added,
+            'removed': removed,
+            'unchanged': unchanged,
+            'not_found': [pokemon_id for pokemon_id in add if pokemon_id not in added + unchanged],
+            'favorites': favorite_rows(new_favorites),
+            'message': f'{len(added)} agregados y {len(removed)} removidos de favoritos'
+        })
+    
+    @action(detail=False, methods=['get'], url_path='status')
+    @cache_response
+    def favorite_status(self, request):
+        """
+        Estado de favorito de muchos Pokémon en una sola consulta (IN)
+        GET /favorites/status/?ids=1,4,7 -> {"results": {"1": true, "4": false, "7": false}}
+        
+        Los IDs que no existen aparecen como no favoritos.
+        """
+        serializer = FavoriteStatusSerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        ids = serializer.validated_data['ids']
+        
+        return Response(favorite_status_data(ids, set(favorited_ids(ids))))
+    
+    @action(detail=False, methods=['get'], url_path='export')
+    def export(self, request):
+        """
+        Exporta todos los favoritos (más recientes primero) en streaming
+        GET /favorites/export/?output=ndjson|csv
+        """
+        export_params = FavoriteExportSerializer(data=request.query_params)
+        export_params.is_valid(raise_exception=True)
+        
+        rows = self.queryset.order_by('-created_at').values(
+            'id', 'created_at', *self.POKEMON_COLUMNS
+        ).iterator(chunk_size=EXPORT_CHUNK_SIZE)
+        
+        return streaming_export(
+            request,
+            map(favorite_row_builder(), rows),
+            output=export_params.validated_data['output'],
+            filename='favoritos'
+        )
     
     @action(detail=False, methods=['get'], url_path='check/(?P<pokemon_id>[^/.]+)')
     def check_favorite(self, request, pokemon_id=None):
@@ -334,16 +700,51 @@ class PokemonFavoriteViewSet(viewsets.ModelViewSet):
         GET /favorites/check/25/ -> Verifica si Pikachu es favorito
         """
         try:
-            pokemon = Pokemon.objects.get(pokemon_id=pokemon_id)
-            is_favorite = PokemonFavorite.objects.filter(pokemon=pokemon).exists()
+            # Pokémon y marca de favorito en una sola consulta
+            pokemon = Pokemon.objects.only('pokemon_id', 'name').annotate(
+                favorited=Exists(PokemonFavorite.objects.filter(pokemon=OuterRef('pk')))
+            ).get(pokemon_id=pokemon_id)
             
             return Response({
                 'pokemon_id': int(pokemon_id),
                 'pokemon_name': pokemon.name,
-                'is_favorite': is_favorite
+                'is_favorite': pokemon.favorited
             })
             
         except Pokemon.DoesNotExist:
             return Response({
                 'error': f'Pokémon con ID {pokemon_id} no encontrado'
             }, status=status.HTTP_404_NOT_FOUND)
+
+
+# SPRITES LOCALES
+
+
+def _sprite_etag(request, name):
+    # El hash del contenido ya identifica la versión
+    return name.rsplit('/', 1)[-1]
+
+
+@require_GET
+@condition(etag_func=_sprite_etag)
+def sprite_file(request, name):
+    """
+    Sirve un sprite copiado por pokedex/sprites.py
+    GET /sprites/ab/ab12...ef-96.webp
+    
+    El nombre es el hash del contenido: la URL nunca cambia de contenido,
+    así que el navegador la guarda un año sin revalidar (immutable) y
+    también sirve de ETag (un 304 no abre el archivo).
+    En producción el servidor web puede servir el directorio directamente
+    con las mismas cabeceras.
+    """
+    store = get_sprite_store()
+    if store is None or not SPRITE_NAME.match(name) or not store.exists(name):
+        raise Http404('Sprite no encontrado')
+    
+    response = FileResponse(
+        open(store.path(name), 'rb'),
+        content_type=CONTENT_TYPES[name.rsplit('.', 1)[1]]
+    )
+    patch_cache_control(response, public=True, max_age=365 * 24 * 3600, immutable=True)
+    return response
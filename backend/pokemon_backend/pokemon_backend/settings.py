@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -49,6 +50,7 @@ MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
+    'django.middleware.http.ConditionalGetMiddleware',  # ETag + 304 (If-None-Match)
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
@@ -78,12 +80,66 @@ WSGI_APPLICATION = 'pokemon_backend.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+# Se elige con variables de entorno (ver README, "Base de datos"):
+# POKEDEX_DB_ENGINE=sqlite (por defecto) o postgresql
+
+if os.environ.get('POKEDEX_DB_ENGINE', 'sqlite') == 'postgresql':
+    # Requiere psycopg (dependencia opcional, fuera de requirements.txt).
+    # Con POKEDEX_DB_POOL=1 se usa el pool de psycopg 3 (psycopg[pool]);
+    # el pool no admite conexiones persistentes (CONN_MAX_AGE debe ser 0)
+    _DB_POOL = os.environ.get('POKEDEX_DB_POOL') == '1'
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': os.environ.get('POKEDEX_DB_NAME', 'pokedex'),
+            'USER': os.environ.get('POKEDEX_DB_USER', 'pokedex'),
+            'PASSWORD': os.environ.get('POKEDEX_DB_PASSWORD', ''),
+            'HOST': os.environ.get('POKEDEX_DB_HOST', 'localhost'),
+            'PORT': os.environ.get('POKEDEX_DB_PORT', '5432'),
+            # Conexión persistente por hilo (segundos): sin reconectar en cada petición
+            'CONN_MAX_AGE': 0 if _DB_POOL else int(os.environ.get('POKEDEX_DB_CONN_MAX_AGE', 60)),
+            # Comprueba la conexión reutilizada antes de la primera consulta de cada petición
+            'CONN_HEALTH_CHECKS': True,
+            'OPTIONS': {
+                'pool': {
+                    'min_size': 2,
+                    'max_size': int(os.environ.get('POKEDEX_DB_POOL_SIZE', 10)),
+                    'timeout': 10,
+                },
+            } if _DB_POOL else {},
+        }
+    }
+else:
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': os.environ.get('POKEDEX_DB_NAME', BASE_DIR / 'db.sqlite3'),
+            'OPTIONS': {
+                # Espera hasta 5 s a que se libere el bloqueo antes de "database is locked"
+                'timeout': 5,
+                # Las transacciones piden el bloqueo de escritura al empezar: sin
+                # fallos al pasar de lectura a escritura con otra transacción abierta
+                'transaction_mode': 'IMMEDIATE',
+                # Se ejecuta en cada conexión nueva (Django separa por ';'):
+                # - WAL: los lectores no bloquean al escritor ni al revés
+                # - synchronous=NORMAL: seguro con WAL, sin fsync en cada commit
+                # - mmap de 128 MB y 20 MB de caché de páginas por conexión
+                'init_command': (
+                    'PRAGMA journal_mode=WAL;'
+                    'PRAGMA synchronous=NORMAL;'
+                    'PRAGMA busy_timeout=5000;'
+                    'PRAGMA mmap_size=134217728;'
+                    'PRAGMA cache_size=-20000;'
+                    'PRAGMA temp_store=MEMORY'
+                ),
+            },
+            # Las pruebas usan un archivo (no memoria compartida): WAL y los
+            # bloqueos entre conexiones de varios hilos son los reales
+            'TEST': {
+                'NAME': BASE_DIR / 'test_db.sqlite3',
+            },
+        }
     }
-}
 
 
 # Password validation
@@ -140,12 +196,81 @@ CORS_ALLOWED_ORIGINS = [
 # Para desarrollo, permite todos los headers
 CORS_ALLOW_ALL_ORIGINS = False  # En producción debe ser False
 CORS_ALLOW_CREDENTIALS = True
+# Cabeceras de caché visibles para el frontend
+CORS_EXPOSE_HEADERS = ['ETag', 'X-Cache']
 
 # Django REST Framework configuration
 REST_FRAMEWORK = {
-    'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
-    'PAGE_SIZE': 50,  # Máximo 50 elementos por página (perfecto para nuestros 50 Pokémon)
+    # Paginación por cursor (keyset): las páginas profundas cuestan lo mismo que la primera
+    'DEFAULT_PAGINATION_CLASS': 'pokedex.pagination.PokemonCursorPagination',
+    'PAGE_SIZE': 50,  # 50 elementos por página (el cliente puede pedir hasta 200 con ?page_size=)
     'DEFAULT_RENDERER_CLASSES': [
-        'rest_framework.renderers.JSONRenderer',
+        # JSONRenderer que codifica los listados con orjson si está instalado
+        'pokedex.renderers.FastJSONRenderer',
     ],
 }
+
+# Motor de ingesta de la PokéAPI (ver pokedex/ingestion.py)
+POKEAPI = {
+    'BASE_URL': 'https://pokeapi.co/api/v2',
+    'MAX_WORKERS': 8,       # Peticiones concurrentes como máximo
+    'TIMEOUT': 10,          # Timeout por petición (segundos)
+    'MAX_RETRIES': 3,       # Reintentos para 429 / 5xx
+    'BACKOFF_FACTOR': 0.5,  # Backoff exponencial: 0.5s, 1s, 2s...
+    'DEADLINE': 120,        # Tiempo máximo por carga completa (segundos)
+    # Caché HTTP en disco con revalidación ETag / Last-Modified
+    'CACHE_DIR': BASE_DIR / '.pokeapi_cache',
+    'CACHE_TTL': 24 * 3600,              # 1 día sin revalidar
+    'CACHE_MAX_BYTES': 50 * 1024 * 1024,  # 50 MB como máximo (LRU)
+    # Descargas con corrutinas (pokedex/async_ingestion.py, httpx si está
+    # instalado) en lugar de un pool de hilos
+    'ASYNC_CLIENT': os.environ.get('POKEAPI_ASYNC_CLIENT') == '1',
+    # Carga incremental (load_pokemon --incremental): solo se vuelven a pedir
+    # los Pokémon comprobados hace más de esto (segundos)
+    'SYNC_MAX_AGE': 7 * 24 * 3600,
+    # Cargar desde un snapshot (python manage.py export_snapshot) en lugar de
+    # la PokéAPI: CI y máquinas sin red
+    'SNAPSHOT': os.environ.get('POKEAPI_SNAPSHOT') or None,
+}
+
+# Índice columnar en memoria (ver pokedex/memory_index.py): listados y filtros
+# sin consultar la tabla. Uno por proceso, se reconstruye al cambiar los datos
+POKEDEX_MEMORY_INDEX = {
+    'ENABLED': os.environ.get('POKEDEX_MEMORY_INDEX') == '1',
+}
+
+# Copia local de los sprites (ver pokedex/sprites.py): se descargan al cargar
+# desde la PokéAPI y se sirven en /sprites/ con Cache-Control immutable
+POKEDEX_SPRITES = {
+    'ENABLED': os.environ.get('POKEDEX_MIRROR_SPRITES', '1') == '1',
+    'DIR': BASE_DIR / 'sprites',
+    'URL': '/sprites/',
+    'SIZE': 96,           # Variante WebP de 96 px (requiere Pillow)
+    'WEBP_QUALITY': 80,
+}
+
+# Caché de Django (respuestas de la API, ver pokedex/cache.py)
+# Por defecto en memoria del proceso; con POKEDEX_CACHE_DIR se usan archivos,
+# compartidos entre procesos (varios workers, comando load_pokemon)
+if os.environ.get('POKEDEX_CACHE_DIR'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': os.environ['POKEDEX_CACHE_DIR'],
+            'OPTIONS': {'MAX_ENTRIES': 5000},
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'pokedex',
+            'OPTIONS': {'MAX_ENTRIES': 5000},
+        }
+    }
+
+POKEDEX_RESPONSE_CACHE = {
+    'ENABLED': True,
+    'TIMEOUT': 3600,     # La versión de los datos invalida antes si algo cambia
+    'LOCK_TIMEOUT': 10,  # Protección anti-estampida
+}
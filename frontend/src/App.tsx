@@ -1,3 +1,4 @@
+import { useState } from 'react';
 
 import { usePokemon } from './hooks/usePokemon';
 import { useFavorites } from './hooks/useFavorites';
@@ -15,10 +16,14 @@ function App() {
     error,
     loadPokemonData,
     fetchPokemon,
+    searchPokemon,
+    loadMore,
+    hasMore,
     resetError
   } = usePokemon();
 
   const { favorites, favoritesCount } = useFavorites();
+  const [searchQuery, setSearchQuery] = useState('');
 
   // Pantalla de carga inicial
   if (loading.isInitialLoad) {
@@ -187,6 +192,38 @@ function App() {
                     Ver Mis Favoritos
                   </button>
                 </div>
+
+                {/* Consulta 6: Búsqueda por nombre */}
+                <div className="analysis-card">
+                  <div className="analysis-header">
+                    <h3 className="analysis-title">Buscar por Nombre</h3>
+                    <p className="analysis-description">
+                      Por prefijo, parte del nombre o nombre invertido; tolera errores de escritura
+                    </p>
+                  </div>
+                  <form
+                    onSubmit={(event) => {
+                      event.preventDefault();
+                      searchPokemon(searchQuery);
+                    }}
+                  >
+                    <input
+                      type="search"
+                      value={searchQuery}
+                      onChange={(event) => setSearchQuery(event.target.value)}
+                      placeholder="pikachu, pika, pikchu..."
+                      maxLength={50}
+                      style={{width: '100%', padding: '0.5rem', marginBottom: '0.75rem', boxSizing: 'border-box'}}
+                    />
+                    <button
+                      type="submit"
+                      disabled={loading.isLoading || !searchQuery.trim()}
+                      className={`analysis-button ${currentFilter === 'search' ? 'active' : ''}`}
+                    >
+                      Buscar
+                    </button>
+                  </form>
+                </div>
               </div>
             </div>
           )}
@@ -228,6 +265,18 @@ function App() {
                 loading={loading.isLoading}
                 message={loading.message}
               />
+
+              {hasMore && (
+                <div style={{textAlign: 'center', marginTop: '2rem'}}>
+                  <button
+                    onClick={loadMore}
+                    disabled={loading.isLoading}
+                    className="analysis-button"
+                  >
+                    Cargar más Pokémon
+                  </button>
+                </div>
+              )}
             </div>
           )}
 
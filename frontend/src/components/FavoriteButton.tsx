@@ -3,7 +3,7 @@
 // 
 
 import React, { useState } from 'react';
-import { useFavorites } from '../hooks/useFavorites';
+import { useFavoriteStatus } from '../hooks/useFavorites';
 import './FavoriteButton.css';
 
 interface FavoriteButtonProps {
@@ -21,12 +21,11 @@ export const FavoriteButton: React.FC<FavoriteButtonProps> = ({
   showText = false,
   size = 'medium'
 }) => {
-  const { toggleFavorite, isFavorite } = useFavorites();
+  // Estado de esta tarjeta (agrupado con el resto en una sola petición)
+  const { toggleFavorite, isFavorite: isCurrentlyFavorite } = useFavoriteStatus(pokemonId);
   const [isLoading, setIsLoading] = useState(false);
   const [message, setMessage] = useState<string>('');
 
-  const isCurrentlyFavorite = isFavorite(pokemonId);
-
   const handleToggle = async () => {
     if (isLoading) return;
 
@@ -34,7 +33,7 @@ export const FavoriteButton: React.FC<FavoriteButtonProps> = ({
     setMessage('');
 
     try {
-      const response = await toggleFavorite(pokemonId);
+      const response = await toggleFavorite();
       
       // Mostrar mensaje temporal
       setMessage(response.message);
@@ -1,6 +1,7 @@
 
-import React from 'react';
+import React, { useState } from 'react';
 import { FavoriteButton } from './FavoriteButton';
+import { spriteSrc } from '../services/pokemonAPI';
 import type { Pokemon } from '../types/pokemon';
 import { TYPE_TRANSLATIONS } from '../types/pokemon';
 
@@ -12,6 +13,8 @@ interface PokemonCardProps {
 const PokemonCard: React.FC<PokemonCardProps> = ({ pokemon, index }) => {
   const formatId = (id: number) => `#${id.toString().padStart(3, '0')}`;
   const animationDelay = `${index * 0.1}s`;
+  // Si la copia local falla (backend sin el archivo), usar la imagen original
+  const [useOriginalSprite, setUseOriginalSprite] = useState(false);
 
   // Validación de datos
   if (!pokemon) {
@@ -24,6 +27,8 @@ const PokemonCard: React.FC<PokemonCardProps> = ({ pokemon, index }) => {
     );
   }
 
+  const imageSrc = useOriginalSprite ? pokemon.sprite_url : spriteSrc(pokemon);
+
   return (
     <div 
       className="pokemon-card fade-in"
@@ -31,12 +36,13 @@ const PokemonCard: React.FC<PokemonCardProps> = ({ pokemon, index }) => {
     >
       {/* Pokemon Header */}
       <div className="pokemon-header">
-        {pokemon.sprite_url ? (
+        {imageSrc ? (
           <img
-            src={pokemon.sprite_url}
+            src={imageSrc}
             alt={pokemon.name}
             className="pokemon-image"
             loading="lazy"
+            onError={() => setUseOriginalSprite(true)}
           />
         ) : (
           <div className="pokemon-image" style={{
@@ -6,9 +6,16 @@ import { useState, useEffect, useCallback } from 'react';
 import {
   getFavorites,
   toggleFavorite,
-  checkIsFavorite
+  checkIsFavorite,
+  checkIsFavoriteBatched,
+  getFavoritesStatus,
+  updateFavoritesBatch
+} from '../services/favoritesApi';
+import type {
+  PokemonFavorite,
+  FavoriteToggleResponse,
+  FavoriteBatchResponse
 } from '../services/favoritesApi';
-import type { PokemonFavorite, FavoriteToggleResponse } from '../services/favoritesApi';
 
 export const useFavorites = () => {
   const [favorites, setFavorites] = useState<PokemonFavorite[]>([]);
@@ -52,6 +59,29 @@ export const useFavorites = () => {
     }
   }, []);
 
+  // Agregar / quitar varios favoritos en una sola petición
+  const updateFavorites = useCallback(async (
+    add: number[] = [],
+    remove: number[] = []
+  ): Promise<FavoriteBatchResponse> => {
+    try {
+      setError(null);
+      const response = await updateFavoritesBatch(add, remove);
+      const removed = new Set(response.removed);
+      
+      setFavorites(prev => [
+        ...response.favorites,
+        ...prev.filter(fav => !removed.has(fav.pokemon.pokemon_id))
+      ]);
+      
+      return response;
+    } catch (err) {
+      const errorMessage = err instanceof Error ? err.message : 'Error modificando favoritos';
+      setError(errorMessage);
+      throw err;
+    }
+  }, []);
+
   // Verificar si un Pokémon es favorito
   const isFavorite = useCallback((pokemonId: number): boolean => {
     return favorites.some(fav => fav.pokemon.pokemon_id === pokemonId);
@@ -67,6 +97,18 @@ export const useFavorites = () => {
     }
   }, []);
 
+  // Verificar muchos favoritos desde servidor (una sola petición)
+  const checkFavoritesFromServer = useCallback(async (
+    pokemonIds: number[]
+  ): Promise<Record<number, boolean>> => {
+    try {
+      return await getFavoritesStatus(pokemonIds);
+    } catch (err) {
+      console.error('Error verificando favoritos desde servidor:', err);
+      return {};
+    }
+  }, []);
+
   // Cargar favoritos al montar el componente
   useEffect(() => {
     loadFavorites();
@@ -78,8 +120,37 @@ export const useFavorites = () => {
     error,
     loadFavorites,
     toggleFavorite: handleToggleFavorite,
+    updateFavorites,
     isFavorite,
     checkFavoriteFromServer,
+    checkFavoritesFromServer,
     favoritesCount: favorites.length
   };
-};
\ No newline at end of file
+};
+
+
+// Estado de favorito de un solo Pokémon (para cada tarjeta)
+//
+// No descarga la lista completa de favoritos: las tarjetas que se montan a
+// la vez comparten una sola petición a /favorites/status/
+export const useFavoriteStatus = (pokemonId: number) => {
+  const [isFavorite, setIsFavorite] = useState(false);
+
+  useEffect(() => {
+    let active = true;
+    checkIsFavoriteBatched(pokemonId).then(favorite => {
+      if (active) setIsFavorite(favorite);
+    });
+    return () => {
+      active = false;
+    };
+  }, [pokemonId]);
+
+  const toggle = useCallback(async (): Promise<FavoriteToggleResponse> => {
+    const response = await toggleFavorite(pokemonId);
+    setIsFavorite(response.is_favorite);
+    return response;
+  }, [pokemonId]);
+
+  return { isFavorite, toggleFavorite: toggle };
+};
@@ -18,6 +18,8 @@ export const usePokemon = () => {
   const [currentFilter, setCurrentFilter] = useState<string>('all');
   const [dataLoaded, setDataLoaded] = useState<boolean>(false);
   const [error, setError] = useState<string | null>(null);
+  // Paginación por cursor: URL de la página siguiente del filtro actual
+  const [nextPage, setNextPage] = useState<string | null>(null);
 
   
   // FUNCIONES DE FILTRADO
@@ -58,7 +60,8 @@ export const usePokemon = () => {
               updated_at: fav.created_at
             })),
             message: `${favorites.length} Pokémon favoritos encontrados`,
-            count: favorites.length
+            count: favorites.length,
+            next: null
           };
           break;
         }
@@ -67,6 +70,7 @@ export const usePokemon = () => {
       }
 
       setPokemon(response.results);
+      setNextPage(response.next ?? null);
       setCurrentFilter(filter);
       
       setLoading(prev => ({
@@ -86,6 +90,60 @@ export const usePokemon = () => {
   }, []);
 
 
+  /**
+   * Busca por nombre; los resultados llegan ya ordenados por relevancia
+   * (una sola página, sin 'next')
+   */
+  const searchPokemon = useCallback(async (query: string) => {
+    if (!query.trim()) return;
+
+    setLoading(prev => ({ ...prev, isLoading: true, message: ' Buscando...' }));
+    setError(null);
+
+    try {
+      const response = await pokemonAPI.searchPokemon(query);
+      setPokemon(response.results.map(result => ({
+        ...result,
+        id: result.pokemon_id,
+        created_at: '',
+        updated_at: ''
+      })));
+      setNextPage(null);
+      setCurrentFilter('search');
+      setLoading(prev => ({ ...prev, isLoading: false, message: response.message }));
+    } catch (err) {
+      const errorMessage = err instanceof Error ? err.message : 'Error desconocido';
+      setError(`Error en la búsqueda: ${errorMessage}`);
+      setLoading(prev => ({ ...prev, isLoading: false, message: '' }));
+    }
+  }, []);
+
+
+  /**
+   * Agrega la página siguiente del filtro actual a la lista
+   *
+   * fetchPokemon(filtro) trae la primera página; mientras hasMore sea
+   * true, cada loadMore() trae la siguiente (una petición por página).
+   */
+  const loadMore = useCallback(async () => {
+    if (!nextPage) return;
+
+    setLoading(prev => ({ ...prev, isLoading: true, message: ' Cargando más Pokémon...' }));
+    setError(null);
+
+    try {
+      const response = await pokemonAPI.getPage(nextPage);
+      setPokemon(prev => [...prev, ...response.results]);
+      setNextPage(response.next ?? null);
+      setLoading(prev => ({ ...prev, isLoading: false, message: response.message }));
+    } catch (err) {
+      const errorMessage = err instanceof Error ? err.message : 'Error desconocido';
+      setError(`Error cargando más resultados: ${errorMessage}`);
+      setLoading(prev => ({ ...prev, isLoading: false, message: '' }));
+    }
+  }, [nextPage]);
+
+
   // FUNCIONES DE CARGA DE DATOS
 
 
@@ -98,7 +156,12 @@ export const usePokemon = () => {
     setError(null);
 
     try {
-      const response = await pokemonAPI.loadPokemonData();
+      const response = await pokemonAPI.loadPokemonData(job => {
+        setLoading(prev => ({
+          ...prev,
+          message: ` Cargando datos desde PokéAPI... ${job.processed}/${job.total} (${job.progress}%)`
+        }));
+      });
       setDataLoaded(true);
       
       // Después de cargar, obtener la lista principal
@@ -140,6 +203,7 @@ export const usePokemon = () => {
     totalCount: pokemon.length,
     hasData: pokemon.length > 0,
     isFiltered: currentFilter !== 'all',
+    hasMore: nextPage !== null,
     currentFilter: getCurrentFilterInfo(),
   };
 
@@ -151,10 +215,13 @@ export const usePokemon = () => {
     dataLoaded,
     error,
     stats,
+    hasMore: nextPage !== null,
     
     // Acciones
     loadPokemonData,
     fetchPokemon,
+    searchPokemon,
+    loadMore,
     resetError,
   };
 };
\ No newline at end of file
@@ -4,6 +4,10 @@
 
 const API_BASE_URL = 'http://localhost:8000/api';
 
+// Las lecturas revalidan la copia del navegador con If-None-Match (ETag):
+// si no hubo cambios, el backend responde 304 sin cuerpo
+const REVALIDATE: RequestInit = { cache: 'no-cache' };
+
 // Tipos para TypeScript
 export interface Pokemon {
   pokemon_id: number;
@@ -12,6 +16,7 @@ export interface Pokemon {
   height: number;
   weight: number;
   sprite_url: string;
+  sprite_local_url: string | null;
   reversed_name: string;
   types_display: string;
 }
@@ -29,6 +34,20 @@ export interface FavoriteToggleResponse {
   favorite?: PokemonFavorite;
 }
 
+export interface FavoriteBatchResponse {
+  added: number[];
+  removed: number[];
+  unchanged: number[];
+  not_found: number[];
+  favorites: PokemonFavorite[];
+  message: string;
+}
+
+export interface FavoriteStatusResponse {
+  results: Record<string, boolean>;
+  count: number;
+}
+
 export interface FavoriteCheckResponse {
   pokemon_id: number;
   pokemon_name: string;
@@ -41,17 +60,26 @@ export interface FavoriteCheckResponse {
 
 /**
  * Obtener todos los favoritos
+ * El listado viene paginado por cursor: se siguen los enlaces 'next'
  */
 export const getFavorites = async (): Promise<PokemonFavorite[]> => {
   try {
-    const response = await fetch(`${API_BASE_URL}/favorites/`);
+    const favorites: PokemonFavorite[] = [];
+    let url: string | null = `${API_BASE_URL}/favorites/?page_size=200`;
     
-    if (!response.ok) {
-      throw new Error(`Error ${response.status}: ${response.statusText}`);
+    while (url) {
+      const response = await fetch(url, REVALIDATE);
+      
+      if (!response.ok) {
+        throw new Error(`Error ${response.status}: ${response.statusText}`);
+      }
+      
+      const data = await response.json();
+      favorites.push(...(data.results || []));
+      url = data.next || null;
     }
     
-    const data = await response.json();
-    return data.results || [];
+    return favorites;
   } catch (error) {
     console.error('Error obteniendo favoritos:', error);
     throw error;
@@ -88,7 +116,7 @@ export const toggleFavorite = async (pokemonId: number): Promise<FavoriteToggleR
  */
 export const checkIsFavorite = async (pokemonId: number): Promise<boolean> => {
   try {
-    const response = await fetch(`${API_BASE_URL}/favorites/check/${pokemonId}/`);
+    const response = await fetch(`${API_BASE_URL}/favorites/check/${pokemonId}/`, REVALIDATE);
     
     if (!response.ok) {
       return false; // Si hay error, asumir que no es favorito
@@ -102,6 +130,96 @@ export const checkIsFavorite = async (pokemonId: number): Promise<boolean> => {
   }
 };
 
+/**
+ * Agregar y quitar varios favoritos en una sola petición (una transacción)
+ */
+export const updateFavoritesBatch = async (
+  add: number[] = [],
+  remove: number[] = []
+): Promise<FavoriteBatchResponse> => {
+  try {
+    const response = await fetch(`${API_BASE_URL}/favorites/batch/`, {
+      method: 'POST',
+      headers: {
+        'Content-Type': 'application/json',
+      },
+      body: JSON.stringify({ add, remove }),
+    });
+    
+    if (!response.ok) {
+      const errorData = await response.json();
+      throw new Error(errorData.error || errorData.non_field_errors?.[0] || `Error ${response.status}`);
+    }
+    
+    return await response.json();
+  } catch (error) {
+    console.error('Error actualizando favoritos en lote:', error);
+    throw error;
+  }
+};
+
+/**
+ * Estado de favorito de muchos Pokémon en una sola petición
+ */
+export const getFavoritesStatus = async (pokemonIds: number[]): Promise<Record<number, boolean>> => {
+  const status: Record<number, boolean> = {};
+  if (pokemonIds.length === 0) {
+    return status;
+  }
+  
+  const response = await fetch(
+    `${API_BASE_URL}/favorites/status/?ids=${pokemonIds.join(',')}`,
+    REVALIDATE
+  );
+  
+  if (!response.ok) {
+    throw new Error(`Error ${response.status}: ${response.statusText}`);
+  }
+  
+  const data: FavoriteStatusResponse = await response.json();
+  pokemonIds.forEach(id => {
+    status[id] = Boolean(data.results[id]);
+  });
+  return status;
+};
+
+// Consultas de estado pendientes: las de todas las tarjetas que se montan
+// en el mismo render se juntan en una sola petición a /favorites/status/
+const MAX_STATUS_BATCH = 1000;
+let pendingStatus: Map<number, ((isFavorite: boolean) => void)[]> | null = null;
+
+const flushPendingStatus = async () => {
+  const pending = pendingStatus!;
+  pendingStatus = null;
+  
+  const ids = [...pending.keys()];
+  for (let start = 0; start < ids.length; start += MAX_STATUS_BATCH) {
+    const chunk = ids.slice(start, start + MAX_STATUS_BATCH);
+    let status: Record<number, boolean> = {};
+    try {
+      status = await getFavoritesStatus(chunk);
+    } catch (error) {
+      console.error('Error verificando favoritos:', error);
+    }
+    chunk.forEach(id => pending.get(id)!.forEach(resolve => resolve(Boolean(status[id]))));
+  }
+};
+
+/**
+ * Verificar si un Pokémon es favorito, agrupando las llamadas simultáneas
+ */
+export const checkIsFavoriteBatched = (pokemonId: number): Promise<boolean> => {
+  return new Promise(resolve => {
+    if (!pendingStatus) {
+      pendingStatus = new Map();
+      setTimeout(flushPendingStatus, 0);
+    }
+    const waiting = pendingStatus.get(pokemonId) ?? [];
+    waiting.push(resolve);
+    pendingStatus.set(pokemonId, waiting);
+  });
+};
+
 /**
  * Agregar a favoritos
  */
@@ -3,14 +3,31 @@
 
 
 import axios from 'axios';
-import type { PokemonResponse, LoadResponse } from '../types/pokemon';
+import type {
+  Pokemon,
+  PokemonResponse,
+  PokemonQueryParams,
+  LoadResponse,
+  LoadJob,
+  LoadJobResponse,
+  PokemonChange,
+  PokemonChangesResponse,
+  PokemonSearchResponse,
+} from '../types/pokemon';
 
 // Configuración base de Axios
 const API_BASE_URL = 'http://localhost:8000/api';
 
+// Cada cuánto se consulta el avance de una carga en segundo plano
+const LOAD_JOB_POLL_INTERVAL = 1000;
+
+// Revalidación: el backend envía ETag y Cache-Control: no-cache, así que la
+// caché HTTP del navegador guarda cada respuesta y la próxima petición va con
+// If-None-Match. Si los datos no cambiaron llega un 304 sin cuerpo y axios
+// recibe la copia guardada (no se vuelve a descargar el JSON).
 const api = axios.create({
   baseURL: API_BASE_URL,
-  timeout: 30000, // 30 segundos para carga de datos
+  timeout: 10000, // 10 segundos (la carga de datos corre en segundo plano)
   headers: {
     'Content-Type': 'application/json',
   },
@@ -29,12 +46,27 @@ api.interceptors.response.use(
 );
 
 
+// Formatos de /export/
+export type ExportOutput = 'ndjson' | 'csv';
+
+// Parámetros de consulta como texto (las listas van separadas por comas)
+const toSearchParams = (params: PokemonQueryParams): Record<string, string> => {
+  const searchParams: Record<string, string> = {};
+  Object.entries(params).forEach(([key, value]) => {
+    if (value !== undefined) {
+      searchParams[key] = Array.isArray(value) ? value.join(',') : String(value);
+    }
+  });
+  return searchParams;
+};
+
+
 // SERVICIOS DE LA POKÉDEX
 
 
 export const pokemonAPI = {
   /**
-   *  Obtener todos los Pokémon (primeros 50)
+   *  Obtener la primera página de Pokémon (50 por defecto)
    */
   getAllPokemon: async (): Promise<PokemonResponse> => {
     const response = await api.get<PokemonResponse>('/pokemon/');
@@ -65,14 +97,125 @@ export const pokemonAPI = {
     return response.data;
   },
 
+  /**
+   *  Consulta combinable: tipos, rangos de altura/peso, prefijo, orden y campos
+   */
+  query: async (params: PokemonQueryParams): Promise<PokemonResponse> => {
+    const response = await api.get<PokemonResponse>('/pokemon/query/', { params: toSearchParams(params) });
+    return response.data;
+  },
+
+  /**
+   *  Búsqueda por nombre (prefijo, subcadena y con errores), ordenada por relevancia
+   */
+  searchPokemon: async (q: string, limit = 20): Promise<PokemonSearchResponse> => {
+    const response = await api.get<PokemonSearchResponse>('/pokemon/search/', { params: { q, limit } });
+    return response.data;
+  },
+
+  /**
+   *  URL de descarga de la exportación completa (sin paginar, en streaming)
+   *
+   *  Mismos filtros que query(); el navegador la descarga directamente
+   *  (<a href={...} download>) y la recibe comprimida con gzip.
+   */
+  exportUrl: (params: PokemonQueryParams = {}, output: ExportOutput = 'ndjson'): string => {
+    const searchParams = new URLSearchParams({ ...toSearchParams(params), output });
+    return `${API_BASE_URL}/pokemon/export/?${searchParams}`;
+  },
+
+  /**
+   *  Página siguiente de cualquier listado (URL 'next' de la respuesta anterior)
+   */
+  getPage: async (url: string): Promise<PokemonResponse> => {
+    const response = await api.get<PokemonResponse>(url);
+    return response.data;
+  },
+
+  /**
+   *  Recorrer un listado completo página a página
+   *
+   *  Cada página se pide al consumir la anterior, así que se puede cortar
+   *  en cualquier momento:
+   *    for await (const page of pokemonAPI.streamPages(API_ENDPOINTS.GRASS_TYPE)) {
+   *      mostrar(page.results);
+   *    }
+   */
+  streamPages: async function* (
+    path: string,
+    params?: Record<string, string | number>
+  ): AsyncGenerator<PokemonResponse> {
+    let page = (await api.get<PokemonResponse>(path, { params })).data;
+    yield page;
+
+    while (page.next) {
+      page = await pokemonAPI.getPage(page.next);
+      yield page;
+    }
+  },
+
   /**
    *  Cargar datos desde la PokéAPI
+   *
+   *  El backend encola la carga y responde de inmediato con un trabajo;
+   *  aquí se consulta su avance hasta que termina.
+   */
+  loadPokemonData: async (onProgress?: (job: LoadJob) => void): Promise<LoadResponse> => {
+    const response = await api.post<LoadJobResponse>('/pokemon/load-pokemon-data/');
+    let job = response.data.job;
+    onProgress?.(job);
+
+    while (job.status === 'queued' || job.status === 'running') {
+      await new Promise(resolve => setTimeout(resolve, LOAD_JOB_POLL_INTERVAL));
+      job = await pokemonAPI.getLoadJob(job.id);
+      onProgress?.(job);
+    }
+
+    if (job.status === 'failed') {
+      throw new Error(job.message);
+    }
+
+    return {
+      message: job.message,
+      total_loaded: job.loaded,
+      requested: job.total,
+      resumed: job.resumed,
+      inserted: job.inserted,
+      updated: job.updated,
+      unchanged: job.unchanged,
+      errors: job.errors.map(e => e.error),
+    };
+  },
+
+  /**
+   *  Estado de un trabajo de carga (avance, velocidad, ETA, errores)
    */
-  loadPokemonData: async (): Promise<LoadResponse> => {
-    const response = await api.post<LoadResponse>('/pokemon/load-pokemon-data/');
+  getLoadJob: async (jobId: number): Promise<LoadJob> => {
+    const response = await api.get<LoadJob>(`/pokemon/load-jobs/${jobId}/`);
     return response.data;
   },
 
+  /**
+   *  Pokémon que cambiaron desde la versión 'since' (0 = todos)
+   *
+   *  Sigue los enlaces 'next' hasta el final; la versión devuelta es la que
+   *  hay que pasar como 'since' en la próxima sincronización.
+   */
+  getChanges: async (since: number): Promise<{ version: number; results: PokemonChange[] }> => {
+    let url: string | null = `/pokemon/changes/?since=${since}&page_size=1000`;
+    let version = since;
+    const results: PokemonChange[] = [];
+
+    while (url) {
+      const response = await api.get<PokemonChangesResponse>(url);
+      results.push(...response.data.results);
+      version = response.data.version;
+      url = response.data.next;
+    }
+
+    return { version, results };
+  },
+
   /**
    *  Obtener estadísticas generales
    */
@@ -91,10 +234,24 @@ export const API_ENDPOINTS = {
   WEIGHT_FILTER: '/pokemon/weight-filter/',
   GRASS_TYPE: '/pokemon/grass-type/',
   FLYING_TALL: '/pokemon/flying-tall/',
+  QUERY: '/pokemon/query/',
+  SEARCH: '/pokemon/search/',
+  EXPORT: '/pokemon/export/',
   LOAD_DATA: '/pokemon/load-pokemon-data/',
+  LOAD_JOBS: '/pokemon/load-jobs/',
   STATS: '/pokemon/stats/',
+  CHANGES: '/pokemon/changes/',
 } as const;
 
+/**
+ *  URL del sprite: la copia servida por el backend (/sprites/..., caché
+ *  immutable) o, si aún no existe, la imagen original de la PokéAPI
+ */
+export const spriteSrc = (pokemon: Pick<Pokemon, 'sprite_url' | 'sprite_local_url'>): string | null =>
+  pokemon.sprite_local_url
+    ? new URL(pokemon.sprite_local_url, API_BASE_URL).href
+    : pokemon.sprite_url;
+
 export const isServerRunning = async (): Promise<boolean> => {
   try {
     await api.get('/pokemon/');
@@ -9,26 +9,112 @@ export interface Pokemon {
   types: string[];
   height: number;          
   weight: number;          
-  sprite_url: string | null;
+  sprite_url: string | null;         // Imagen original (respaldo)
+  sprite_local_url: string | null;   // Copia servida por el backend (/sprites/...)
   reversed_name: string;
   types_display: string;
   created_at: string;
   updated_at: string;
 }
 
+// Página de resultados (paginación por cursor: seguir 'next' hasta null)
 export interface PokemonResponse {
-  count: number;
+  count: number;              // resultados de esta página
+  next?: string | null;       // URL de la página siguiente
+  previous?: string | null;   // URL de la página anterior
   results: Pokemon[];
   message: string;
   filter_applied?: string;
 }
 
+// Parámetros de la consulta genérica GET /pokemon/query/
+export interface PokemonQueryParams {
+  types?: string[];
+  types_match?: 'any' | 'all';
+  height_gt?: number;
+  height_gte?: number;
+  height_lt?: number;
+  height_lte?: number;
+  weight_gt?: number;
+  weight_gte?: number;
+  weight_lt?: number;
+  weight_lte?: number;
+  name_prefix?: string;
+  matches?: Array<'weight_filter' | 'grass_type' | 'flying_tall'>;  // marcas precalculadas de los filtros
+  ordering?: string[];   // ej: ['-weight', 'name']
+  fields?: string[];     // proyección de campos
+  page_size?: number;    // tamaño de página (máximo 200)
+}
+
+// Feed de cambios GET /pokemon/changes/?since=<versión>
+export interface PokemonChange extends Omit<Pokemon, 'id' | 'created_at' | 'updated_at'> {
+  change_version: number;
+}
+
+export interface PokemonChangesResponse {
+  since: number;
+  version: number;            // Guardar y enviar como since la próxima vez
+  count: number;
+  next: string | null;
+  results: PokemonChange[];
+}
+
+// Búsqueda por nombre GET /pokemon/search/?q=
+export interface PokemonSearchResult extends Omit<Pokemon, 'id' | 'created_at' | 'updated_at'> {
+  match: 'exact' | 'prefix' | 'substring' | 'fuzzy';
+  matched_on: 'name' | 'reversed_name';
+  distance: number;           // Errores de escritura (solo en 'fuzzy')
+}
+
+export interface PokemonSearchResponse {
+  query: string;              // Consulta normalizada
+  count: number;
+  results: PokemonSearchResult[];   // Ordenados por relevancia
+  message: string;
+}
+
 export interface LoadResponse {
   message: string;
   total_loaded: number;
+  requested?: number;
+  resumed?: number;
+  inserted?: number;
+  updated?: number;
+  unchanged?: number;
   errors: string[];
 }
 
+// Trabajo de carga en segundo plano (POST /pokemon/load-pokemon-data/)
+export type LoadJobStatus = 'queued' | 'running' | 'completed' | 'failed';
+
+export interface LoadJob {
+  id: number;
+  status: LoadJobStatus;
+  message: string;
+  total: number;
+  processed: number;
+  loaded: number;
+  resumed: number;
+  inserted: number;
+  updated: number;
+  unchanged: number;
+  progress: number;            // Porcentaje 0-100
+  throughput: number;          // Pokémon por segundo
+  eta_seconds: number | null;
+  errors: { pokemon_id: number; error: string }[];
+  created_at: string;
+  started_at: string | null;
+  finished_at: string | null;
+}
+
+export interface LoadJobResponse {
+  message: string;
+  job_id: number;
+  coalesced: boolean;
+  status_url: string;
+  job: LoadJob;
+}
+
 // Opciones de filtro para la UI
 export interface FilterOption {
   id: string;